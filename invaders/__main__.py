@@ -25,4 +25,10 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    # The simulation thread steps on the time of the computer, so it cannot be replayed
+    assert GAME_SIMULATION is None or (GAME_RECORD is None and GAME_REPLAY is None), \
+        'GAME_SIMULATION cannot be used with GAME_RECORD or GAME_REPLAY'
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,timestep=GAME_TIMESTEP,
+             record=GAME_RECORD,replay=GAME_REPLAY,seed=GAME_SEED,
+             retained=GAME_RETAINED,atlas=GAME_ATLAS,texture_budget=GAME_TEXTURE_BUDGET,
+             pacing=GAME_PACING).run()
@@ -70,10 +70,16 @@ class Invaders(GameApp):
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     _bg : the background of the start screen
-    _livestext : the text displaying how many lives are left
     _wintext: the text displaying the win message
     _losetext: the text displaying the lose message
     _pausedtext: the text displayed the paused message when a ship life is lost
+    _sounds: the sound effects, loaded once when the game starts [SoundBank]
+    _loadtext: the text displayed while the assets are loading [GLabel]
+    _loadbar: the bar showing how much of the assets are loaded [GRectangle]
+    _simwave: the wave updated on the simulation thread, whose snapshots _wave shows
+              [Wave, or None if GAME_SIMULATION is None or there is no wave]
+    _sim: the thread that updates _simwave [SimulationThread, or None if no wave is running on it]
+    _snapshot: the last snapshot shown by _wave [WaveSnapshot, or None if _sim is None]
     """
     
     # DO NOT MAKE A NEW INITIALIZER!
@@ -93,11 +99,27 @@ class Invaders(GameApp):
         """
         
         self._wave = None
+        self._simwave = None
+        self._sim = None
+        self._snapshot = None
         self._state = STATE_INACTIVE
         self.lastkeys = 0
         self._text = GLabel(text="Press Any Key To Play", x=400, y=350, linecolor=cornell.WHITE,
                             font_size= 50, font_name = "RetroGame")
         self._bg = GImage(x= 400, y= 350, width = 800, height = 800, source = 'Space.png') 
+        self._sounds = SoundBank(SOUND_VOICES)
+        self._loadtext = GLabel(text="Loading", x=400, y=350, linecolor=cornell.WHITE,
+                            font_size= 50, font_name = "RetroGame")
+        self._loadbar = GRectangle(left=LOAD_BAR_LEFT, y=280, width=1, height=10,
+                                   linecolor=cornell.WHITE, fillcolor=cornell.WHITE)
+        
+        for name in PINNED_IMAGES:
+            self.pin_texture(name)
+        
+        # Load everything the waves use before the first wave, in the background
+        self.assets.add_images()
+        self.assets.add_font("RetroGame", 25)
+        self.assets.add_sounds(self._sounds)
         self._pausedtext = GLabel(text="You Lost A Life, Press Any Key To Play", x=400, y=350, linecolor=cornell.BLUE,
                             font_size= 25, font_name = "RetroGame")
         self._wintext = GLabel(text="Yay, You Won!", x=400, y=350, linecolor=cornell.BLUE,
@@ -155,16 +177,22 @@ class Invaders(GameApp):
         Precondition: dt is a number (int or float)
         """
         if self._state == STATE_INACTIVE:
+            self._showProgress()
             self._determineState()
             
         if self._state == STATE_ACTIVE:
-            self._wave.update(self.input, dt)
+            if self._sim is None:
+                self._wave.update(self.input, dt)
+            else:
+                self._showSnapshot()
             
         if self._state == STATE_ACTIVE:
             if self._wave._ship is None and self._wave._lives > 0:
                 self._state = STATE_PAUSED
         if self._state == STATE_NEWWAVE:
-            self._wave = Wave()
+            self._wave = Wave(self.seed, sounds=self._sounds)
+            if GAME_SIMULATION is not None:
+                self._startSimulation()
             self._state = STATE_ACTIVE
         
         if self._state == STATE_PAUSED:
@@ -182,6 +210,10 @@ class Invaders(GameApp):
             if self._wave.aliens_dead() == True or self._wave.aliens_win() == True:
                 self._state = STATE_COMPLETE
         
+        if self._state == STATE_COMPLETE and self._sim is not None:
+            self._sim.stop()
+            self._sim = None
+        
         
             
     def draw(self):
@@ -203,18 +235,17 @@ class Invaders(GameApp):
         # IMPLEMENT ME
         if self._state == STATE_INACTIVE:
             self._bg.draw(self.view)
-            self._text.draw(self.view)
+            if self.assets.ready:
+                self._text.draw(self.view)
+            else:
+                self._loadtext.draw(self.view)
+                self._loadbar.draw(self.view)
         elif self._state != STATE_INACTIVE:
             self._text = None   
         if self._state == STATE_NEWWAVE or self._state == STATE_ACTIVE:
             self._bg.draw(self.view)
             self._wave.draw_aliens(self.view)
-            self._livestext = GLabel(text="Lives: " + str(self._wave._lives), x=120, y=650, linecolor=cornell.WHITE,
-                            font_size= 25, font_name = "RetroGame")
-            self._livestext.draw(self.view)
-            self._scoretext = GLabel(text="Score: " + str(self._wave._score), x=620, y=650, linecolor=cornell.WHITE,
-                            font_size= 25, font_name = "RetroGame")
-            self._scoretext.draw(self.view) 
+            self._wave.draw_hud(self.view)
         if self._state == STATE_NEWWAVE or self._state == STATE_ACTIVE:
             self._wave.draw_ship(self.view)   
         if self._state == STATE_NEWWAVE or self._state == STATE_ACTIVE:
@@ -249,8 +280,9 @@ class Invaders(GameApp):
         # Determine the current number of keys pressed
         curr_keys = self.input.key_count
         
-        # Only change if we have just pressed the keys this animation frame
-        change = curr_keys > 0 and self.lastkeys == 0
+        # Only change if we have just pressed the keys this animation frame,
+        # and only start a wave once every asset is loaded
+        change = curr_keys > 0 and self.lastkeys == 0 and self.assets.ready
         
         if change:
             # Click happened.  Change the state
@@ -260,6 +292,17 @@ class Invaders(GameApp):
         # Update last_keys
         self.lastkeys= curr_keys
     
+    def _showProgress(self):
+        """
+        Sets the length of the loading bar from the progress of the asset preloader.
+        
+        The bar is only changed when the progress changed.
+        """
+        width = max(1, round(LOAD_BAR_WIDTH*self.assets.progress))
+        if width != self._loadbar.width:
+            self._loadbar.width = width
+            self._loadbar.left = LOAD_BAR_LEFT
+    
     def playAgain(self):
         """
         We used the implementation provided by Walker White during lecture.
@@ -279,11 +322,52 @@ class Invaders(GameApp):
         
         if change:
             # Click happened.  Change the state
-            self._state = STATE_CONTINUE
-            self._wave.restartShip()
+            self._continue()
            
         # Update last_keys
         self.lastkeys = curr_keys
     
+    def _continue(self):
+        """
+        Brings back the ship and continues the wave.
+        
+        With a simulation thread, the ship is brought back in the copy of the wave on
+        the thread, which was paused when the ship was lost.
+        """
+        self._state = STATE_CONTINUE
+        if self._sim is None:
+            self._wave.restartShip()
+        else:
+            self._sim.call(self._simwave.restartShip)
+            self._showSnapshot()
+            self._sim.resume()
+    
+    def _startSimulation(self):
+        """
+        Starts a copy of the wave on a simulation thread.
+        
+        The copy is made with the seed of the game, so a seeded game plays out the same
+        way as it does without the thread.  It is updated every GAME_SIMULATION seconds on the
+        thread, and _wave only shows its snapshots, so a slow update never holds up a
+        frame.  The copy is never drawn, so its aliens are not batched.
+        """
+        self._simwave = Wave(self.seed, batched=False)
+        self._sim = SimulationThread(self._simwave.simulate, self._simwave.snapshot,
+                                     GAME_SIMULATION)
+        self._snapshot = None
+        self._sim.start()
+    
+    def _showSnapshot(self):
+        """
+        Hands the input to the simulation thread, and shows its latest snapshot in _wave.
+        
+        Nothing changes if the thread has not finished a step since the last snapshot.
+        """
+        self._sim.post_input(self.input)
+        snapshot = self._sim.latest()
+        if snapshot is not self._snapshot:
+            self._snapshot = snapshot
+            self._wave.apply(snapshot)
+    
     
     
\ No newline at end of file
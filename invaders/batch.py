@@ -0,0 +1,446 @@
+"""
+Batched simulator for Alien Invaders
+
+This module advances many independent waves at once, for bot training and balance
+studies.  It is not used by the game itself, and it requires NumPy.
+
+The class WaveBatch follows the rules of Wave.update (ship movement, fireBolt, the
+alien march and fire cadence, collisions and scoring), but it stores every wave as one
+row of a set of stacked NumPy arrays.  One call to step advances all of the waves by
+one frame, so the Python overhead is shared by all of them.
+
+Instead of a GInput, each step takes an (N, 3) array of actions.  Column ACTION_LEFT
+holds the left arrow, ACTION_RIGHT the right arrow and ACTION_FIRE the spacebar.
+
+Run this module to measure the throughput in env-steps per second:
+
+    python invaders/batch.py
+
+Debasmita Bhattacharya (db758) and Amelia Myers (arm293)
+2 December 2017
+"""
+from consts import *
+import numpy
+import time
+
+# The action columns in the array given to WaveBatch.step
+ACTION_LEFT  = 0
+ACTION_RIGHT = 1
+ACTION_FIRE  = 2
+
+# The width and height of a bolt as drawn (the collision box uses BOLT_WIDTH and BOLT_HEIGHT)
+DRAWN_BOLT_HEIGHT = 20
+
+# The rounding error allowed in the time of an alien step (as in the scheduler of Wave)
+EPSILON = 1e-6*TIMER_RESOLUTION
+
+
+class WaveBatch(object):
+    """
+    A class to simulate N independent waves in lockstep.
+
+    Every wave has at most one player bolt and one alien bolt on screen, just like Wave.
+    The alien formation of each wave is a lattice, so it is stored as the position of
+    the bottom-left alien plus a rows x cols grid of alive flags.  As in Formation, that
+    position is recomputed from fixed-point offsets (FORMATION_UNITS per pixel), so it
+    does not drift from the positions of a Wave over a long game.
+
+    When a ship is destroyed and the wave still has lives, the ship comes back at the
+    start of the next step, as if the player had pressed a key right away.  A wave that
+    is over (won or lost) stops changing until it is reset.
+
+    INSTANCE ATTRIBUTES:
+        _n:      the number of waves [int > 0]
+        _rows:   the number of rows of aliens [int > 0]
+        _cols:   the number of aliens in each row [int > 0]
+        _speed:  the seconds between alien steps, half of speed rounded to ticks [float > 0]
+        _rate:   the largest alien fire threshold [int > 0]
+        _bspeed: the number of pixels to move a bolt per frame [number > 0]
+        _rng:    the random number generator [numpy.random.Generator]
+        _alive:  whether each alien is alive [N x rows x cols array of bool]
+        _incol:  the number of live aliens in each column [N x cols array of int]
+        _x0:     the x-coordinate of the aliens in column 0 [N array of float]
+        _y0:     the y-coordinate of the aliens in row 0 [N array of float]
+        _dx:     the distance marched to the right, in fixed-point units [N array of int]
+        _dy:     the distance descended, in fixed-point units [N array of int]
+        _base:   the starting y-coordinate of the aliens in row 0 [float]
+        _dir:    the direction of the march, 1 for right and -1 for left [N array of int]
+        _time:   the time since the last alien step [N array of float]
+        _fire:   the alien fire threshold, as in Wave._alienfire [N array of int]
+        _steps:  the number of alien steps taken, to fire after every other one [N array of int]
+        _shipx:  the x-coordinate of each ship [N array of float]
+        _ship:   whether each ship is on screen [N array of bool]
+        _lives:  the number of lives left [N array of int]
+        _score:  the current score [N array of int]
+        _pbolt:  whether there is a player bolt on screen [N array of bool]
+        _px:     the x-coordinate of each player bolt [N array of float]
+        _py:     the y-coordinate of each player bolt [N array of float]
+        _abolt:  whether there is an alien bolt on screen [N array of bool]
+        _ax:     the x-coordinate of each alien bolt [N array of float]
+        _ay:     the y-coordinate of each alien bolt [N array of float]
+        _frames: the number of frames each wave has run [N array of int]
+        _clock:  the number of seconds each wave has run [N array of float]
+        _done:   whether each wave is over [N array of bool]
+        _won:    whether each wave was won by the player [N array of bool]
+    """
+
+    # INITIALIZER
+    def __init__(self, envs, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, speed=ALIEN_SPEED,
+                 bolt_rate=BOLT_RATE, bolt_speed=BOLT_SPEED, seed=None):
+        """ Initializer for a batch of waves.
+        This method creates envs fresh waves with the given settings.
+        Attributes:
+        envs: the number of waves to simulate [int > 0]
+        rows: the number of rows of aliens [int > 0]
+        cols: the number of aliens in each row [int > 0]
+        speed: the seconds in which the aliens take two steps, as ALIEN_SPEED [number > 0]
+        bolt_rate: the largest alien fire threshold, as BOLT_RATE [int > 0]
+        bolt_speed: the number of pixels to move a bolt per frame [number > 0]
+        seed: the seed for the random number generator [int or None]"""
+        # A bolt can then touch at most one alien, so the nearest lattice cell is the only candidate
+        assert BOLT_WIDTH <= ALIEN_H_SEP and BOLT_HEIGHT <= ALIEN_V_SEP, 'bolts are too large'
+        self._n = envs
+        self._rows = rows
+        self._cols = cols
+        # Rounded to whole ticks, as the scheduler of Wave rounds its periods
+        self._speed = max(1, round(speed/2/TIMER_RESOLUTION))*TIMER_RESOLUTION
+        self._rate = bolt_rate
+        self._bspeed = bolt_speed
+        self._rng = numpy.random.default_rng(seed)
+
+        self._alive = numpy.ones((envs, rows, cols), dtype=bool)
+        self._incol = numpy.zeros((envs, cols), dtype=int)
+        self._x0 = numpy.zeros(envs)
+        self._y0 = numpy.zeros(envs)
+        self._dx = numpy.zeros(envs, dtype=numpy.int64)
+        self._dy = numpy.zeros(envs, dtype=numpy.int64)
+        self._base = float(GAME_HEIGHT - ALIEN_CEILING - 0.5*ALIEN_HEIGHT
+                          - (rows-1)*(ALIEN_V_SEP + ALIEN_HEIGHT))
+        self._dir = numpy.ones(envs, dtype=int)
+        self._time = numpy.zeros(envs)
+        self._fire = numpy.ones(envs, dtype=int)
+        self._steps = numpy.zeros(envs, dtype=int)
+        self._shipx = numpy.zeros(envs)
+        self._ship = numpy.ones(envs, dtype=bool)
+        self._lives = numpy.zeros(envs, dtype=int)
+        self._score = numpy.zeros(envs, dtype=int)
+        self._pbolt = numpy.zeros(envs, dtype=bool)
+        self._px = numpy.zeros(envs)
+        self._py = numpy.zeros(envs)
+        self._abolt = numpy.zeros(envs, dtype=bool)
+        self._ax = numpy.zeros(envs)
+        self._ay = numpy.zeros(envs)
+        self._frames = numpy.zeros(envs, dtype=int)
+        self._clock = numpy.zeros(envs)
+        self._done = numpy.zeros(envs, dtype=bool)
+        self._won = numpy.zeros(envs, dtype=bool)
+        self.reset()
+
+    # GETTERS
+    def envs(self):
+        """ Returns: the number of waves in this batch"""
+        return self._n
+
+    def scores(self):
+        """ Returns: the score of each wave [N array of int]"""
+        return self._score.copy()
+
+    def lives(self):
+        """ Returns: the number of lives left in each wave [N array of int]"""
+        return self._lives.copy()
+
+    def aliens(self):
+        """ Returns: the number of live aliens in each wave [N array of int]"""
+        return self._alive.sum(axis=(1, 2))
+
+    def ship_x(self):
+        """ Returns: the x-coordinate of each ship [N array of float]"""
+        return self._shipx.copy()
+
+    def column_x(self):
+        """ Returns: the x-coordinate of each column of aliens [N x cols array of float]"""
+        return self._x0[:, None] + numpy.arange(self._cols)*(ALIEN_WIDTH + ALIEN_H_SEP)
+
+    def live_columns(self):
+        """ Returns: whether each column still has a live alien [N x cols array of bool]"""
+        return self._incol > 0
+
+    def frames(self):
+        """ Returns: the number of frames each wave has run [N array of int]"""
+        return self._frames.copy()
+
+    def elapsed(self):
+        """ Returns: the number of seconds each wave has run [N array of float]"""
+        return self._clock.copy()
+
+    def done(self):
+        """ Returns: whether each wave is over [N array of bool]"""
+        return self._done.copy()
+
+    def won(self):
+        """ Returns: whether each wave was won by the player [N array of bool]"""
+        return self._won.copy()
+
+    # METHODS TO RUN THE WAVES
+    def reset(self, mask=None):
+        """ Starts the selected waves over from the beginning.
+
+        Parameter mask: the waves to reset, or None for all of them
+        Precondition: mask is None or an N array of bool"""
+        if mask is None:
+            mask = numpy.ones(self._n, dtype=bool)
+        k = int(mask.sum())
+        self._alive[mask] = True
+        self._incol[mask] = self._rows
+        self._x0[mask] = ALIEN_WIDTH
+        self._y0[mask] = self._base
+        self._dx[mask] = 0
+        self._dy[mask] = 0
+        self._dir[mask] = 1
+        self._time[mask] = 0
+        self._fire[mask] = self._rng.integers(1, self._rate+1, k)
+        self._steps[mask] = 0
+        self._shipx[mask] = GAME_WIDTH/2
+        self._ship[mask] = True
+        self._lives[mask] = SHIP_LIVES
+        self._score[mask] = 0
+        self._pbolt[mask] = False
+        self._abolt[mask] = False
+        self._frames[mask] = 0
+        self._clock[mask] = 0
+        self._done[mask] = False
+        self._won[mask] = False
+
+    def step(self, actions, dt):
+        """ Returns: the points scored by each wave during this frame [N array of int]
+
+        This method advances every wave that is not over by one frame, in the same
+        order as Wave.update: ship movement, alien_wave (which steps the aliens and
+        lets them fire), fireBolt and then the collisions.
+
+        Parameter actions: the keys held down in each wave
+        Precondition: actions is an (N, 3) array of bool (or 0/1)
+
+        Parameter dt: time in seconds since the last step
+        Precondition: dt is a number > 0"""
+        actions = numpy.asarray(actions, dtype=bool)
+        active = ~self._done
+        before = self._score.copy()
+
+        respawn = active & ~self._ship & (self._lives > 0)
+        self._shipx[respawn] = GAME_WIDTH/2
+        self._ship[respawn] = True
+
+        self._move_ship(active & self._ship & actions[:, ACTION_LEFT], -SHIP_MOVEMENT)
+        self._move_ship(active & self._ship & actions[:, ACTION_RIGHT], SHIP_MOVEMENT)
+        self._alien_wave(active, dt)
+        self._fire_bolt(active & self._ship & actions[:, ACTION_FIRE] & ~self._pbolt)
+        self._move_bolts(active)
+        self._collide(active)
+        self._finish(active, dt)
+        return self._score - before
+
+    # HELPER METHODS (ALL OF THEM ONLY CHANGE THE SELECTED WAVES)
+    def _move_ship(self, mask, distance):
+        """ Moves the selected ships, keeping them on screen, as in Ship.move_ship."""
+        self._shipx[mask] = numpy.clip(self._shipx[mask] + distance,
+                                       SHIP_WIDTH//2, GAME_WIDTH - SHIP_WIDTH//2)
+
+    def _march(self, mask):
+        """ Moves the selected formations one step, as in Formation.march."""
+        self._dx[mask] += self._dir[mask]*round(ALIEN_H_WALK*FORMATION_UNITS)
+        self._x0[mask] = ALIEN_WIDTH + self._dx[mask]/FORMATION_UNITS
+
+    def _alien_wave(self, mask, dt):
+        """ Steps the selected formations and lets them fire, as in Wave.alien_wave.
+
+        As in the scheduler of Wave, a formation takes a step every half of the speed
+        setting (several in one frame if dt is long enough), and may fire at every other
+        step if it has more live aliens than its fire threshold."""
+        self._time[mask] += dt
+        step = mask & (self._time >= self._speed - EPSILON)
+        while step.any():
+            self._time[step] -= self._speed
+            self._alien_step(step)
+            self._steps[step] += 1
+            self._alien_bolt(step & (self._steps % 2 == 0) & (self._incol.sum(axis=1) > self._fire))
+            step &= self._time >= self._speed - EPSILON
+
+    def _alien_step(self, mask):
+        """ Marches the selected formations and turns them at the edges, as in Wave._alien_step.
+
+        As in Wave, a formation turns when its leftmost or rightmost live column reaches
+        the edge that it is moving towards."""
+        self._march(mask)
+
+        lo = 0.5*ALIEN_WIDTH + ALIEN_H_SEP
+        hi = GAME_WIDTH - 0.5*ALIEN_WIDTH - ALIEN_H_SEP
+        drop = round(ALIEN_V_WALK/self._rows*FORMATION_UNITS)
+        columns = self._incol > 0
+        first = columns.argmax(axis=1)
+        last = self._cols - 1 - columns[:, ::-1].argmax(axis=1)
+        live = mask & columns.any(axis=1)
+        right = live & (self._dir == 1) & (self._x0 + last*(ALIEN_WIDTH + ALIEN_H_SEP) >= hi)
+        self._dy[right] += drop
+        self._y0[right] = self._base - self._dy[right]/FORMATION_UNITS
+        self._dir[right] = -1
+        left = live & (self._dir == -1) & (self._x0 + first*(ALIEN_WIDTH + ALIEN_H_SEP) <= lo)
+        self._dy[left] += drop
+        self._y0[left] = self._base - self._dy[left]/FORMATION_UNITS
+        self._dir[left] = 1
+
+    def _fire_bolt(self, mask):
+        """ Fires a player bolt from the selected ships, as in Wave.fireBolt."""
+        self._pbolt[mask] = True
+        self._px[mask] = self._shipx[mask]
+        self._py[mask] = SHIP_BOTTOM + SHIP_HEIGHT + DRAWN_BOLT_HEIGHT/2
+
+    def _move_bolts(self, mask):
+        """ Moves every bolt in the selected waves, as in Wave.move_bolt."""
+        player = mask & self._pbolt
+        self._py[player] += self._bspeed
+        alien = mask & self._abolt
+        self._ay[alien] -= self._bspeed
+        self._pbolt &= ~(player & ((self._py > GAME_HEIGHT + BOLT_HEIGHT/2) | (self._py < BOLT_HEIGHT/2)))
+        self._abolt &= ~(alien & ((self._ay > GAME_HEIGHT + BOLT_HEIGHT/2) | (self._ay < BOLT_HEIGHT/2)))
+
+    def _alien_bolt(self, mask):
+        """ Fires an alien bolt in the selected waves that can, as in Wave.alien_bolt.
+
+        As in Wave, the shooter is the bottom live alien of a random column that still
+        has live aliens."""
+        shoot = mask & ~self._abolt & (self._incol > 0).any(axis=1)
+        envs = numpy.nonzero(shoot)[0]
+        if len(envs) == 0:
+            return
+        # Every shooting wave has a live alien, so the largest key is a live column
+        keys = numpy.where(self._incol[envs] > 0, self._rng.random((len(envs), self._cols)), -1.0)
+        col = keys.argmax(axis=1)
+        row = self._alive[envs, :, col].argmax(axis=1)
+
+        self._abolt[envs] = True
+        self._ax[envs] = self._x0[envs] + col*(ALIEN_WIDTH + ALIEN_H_SEP)
+        self._ay[envs] = (self._y0[envs] + row*(ALIEN_HEIGHT + ALIEN_V_SEP)
+                          - 0.5*ALIEN_HEIGHT - BOLT_HEIGHT - 2 + DRAWN_BOLT_HEIGHT/2)
+        self._fire[envs] = self._rng.integers(1, self._rate+1, len(envs))
+
+    def _collide(self, mask):
+        """ Checks the bolts against the ships and the aliens, as in Wave.update.
+
+        A hit needs one of the four corners of the BOLT_WIDTH x BOLT_HEIGHT collision box
+        (measured from the bottom of the bolt) to be strictly inside the target."""
+        # Alien bolts against the ship
+        bottom = self._ay - DRAWN_BOLT_HEIGHT/2
+        shipy = SHIP_BOTTOM + SHIP_HEIGHT/2
+        inx = ((numpy.abs(self._ax - BOLT_WIDTH/2 - self._shipx) < SHIP_WIDTH/2) |
+               (numpy.abs(self._ax + BOLT_WIDTH/2 - self._shipx) < SHIP_WIDTH/2))
+        iny = ((numpy.abs(bottom - shipy) < SHIP_HEIGHT/2) |
+               (numpy.abs(bottom + BOLT_HEIGHT - shipy) < SHIP_HEIGHT/2))
+        hit = mask & self._abolt & self._ship & inx & iny
+        self._ship[hit] = False
+        self._lives[hit] -= 1
+        self._abolt[hit] = False
+
+        # Player bolts against the nearest lattice cell
+        hpitch = ALIEN_WIDTH + ALIEN_H_SEP
+        vpitch = ALIEN_HEIGHT + ALIEN_V_SEP
+        bottom = self._py - DRAWN_BOLT_HEIGHT/2
+        col = numpy.rint((self._px - self._x0)/hpitch).astype(int)
+        row = numpy.rint((bottom + BOLT_HEIGHT/2 - self._y0)/vpitch).astype(int)
+        valid = mask & self._pbolt & (col >= 0) & (col < self._cols) & (row >= 0) & (row < self._rows)
+        envs = numpy.nonzero(valid)[0]
+        row = row[envs]
+        col = col[envs]
+        alienx = self._x0[envs] + col*hpitch
+        alieny = self._y0[envs] + row*vpitch
+        px = self._px[envs]
+        by = bottom[envs]
+        inx = ((numpy.abs(px - BOLT_WIDTH/2 - alienx) < ALIEN_WIDTH/2) |
+               (numpy.abs(px + BOLT_WIDTH/2 - alienx) < ALIEN_WIDTH/2))
+        iny = ((numpy.abs(by - alieny) < ALIEN_HEIGHT/2) |
+               (numpy.abs(by + BOLT_HEIGHT - alieny) < ALIEN_HEIGHT/2))
+        hit = self._alive[envs, row, col] & inx & iny
+        envs = envs[hit]
+        self._alive[envs, row[hit], col[hit]] = False
+        self._incol[envs, col[hit]] -= 1
+        self._pbolt[envs] = False
+        self._score[envs] += 10
+
+    def _finish(self, mask, dt):
+        """ Ends the selected waves that are won or lost, as in Invaders.update."""
+        self._frames[mask] += 1
+        self._clock[mask] += dt
+
+        rows = self._alive.any(axis=2)
+        lowest = rows.argmax(axis=1)
+        invaded = rows.any(axis=1) & (self._y0 + lowest*(ALIEN_HEIGHT + ALIEN_V_SEP)
+                                      < DEFENSE_LINE + 0.5*ALIEN_HEIGHT)
+        cleared = ~rows.any(axis=1)
+        dead = ~self._ship & (self._lives == 0)
+        over = mask & (invaded | cleared | dead)
+        self._won |= over & cleared & ~invaded & ~dead
+        self._done |= over
+
+
+def random_actions(rng, envs, fire=0.5, move=0.4):
+    """ Returns: an (envs, 3) array of random actions.
+
+    Parameter rng: the random number generator to use
+    Precondition: rng is a numpy.random.Generator
+
+    Parameter envs: the number of waves
+    Precondition: envs is an int > 0
+
+    Parameter fire: the chance of holding the spacebar
+    Precondition: fire is a float in 0..1
+
+    Parameter move: the chance of holding each arrow key
+    Precondition: move is a float in 0..1"""
+    chance = numpy.array([move, move, fire])
+    return rng.random((envs, 3)) < chance
+
+
+def tracking_actions(batch):
+    """ Returns: an (envs, 3) array of actions that chase the nearest live column.
+
+    The ship moves toward the closest column that still has a live alien, and it
+    fires whenever it is lined up with that column.
+
+    Parameter batch: the waves to play
+    Precondition: batch is a WaveBatch"""
+    columns = batch.column_x()
+    shipx = batch.ship_x()
+    gap = numpy.where(batch.live_columns(), columns - shipx[:, None], numpy.inf)
+    nearest = numpy.take_along_axis(gap, numpy.abs(gap).argmin(axis=1)[:, None], axis=1)[:, 0]
+    actions = numpy.zeros((batch.envs(), 3), dtype=bool)
+    actions[:, ACTION_LEFT] = nearest < -SHIP_MOVEMENT
+    actions[:, ACTION_RIGHT] = nearest > SHIP_MOVEMENT
+    actions[:, ACTION_FIRE] = numpy.abs(nearest) < ALIEN_WIDTH/2
+    return actions
+
+
+def throughput(envs=1024, steps=2000, dt=1/60, seed=0):
+    """ Returns: the number of env-steps per second for a random policy.
+
+    Waves that finish are reset, so that every step advances all envs waves.
+
+    Parameter envs: the number of waves in the batch
+    Precondition: envs is an int > 0
+
+    Parameter steps: the number of steps to time
+    Precondition: steps is an int > 0"""
+    batch = WaveBatch(envs, seed=seed)
+    rng = numpy.random.default_rng(seed)
+    start = time.perf_counter()
+    for i in range(steps):
+        batch.step(random_actions(rng, envs), dt)
+        done = batch.done()
+        if done.any():
+            batch.reset(done)
+    return envs*steps/(time.perf_counter() - start)
+
+
+# Application code
+if __name__ == '__main__':
+    for envs in (1, 64, 1024, 4096):
+        print('%5d envs: %12.0f env-steps/second' % (envs, throughput(envs, max(200, 200000//envs))))
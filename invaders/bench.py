@@ -0,0 +1,446 @@
+"""
+Benchmarks for Alien Invaders
+
+This module times the hot paths of the game across formation sizes.  It is not part of
+the game itself.  Run it from the folder that contains the invaders folder:
+
+    python invaders/bench.py
+
+To run it on a machine without a display, use the headless game2d backend:
+
+    GAME2D_BACKEND=headless python invaders/bench.py
+
+The suite times Wave.update, the Wave helpers that update calls, the win and loss checks
+and every draw method, for each formation size in SIZES and each number of bolts on
+screen in BOLTS.  Formations larger than the limits in consts.py do not fit on the
+screen, but the code does not care.  For each method it prints the latency distribution
+of a single call and how the median grows with the number of aliens.
+
+To catch slowdowns, save a baseline and check later runs against it:
+
+    python invaders/bench.py --save baseline.json
+    python invaders/bench.py --check baseline.json
+
+The check fails (with exit status 1) if the median of any method is more than the
+tolerance slower than in the baseline, and also more than the floor (in microseconds)
+slower, since a method that takes well under a microsecond varies by more than the
+tolerance from run to run.  If a method is slower, the suite runs again (up to
+CHECK_RUNS times in all), and the method only fails if it is slower in every run.
+Use --collisions to compare Formation.collide
+against Formation.collide_scan instead.
+
+Debasmita Bhattacharya (db758) and Amelia Myers (arm293)
+2 December 2017
+"""
+import cornell
+from consts import *
+from models import *
+from wave import Wave
+from app import Invaders
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+# The (rows, aliens per row) formation sizes to benchmark
+SIZES = ((5, 12), (10, 15), (20, 30), (40, 60))
+# The numbers of bolts on screen to benchmark
+BOLTS = (2, 20, 200)
+# The Wave methods to benchmark
+METHODS = ('update', 'alien_wave', 'alien_bolt', 'move_bolt', 'aliens_dead', 'aliens_win',
+           'draw_aliens', 'draw_ship', 'draw_dline', 'draw_hud', 'draw_bolt')
+# The percentiles to report for each method
+PERCENTILES = (50, 90, 99)
+# The time step given to the methods that take dt
+STEP = 1/60
+# The smallest slowdown of a median, in microseconds, that the check counts
+FLOOR = 1.0
+# The most runs of the suite to check against a baseline
+CHECK_RUNS = 3
+
+
+class HeldKeys(object):
+    """
+    A stand-in for GInput in which the same keys are always held down.
+
+    INSTANCE ATTRIBUTES:
+        key_count: the number of keys held down [int >= 0]
+        _keys:     the keys held down [set of str]
+    """
+
+    def __init__(self, *keys):
+        """ Initializer for a set of held keys.
+        Attributes:
+        keys: the names of the keys to hold down [str]"""
+        self._keys = set(keys)
+        self.key_count = len(keys)
+
+    def is_key_down(self, key):
+        """ Returns: True if key is held down
+
+        Parameter key: the key to test
+        Precondition: key is a string"""
+        return key in self._keys
+
+
+def make_bolts(formation, count, seed=0):
+    """ Returns: a list of count player bolts spread over the formation.
+
+    The bolts are placed uniformly at random over the bounding box of the formation, so
+    some of them hit aliens and some of them fall between aliens.
+
+    Parameter formation: the formation to aim at
+    Precondition: formation is a Formation
+
+    Parameter count: the number of bolts to make
+    Precondition: count is an int >= 0"""
+    rng = random.Random(seed)
+    left = formation.get_x(0, 0) - ALIEN_WIDTH
+    right = formation.get_x(0, -1) + ALIEN_WIDTH
+    bottom = formation.get_y(0, 0) - ALIEN_HEIGHT
+    top = formation.get_y(-1, 0) + ALIEN_HEIGHT
+    bolts = []
+    for i in range(count):
+        bolts.append(Bolt(x=rng.uniform(left, right), bottom=rng.uniform(bottom, top),
+                          width=5, height=20, linecolor=cornell.BLUE,
+                          fillcolor=cornell.BLUE, velocity=BOLT_SPEED))
+    return bolts
+
+
+def time_per_call(func, args, repeat=5):
+    """ Returns: the best time in seconds to call func once on each element of args
+
+    Parameter func: the function to time
+    Precondition: func is a function of one argument
+
+    Parameter args: the arguments to call func on
+    Precondition: args is a nonempty list
+
+    Parameter repeat: the number of times to repeat the measurement
+    Precondition: repeat is an int > 0"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        elapsed = (time.perf_counter() - start)/len(args)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def fill_bolts(wave, count, rng):
+    """ Adds random bolts to the wave until it has count bolts on screen.
+
+    Half of the new bolts belong to the player and half to the aliens.
+
+    Parameter wave: the wave to fill
+    Precondition: wave is a Wave
+
+    Parameter count: the number of bolts to have on screen
+    Precondition: count is an int >= 0
+
+    Parameter rng: the random number generator to place the bolts with
+    Precondition: rng is a random.Random"""
+    while wave.bolt_count() < count:
+        speed = BOLT_SPEED if rng.random() < 0.5 else -BOLT_SPEED
+        color = cornell.BLUE if speed > 0 else cornell.GREEN
+        wave.add_bolt(wave.new_bolt(x=rng.uniform(0, GAME_WIDTH), bottom=rng.uniform(BOLT_HEIGHT, GAME_HEIGHT-20),
+                                    width=5, height=20, linecolor=color, fillcolor=color, velocity=speed))
+
+
+def percentile(data, p):
+    """ Returns: the p-th percentile of data (nearest rank)
+
+    Parameter data: the values to summarize
+    Precondition: data is a nonempty sorted list of numbers
+
+    Parameter p: the percentile
+    Precondition: p is a number in 0..100"""
+    rank = max(1, math.ceil(p/100*len(data)))
+    return data[rank-1]
+
+
+def sample_latency(func, setup, samples=200, budget=2e-4):
+    """ Returns: the sorted list of samples of the time (in seconds) of one call to func
+
+    Each sample calls setup once (untimed) and then times a batch of calls to func.
+    The batch is just large enough to take about budget seconds, so that very fast
+    methods are not lost in the timer resolution; the sample is the mean of the batch.
+
+    Parameter func: the method to time
+    Precondition: func is a function of no arguments
+
+    Parameter setup: the function to call before each sample
+    Precondition: setup is a function of no arguments
+
+    Parameter samples: the number of samples
+    Precondition: samples is an int > 0
+
+    Parameter budget: the target time of a single sample
+    Precondition: budget is a float > 0"""
+    setup()
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, min(1000, int(budget/max(once, 1e-9))))
+
+    times = []
+    for i in range(samples):
+        setup()
+        start = time.perf_counter()
+        for j in range(number):
+            func()
+        times.append((time.perf_counter() - start)/number)
+    times.sort()
+    return times
+
+
+def bench_wave(rows, cols, bolts, view, samples=200, seed=0):
+    """ Returns: a dictionary from each method in METHODS to its latency statistics
+
+    The statistics are the minimum, mean, maximum and PERCENTILES of a single call, in
+    microseconds.  Every method runs on its own wave, and the bolts are topped up to
+    the given count (untimed) before each sample, so the wave stays in a steady state.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter bolts: the number of bolts on screen
+    Precondition: bolts is an int >= 0
+
+    Parameter view: the view to draw to
+    Precondition: view is a GView
+
+    Parameter samples: the number of samples for each method
+    Precondition: samples is an int > 0"""
+    keys = HeldKeys('spacebar')
+    results = {}
+    for name in METHODS:
+        rng = random.Random(seed)
+        wave = Wave(seed, rows, cols)
+        if name == 'update':
+            func = lambda: wave.update(keys, STEP)
+        elif name == 'alien_wave':
+            func = lambda: wave.alien_wave(STEP)
+        elif name.startswith('draw_'):
+            func = lambda: getattr(wave, name)(view)
+        else:
+            func = getattr(wave, name)
+
+        def setup():
+            fill_bolts(wave, bolts, rng)
+            if wave.checkPaused():
+                wave.restartShip()
+            view.clear()
+
+        times = sample_latency(func, setup, samples)
+        stats = {'min': times[0]*1e6, 'mean': sum(times)/len(times)*1e6, 'max': times[-1]*1e6}
+        for p in PERCENTILES:
+            stats['p%d' % p] = percentile(times, p)*1e6
+        results[name] = stats
+    view.clear()
+    return results
+
+
+def run_suite(sizes=SIZES, bolts=BOLTS, samples=200, seed=0):
+    """ Returns: the results of bench_wave for every size and bolt count
+
+    The result is a dictionary keyed by 'method/ROWSxCOLS/BOLTS' (such as
+    'update/5x12/2'), whose values are the statistics from bench_wave.
+
+    Parameter sizes: the (rows, cols) formation sizes to benchmark
+    Precondition: sizes is a sequence of pairs of ints > 0
+
+    Parameter bolts: the numbers of bolts on screen to benchmark
+    Precondition: bolts is a sequence of ints >= 0
+
+    Parameter samples: the number of samples for each method
+    Precondition: samples is an int > 0"""
+    app = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT)
+    app.build()
+    # Warm up (untimed) first, since the first calls load textures and fill the caches
+    for count in bolts:
+        bench_wave(sizes[0][0], sizes[0][1], count, app.view, max(1, samples//4), seed)
+    results = {}
+    for (rows, cols) in sizes:
+        for count in bolts:
+            stats = bench_wave(rows, cols, count, app.view, samples, seed)
+            for name in stats:
+                results['%s/%dx%d/%d' % (name, rows, cols, count)] = stats[name]
+    return results
+
+
+def report(results, sizes=SIZES, bolts=BOLTS):
+    """ Prints the latency distributions and the scaling curves of a suite run.
+
+    The scaling curve of a method is its median latency at each formation size (with
+    the fewest bolts), relative to the smallest size.  The exponent is the slope of
+    that curve on a log-log scale: about 0 means constant time and about 1 means time
+    proportional to the number of aliens.
+
+    Parameter results: the results of run_suite
+    Precondition: results is a dictionary returned by run_suite"""
+    columns = ['min'] + ['p%d' % p for p in PERCENTILES] + ['max']
+    print('%-30s' % 'latency (us)' + ''.join('%10s' % c for c in columns))
+    for key in sorted(results, key=lambda k: (k.split('/')[0], k)):
+        print('%-30s' % key + ''.join('%10.2f' % results[key][c] for c in columns))
+
+    print()
+    first = sizes[0]
+    print('%-14s' % 'scaling (p50)' + ''.join('%10s' % ('%dx%d' % size) for size in sizes)
+          + '%10s' % 'exponent')
+    for name in METHODS:
+        base = results['%s/%dx%d/%d' % (name, first[0], first[1], bolts[0])]['p50']
+        line = '%-14s' % name
+        for (rows, cols) in sizes:
+            line += '%9.1fx' % (results['%s/%dx%d/%d' % (name, rows, cols, bolts[0])]['p50']/base)
+        last = sizes[-1]
+        ratio = results['%s/%dx%d/%d' % (name, last[0], last[1], bolts[0])]['p50']/base
+        growth = (last[0]*last[1])/(first[0]*first[1])
+        line += '%10.2f' % (math.log(ratio)/math.log(growth) if growth > 1 else 0.0)
+        print(line)
+
+
+def check(results, baseline, tolerance=0.25, floor=FLOOR):
+    """ Returns: the list of keys whose median is slower than the baseline allows
+
+    A key regresses if its median is more than tolerance (a fraction) above the median
+    in the baseline, and also more than floor microseconds above it.  Keys that are
+    only in one of the two runs are ignored.
+
+    Parameter results: the results of run_suite
+    Precondition: results is a dictionary returned by run_suite
+
+    Parameter baseline: the saved results of an earlier run
+    Precondition: baseline is a dictionary returned by run_suite
+
+    Parameter tolerance: the allowed slowdown
+    Precondition: tolerance is a float >= 0
+
+    Parameter floor: the allowed slowdown in microseconds
+    Precondition: floor is a float >= 0"""
+    slower = []
+    for key in sorted(results):
+        if key in baseline:
+            before = baseline[key]['p50']
+            after = results[key]['p50']
+            if after > before*(1+tolerance) and after > before + floor:
+                slower.append(key)
+    return slower
+
+
+def fastest(results, other):
+    """ Returns: the results of two suite runs, keeping the statistics with the lower median
+
+    Parameter results: the results of run_suite
+    Precondition: results is a dictionary returned by run_suite
+
+    Parameter other: the results of another run of the same suite
+    Precondition: other is a dictionary returned by run_suite"""
+    best = dict(results)
+    for key in other:
+        if key not in best or other[key]['p50'] < best[key]['p50']:
+            best[key] = other[key]
+    return best
+
+
+def bench_collisions(sizes=SIZES, bolts=200, kills=0.3, seed=0):
+    """ Times Formation.collide against Formation.collide_scan for each formation size.
+
+    A fraction of the aliens are destroyed first so that the formation has holes.  The
+    two methods must agree on every bolt, or this function raises an AssertionError.
+
+    The last column times Formation.collide on a formation that has just marched (by 0
+    pixels, so the bolts still line up), which is the case in the game: the first test
+    after each step must not pay to move every alien.  The time of the march itself is
+    taken out.
+
+    Parameter sizes: the (rows, cols) formation sizes to benchmark
+    Precondition: sizes is a sequence of pairs of ints > 0
+
+    Parameter bolts: the number of bolts to test against each formation
+    Precondition: bolts is an int > 0
+
+    Parameter kills: the fraction of aliens to destroy before timing
+    Precondition: kills is a float in 0..1"""
+    print('%-10s %12s %12s %9s %14s' % ('formation', 'scan (us)', 'grid (us)', 'speedup',
+                                        'marched (us)'))
+    rng = random.Random(seed)
+    for (rows, cols) in sizes:
+        formation = Formation(rows, cols)
+        for row in range(rows):
+            for col in range(cols):
+                if rng.random() < kills:
+                    formation.kill(row, col)
+        shots = make_bolts(formation, bolts, seed)
+        for bolt in shots:
+            assert formation.collide(bolt) == formation.collide_scan(bolt), repr(bolt)
+
+        def marched(bolt):
+            formation.march(0)
+            return formation.collide(bolt)
+
+        scan = time_per_call(formation.collide_scan, shots)
+        grid = time_per_call(formation.collide, shots)
+        moved = time_per_call(marched, shots) - time_per_call(formation.march, [0]*len(shots))
+        print('%-10s %12.2f %12.2f %8.1fx %14.2f' % ('%dx%d' % (rows, cols), scan*1e6,
+                                                     grid*1e6, scan/grid, moved*1e6))
+
+
+def parse_args(args=None):
+    """ Returns: the command line options of the benchmarks
+
+    Parameter args: the command line arguments, or None for sys.argv
+    Precondition: args is None or a list of strings"""
+    parser = argparse.ArgumentParser(description='Benchmark the Alien Invaders hot paths.')
+    parser.add_argument('--samples', type=int, default=200, help='samples per method')
+    parser.add_argument('--quick', action='store_true', help='only the two smallest sizes')
+    parser.add_argument('--save', metavar='FILE', help='save the results as a baseline')
+    parser.add_argument('--check', metavar='FILE', help='fail if slower than this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown of a median (default 0.25)')
+    parser.add_argument('--floor', type=float, default=FLOOR,
+                        help='allowed slowdown of a median in microseconds (default %g)' % FLOOR)
+    parser.add_argument('--collisions', action='store_true',
+                        help='compare Formation.collide with Formation.collide_scan')
+    return parser.parse_args(args)
+
+
+# Application code
+if __name__ == '__main__':
+    options = parse_args()
+    if options.collisions:
+        # Creating (but not running) the game sets up the paths to the Images folder
+        Invaders(width=GAME_WIDTH,height=GAME_HEIGHT)
+        bench_collisions()
+        sys.exit(0)
+
+    sizes = SIZES[:2] if options.quick else SIZES
+    results = run_suite(sizes, BOLTS, options.samples)
+    report(results, sizes, BOLTS)
+    if options.save:
+        with open(options.save, 'w') as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+        print('saved baseline to %s' % options.save)
+    if options.check:
+        with open(options.check) as file:
+            baseline = json.load(file)
+        slower = check(results, baseline, options.tolerance, options.floor)
+        runs = 1
+        while slower and runs < CHECK_RUNS:
+            print('%d methods slower, running again to rule out noise' % len(slower))
+            results = fastest(results, run_suite(sizes, BOLTS, options.samples))
+            slower = check(results, baseline, options.tolerance, options.floor)
+            runs += 1
+        for key in slower:
+            print('SLOWER: %s p50 %.2f us (baseline %.2f us)' %
+                  (key, results[key]['p50'], baseline[key]['p50']))
+        if slower:
+            sys.exit(1)
+        print('no method is more than %d%% slower than %s' % (options.tolerance*100, options.check))
@@ -60,6 +60,12 @@ ALIENS_IN_ROW  = 12
 ALIEN_IMAGES   = ('alien1.png','alien2.png','alien3.png')
 # the number of seconds (0 < float <= 1) between alien steps
 ALIEN_SPEED = 1.0
+# whether the alien formation keeps its alive flags in a NumPy array (if NumPy is installed)
+FORMATION_NUMPY = True
+# the number of fixed-point units per pixel in the formation offsets (see Formation)
+FORMATION_UNITS = 1000
+# whether the alien formation is drawn as a single GSpriteBatch instead of one GImage per alien
+FORMATION_BATCH = True
 
 
 ### BOLT CONSTANTS ###
@@ -72,6 +78,58 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the most idle bolts to keep for reuse (see BoltPool)
+BOLT_POOL_SIZE = 16
+
+
+### COLLISION CONSTANTS ###
+
+# the width and height of a cell in the collision spatial hash
+COLLISION_CELL = 64
+# the collision layer of the player ship
+LAYER_SHIP   = 1
+# the collision layer of the alien formation
+LAYER_ALIENS = 2
+# the collision layer of the bolts fired by the player
+LAYER_PLAYER_BOLT = 4
+# the collision layer of the bolts fired by the aliens
+LAYER_ALIEN_BOLT  = 8
+
+
+### ENGINE CONSTANTS ###
+
+# the seed for the random numbers of a wave, or None for a different wave every game
+# (a recorded game with no seed picks one, and a replay uses the seed of its recording)
+GAME_SEED = None
+# the number of seconds per update, or None to update once per frame by the frame time
+GAME_TIMESTEP = None
+# the number of seconds per step of a wave run on its own thread, or None to update the wave in update
+# (the thread steps on the time of the computer, so this must be None to record or replay a game)
+GAME_SIMULATION = None
+# whether the view keeps drawn objects between frames and only applies the changes
+GAME_RETAINED = False
+# whether the game sleeps until each frame is due (and skips draws to catch up) instead of spinning
+GAME_PACING = False
+# the file to record the keyboard input of a game to, or None
+GAME_RECORD = None
+# the file to replay the keyboard input of a game from (instead of the keyboard), or None
+GAME_REPLAY = None
+# the texture atlas of the small images (built by game2d/gatlas.py), or None for no atlas
+GAME_ATLAS = None
+# the most bytes of textures to keep loaded, or None for no limit
+GAME_TEXTURE_BUDGET = 32*1024*1024
+# the images drawn on every frame of a wave, which are never dropped from the texture cache
+PINNED_IMAGES = ('Space.png', 'ship.png') + ALIEN_IMAGES
+# the number of copies of each sound effect, so that it can overlap with itself
+SOUND_VOICES = 4
+# the left edge of the bar showing the progress of loading the assets
+LOAD_BAR_LEFT = 200
+# the length of the bar when every asset is loaded
+LOAD_BAR_WIDTH = 400
+# the number of seconds in a tick of the wave scheduler (all wave timers are rounded to ticks)
+TIMER_RESOLUTION = 1/120
+# the number of slots in the timer wheel of the wave scheduler
+TIMER_SLOTS = 256
 
 
 ### GAME CONSTANTS ###
@@ -9,8 +9,19 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
+from .gdigits import GDigits
 from .gsprite import GSprite
 from .gpath import GPath, GTriangle, GPolygon
+from .gbatch import GSpriteBatch
+from .gatlas import GAtlas
+from .gcache import TextureCache
 from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
+from .sound import Sound, SoundLibrary, SoundBank
+from .collision import SpatialHash
+from .grecord import InputRecorder, InputReplay
+from .gprofile import FrameProfiler, RollingHistogram
+from .gpreload import AssetLoader
+from .gtimer import Scheduler, ScheduledEvent
+from .gpacer import FramePacer
+from .gsim import SimulationThread, InputState
 from .app import GameApp
\ No newline at end of file
@@ -7,17 +7,14 @@ The primary class for 2D game support.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-# Basic Kivy Modules
-import kivy
-import kivy.app
-
-# Lower-level kivy modules to support animation
-from kivy.config import Config
-from kivy.clock  import Clock
+# Basic Kivy Modules (or their headless replacements)
+from .backend import App, Config, Clock, resource_add_path, load_image
+from .gcache import TextureCache
 
 import os.path
+from time import perf_counter
 
-class GameApp(kivy.app.App):
+class GameApp(App):
     """
     A controller class for a simple game application.
     
@@ -37,7 +34,31 @@ class GameApp(kivy.app.App):
     thing you should have in this method are calls to ``self.view.draw()``.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    TEXTURE_CACHE = TextureCache()
+    
+    # Class attribute for the files in the Fonts, Sounds and Images folders
+    ASSET_INDEX = {'fonts': set(), 'sounds': set(), 'images': set()}
+    
+    # Class attribute for the texture atlas of the Images folder (None if there is none)
+    ATLAS = None
+    
+    # Class attribute for the most fixed timesteps to run in a single frame
+    MAX_STEPS = 5
+    
+    # Class attribute for the number of threads that preload assets
+    PRELOAD_WORKERS = 4
+    
+    # Class attribute for the most seconds per frame spent finishing preloaded assets
+    PRELOAD_BUDGET = 0.004
+    
+    # Class attribute for the seconds in a tick of the game scheduler
+    SCHEDULER_RESOLUTION = 1/120.0
+    
+    # Class attribute for the seconds that a paced frame spins (not sleeps) before it is due
+    PACING_SPIN = 0.002
+    
+    # Class attribute for the most draws in a row that a paced game skips to catch up
+    PACING_SKIPS = 2
     
     
     # MUTABLE ATTRIBUTES
@@ -58,9 +79,12 @@ class GameApp(kivy.app.App):
     def fps(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value > 0, 'value %s is not positive' % repr(value)
-        Clock.unschedule(self._refresh)
         self._fps = value
-        Clock.schedule_interval(self._refresh,1.0/self._fps)
+        if self._pacer is not None:
+            self._pacer.target = 1.0/self._fps
+        else:
+            Clock.unschedule(self._tick)
+            Clock.schedule_interval(self._tick,1.0/self._fps)
     
     
     # IMMUTABLE PROPERTIES
@@ -82,6 +106,103 @@ class GameApp(kivy.app.App):
         """
         return self._gheight
     
+    @property
+    def timestep(self):
+        """
+        The fixed number of seconds for each call to ``update``, or None.
+        
+        If this value is None (the default), ``update`` is called once per animation
+        frame with the time since the last frame, which varies from frame to frame.
+        Otherwise, the elapsed time is collected in an accumulator and ``update`` is
+        called with exactly this value as many times as fit (at most ``MAX_STEPS`` a
+        frame; if the game falls further behind, the extra time is dropped).  The
+        game then plays out the same way on every run and on every machine.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @property
+    def seed(self):
+        """
+        The seed for the random numbers of this game, or None.
+        
+        The game should seed its random number generators with this value (if it is
+        not None), so that a recording plays out the same way when it is replayed.  A
+        recording keeps the seed, and a replay sets this value from the recording.  If 
+        a recorded game was given no seed, it picks one at random.
+        
+        **Invariant**: Must be None or an int >= 0.
+        """
+        return self._seed
+    
+    @property
+    def profiler(self):
+        """
+        The frame timing profiler, or None if the game is not profiled.
+        
+        To profile a game, create it with the keyword ``profile``.  See the class
+        :class:`FrameProfiler` for the statistics it collects.
+        
+        **Invariant**: Must be None or an instance of :class:`FrameProfiler`.
+        """
+        return self._profiler
+    
+    @property
+    def pacer(self):
+        """
+        The frame pacer, or None if the game is not paced.
+        
+        To pace a game, create it with the keyword ``pacing``.  A paced game waits for
+        each frame itself, sleeping until it is due, instead of running as fast as the
+        clock allows.  When it falls behind, it skips ``draw`` (but never ``update``)
+        for a few frames.  See the class :class:`FramePacer` for the late and skipped
+        frame counters.
+        
+        **Invariant**: Must be None or an instance of :class:`FramePacer`.
+        """
+        return self._pacer
+    
+    @property
+    def assets(self):
+        """
+        The asset preloader of this game.
+        
+        Add the images, fonts and sounds of the game to the preloader in the method
+        ``start``.  They are loaded in the background while the game runs, and the
+        attribute ``ready`` of the preloader is True once they are all loaded.  See 
+        the class :class:`AssetLoader` for more information.
+        
+        The preloader is made the first time this attribute is used, so a game that 
+        preloads nothing has no worker threads and never polls for assets.
+        
+        **Invariant**: Must be an instance of :class:`AssetLoader`.
+        """
+        if self._assets is None:
+            from .gpreload import AssetLoader
+            self._assets = AssetLoader(self.PRELOAD_WORKERS)
+        return self._assets
+    
+    @property
+    def scheduler(self):
+        """
+        The scheduler for timed events of this game.
+        
+        The scheduler runs on game time.  It advances just before every call to
+        ``update``, by the same ``dt``, so its events follow a fixed timestep or a 
+        replay, and they run before the update in which they are due.  See the class 
+        :class:`Scheduler` for more information.
+        
+        The scheduler is made the first time this attribute is used, so a game with no
+        timed events does not advance one.
+        
+        **Invariant**: Must be an instance of :class:`Scheduler`.
+        """
+        if self._scheduler is None:
+            from .gtimer import Scheduler
+            self._scheduler = Scheduler(self.SCHEDULER_RESOLUTION)
+        return self._scheduler
+    
     @property
     def view(self):
         """
@@ -102,7 +223,9 @@ class GameApp(kivy.app.App):
         Use this attribute to get information about the mouse and keyboard.  See the
         class :class:`GInput` for more information.
         
-        **Invariant**: Must be instance of :class:`GInput`
+        When the game replays a recording, this is the :class:`InputReplay` instead.
+        
+        **Invariant**: Must be instance of :class:`GInput` or :class:`InputReplay`
         """
         return self._input
     
@@ -112,7 +235,7 @@ class GameApp(kivy.app.App):
         """
         Checks if ``name`` refers to an image file
     
-        The method searches the **Images** folder for the given file name.
+        The method looks up the file name in the index of the **Images** folder.
     
         :param name: The file name
         :type name:  ``str``
@@ -123,14 +246,14 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
     
-        return os.path.exists(cls.images+'/'+name)
+        return name in cls.ASSET_INDEX['images'] or cls._find_asset('images',name)
     
     @classmethod
     def is_font(cls,name):
         """
         Checks if ``name`` refers to a font file
         
-        The method searches the **Fonts** folder for the given file name.
+        The method looks up the file name in the index of the **Fonts** folder.
         
         :param name: The file name
         :type name:  ``str``
@@ -141,14 +264,14 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
         
-        return os.path.exists(cls.fonts+'/'+name)
+        return name in cls.ASSET_INDEX['fonts'] or cls._find_asset('fonts',name)
     
     @classmethod
     def is_sound(cls,name):
         """
         Checks if ``name`` refers to a sound file
         
-        The method searches the **Sounds** folder for the given file name.
+        The method looks up the file name in the index of the **Sounds** folder.
         
         :param name: The file name
         :type name:  ``str``
@@ -159,7 +282,7 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
         
-        return os.path.exists(os.path.join(cls.sounds,name))
+        return name in cls.ASSET_INDEX['sounds'] or cls._find_asset('sounds',name)
     
     @classmethod
     def load_texture(cls,name):
@@ -168,7 +291,12 @@ class GameApp(kivy.app.App):
         
         The ``name`` must refer to the file in the **Images** folder.  If the texture
         has already been loaded, it will return the cached texture.  Otherwise, it will
-        load the texture and cache it before returning it.
+        load the texture and cache it before returning it.  If the game has an atlas
+        with this file (see the attribute ``ATLAS``), the texture is a region of an 
+        atlas page instead.
+        
+        The cache has a budget in bytes (see :class:`TextureCache`), so a texture that 
+        has not been used in a while may have to be loaded again.
         
         This method will crash if name is not a valid file.
         
@@ -176,13 +304,16 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            return cls.TEXTURE_CACHE[name]
+        texture = cls.TEXTURE_CACHE.get(name)
+        if texture is not None or name in cls.TEXTURE_CACHE:
+            return texture
         
         try:
-            from kivy.core.image import Image
-            texture = Image(name).texture
-            cls.TEXTURE_CACHE[name] = texture
+            if cls.ATLAS is not None and name in cls.ATLAS:
+                texture = cls.ATLAS.texture(name)
+            else:
+                texture = load_image(name)
+            cls._cache_texture(name,texture)
         except:
             texture = None
         
@@ -201,12 +332,93 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            texture = cls.TEXTURE_CACHE[name]
-            del cls.TEXTURE_CACHE[name]
-            return texture
+        return cls.TEXTURE_CACHE.pop(name)
+    
+    @classmethod
+    def pin_texture(cls,name):
+        """
+        Keeps the texture for the given file name in the texture cache.
         
-        return None
+        Pin the textures that the game draws all the time, so that loading other 
+        textures never evicts them.  Each call needs its own call to ``unpin_texture``.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        cls.TEXTURE_CACHE.pin(name)
+    
+    @classmethod
+    def unpin_texture(cls,name):
+        """
+        Allows the texture for the given file name to be evicted again.
+        
+        :param name: The file name
+        :type name:  ``str``, pinned with ``pin_texture``
+        """
+        assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        cls.TEXTURE_CACHE.unpin(name)
+    
+    @classmethod
+    def index_assets(cls):
+        """
+        Rebuilds the index of the files in the **Fonts**, **Sounds** and **Images** folders.
+        
+        The index is built when the game is created.  Files added to the folders later 
+        are found anyway (and then added to the index), so this is only needed after 
+        files are removed.
+        """
+        for kind in ('fonts','sounds','images'):
+            folder = getattr(cls,kind)
+            files = set()
+            for root, dirs, names in os.walk(folder):
+                prefix = os.path.relpath(root,folder)
+                for name in names:
+                    files.add(name if prefix == '.' else prefix.replace(os.sep,'/')+'/'+name)
+            cls.ASSET_INDEX[kind] = files
+    
+    @classmethod
+    def _find_asset(cls,kind,name):
+        """
+        Checks for a file that is not in the asset index, adding it if it exists.
+        
+        :param kind: The asset folder
+        :type kind:  one of ``'fonts'``, ``'sounds'`` or ``'images'``
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :return: True if the file exists
+        :rtype:  ``bool``
+        """
+        if not os.path.isfile(os.path.join(getattr(cls,kind),name)):
+            return False
+        cls.ASSET_INDEX[kind].add(name)
+        return True
+    
+    @classmethod
+    def _cache_texture(cls,name,texture):
+        """
+        Adds a texture to the texture cache, with its size in bytes.
+        
+        Regions of the atlas cost nothing, since the atlas keeps their pages.  If the
+        texture is missing (as with the headless backend), the size comes from the 
+        image file.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param texture: The texture for the file
+        :type texture:  a texture or None
+        """
+        from .gatlas import image_size
+        size = None
+        if cls.ATLAS is not None and name in cls.ATLAS:
+            size = 0
+        elif texture is None:
+            dims = image_size(os.path.join(cls.images,name))
+            size = 0 if dims is None else dims[0]*dims[1]*4
+        cls.TEXTURE_CACHE.put(name,texture,size)
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -220,6 +432,42 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        To call ``update`` with a fixed time step instead of the frame time (see the 
+        attribute :attr:`timestep`), add the keyword ``timestep``, as in
+        ``GameApp(width=400,height=400,timestep=1/60)``.
+        
+        To record the keyboard input of every update to a file, add the keyword 
+        ``record`` with the file name.  To play back such a file instead of reading the
+        keyboard, add the keyword ``replay`` with the file name.  A replay calls 
+        ``update`` once per frame with the recorded ``dt``, and stops the game at the 
+        end of the recording.  See the module :mod:`grecord` for the details.  Give the
+        seed of the random numbers of the game with the keyword ``seed`` (see the
+        attribute :attr:`seed`).
+        
+        To keep the drawn objects on the canvas between frames, and only apply the 
+        changes, add the keyword ``retained`` with the value True (see the attribute 
+        ``retained`` of :class:`GView`).  The methods ``update`` and ``draw`` work the
+        same either way.
+        
+        To load the small images from a texture atlas in the **Images** folder (see the
+        module :mod:`gatlas`), add the keyword ``atlas`` with the name of the atlas file.
+        The images are still given by their own file names.
+        
+        To limit the memory of the cached textures, add the keyword ``texture_budget``
+        with the most bytes to keep (see :class:`TextureCache`).
+        
+        To run a callback after a delay (or every so often) in game time, use the
+        attribute :attr:`scheduler`.
+        
+        To collect frame timings (see the attribute :attr:`profiler`), add the keyword
+        ``profile``.  If its value is a file name, the timings are saved to that file 
+        (as JSON) when the game stops.  If it is True, they are printed instead.  
+        Without this keyword, the game runs with no instrumentation at all.
+        
+        To hold the game to its ``fps`` without keeping a core busy (see the attribute
+        :attr:`pacer`), add the keyword ``pacing`` with the value True.  The counters
+        of the pacer are printed with the timings of a profiled game.
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -232,22 +480,74 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('timestep', None)
+        r = keywords.pop('record', None)
+        p = keywords.pop('replay', None)
+        s = keywords.pop('seed', None)
+        q = keywords.pop('profile', None)
+        k = keywords.pop('retained', False)
+        a = keywords.pop('atlas', None)
+        b = keywords.pop('texture_budget', None)
+        g = keywords.pop('pacing', False)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert t is None or type(t) in [int,float], 'timestep %s is not a number' % repr(t)
+        assert t is None or t > 0, 'timestep %s is not positive' % repr(t)
+        assert r is None or type(r) == str, 'record %s is not a file name' % repr(r)
+        assert p is None or type(p) == str, 'replay %s is not a file name' % repr(p)
+        assert s is None or (type(s) == int and s >= 0), 'seed %s is not valid' % repr(s)
+        assert q is None or type(q) in [bool,str], 'profile %s is not a bool or file name' % repr(q)
+        assert type(k) == bool, 'retained %s is not a bool' % repr(k)
+        assert a is None or type(a) == str, 'atlas %s is not a file name' % repr(a)
+        assert b is None or (type(b) == int and b >= 0), 'texture_budget %s is not valid' % repr(b)
+        assert type(g) == bool, 'pacing %s is not a bool' % repr(g)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._timestep = t
+        self._lag = 0.0
+        self._record = r
+        self._replay = p
+        self._recorder = None
+        self._seed = s
+        self._retained = k
+        self._assets = None
+        self._scheduler = None
+        
+        # Only profile or pace if asked, since even the test for it would cost every frame
+        self._profile = q
+        if g:
+            from .gpacer import FramePacer
+            self._pacer = FramePacer(1.0/f,self.PACING_SPIN,self.PACING_SKIPS)
+        else:
+            self._pacer = None
+        if q:
+            from .gprofile import FrameProfiler
+            self._profiler = FrameProfiler(1.0/min(f,60))
+            self._frame = self._refresh_profiled
+        elif g:
+            self._profiler = None
+            self._frame = self._refresh_paced
+        else:
+            self._profiler = None
+            self._frame = self._refresh
+        self._tick = self._frame
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
         self._setpaths()
+        GameApp.index_assets()
+        GameApp.TEXTURE_CACHE.budget = b
+        if a is not None:
+            from .gatlas import GAtlas
+            GameApp.ATLAS = GAtlas(os.path.join(GameApp.images,a))
         
         # Tell Kivy to build the application
-        kivy.app.App.__init__(self,**keywords)
+        App.__init__(self,**keywords)
     
     
     # PUBLIC METHODS
@@ -259,10 +559,23 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         from .gview import GInput, GView
+        from .grecord import InputRecorder, InputReplay
         self._view = GView()
         self._view.size_hint = (1,1)
-        self._input = GInput()
-        self._input._register(self._view)
+        self._view.retained = self._retained
+        if self._replay is None:
+            self._input = GInput()
+            self._input._register(self._view)
+        else:
+            self._input = InputReplay(self._replay)
+            if self._input.seed is not None:
+                self._seed = self._input.seed
+        if self._record is not None:
+            if self._seed is None:
+                # Otherwise the recording could not be replayed with the same random numbers
+                import random
+                self._seed = random.randrange(2**32)
+            self._recorder = InputRecorder(self._record,seed=self._seed)
         return self.view
     
     def run(self):
@@ -273,7 +586,7 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         Clock.schedule_once(self._bootstrap,-1)
-        kivy.app.App.run(self)
+        App.run(self)
     
     def stop(self):
         """
@@ -283,7 +596,18 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
-        kivy.app.App.stop(self)
+        if self._assets is not None:
+            self._assets.shutdown()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._profiler is not None:
+            if type(self._profile) == str:
+                self._profiler.dump(self._profile)
+            else:
+                print(self._profiler.report())
+                if self._pacer is not None:
+                    print(self._pacer.report())
+        App.stop(self)
         sys.exit(0)
     
     def start(self):
@@ -331,13 +655,24 @@ class GameApp(kivy.app.App):
         Bootstraps the clock scheduler for the game..
         
         This method is a callback-proxy for method `start`.  It handles important issues 
-        behind the scenes, particularly with setting the FPS
+        behind the scenes, particularly with setting the FPS.  If `start` added any
+        game assets to the preloader, it starts loading them, and the frames poll the
+        preloader until they are loaded.
+        
+        A game that is recorded, replayed or run with a fixed timestep must play out the
+        same way every time, so it cannot depend on how fast the worker threads load the
+        assets.  In that case, every asset is loaded here, before the first ``update``.
         """
-        if (self.fps < 60):
-            Clock.schedule_interval(self._refresh,1.0/self.fps)
-        else:
-            Clock.schedule_interval(self._refresh,0)
+        self._schedule(self._tick)
         self.start()
+        if self._assets is not None:
+            if self._record is None and self._replay is None and self._timestep is None:
+                self._assets.start()
+                self._schedule(self._refresh_loading)
+            else:
+                self._assets.wait()
+        if self._pacer is not None:
+            self._pacer.reset()
     
     def _refresh(self,dt):
         """
@@ -350,8 +685,128 @@ class GameApp(kivy.app.App):
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.update(dt)
+        self._advance(dt)
         self.draw()
+        self.view._commit()
+    
+    def _refresh_paced(self,dt):
+        """
+        Processes a single animation frame once it is due, drawing it if there is time.
+        
+        This method replaces `_refresh` when the game is paced.  The view is only 
+        cleared if the frame is drawn, so a skipped frame leaves the last frame on
+        the screen.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        render = self._pacer.wait()
+        if render:
+            self.view.clear()
+        self._advance(dt)
+        if render:
+            self.draw()
+            self.view._commit()
+    
+    def _refresh_profiled(self,dt):
+        """
+        Processes a single animation frame, recording its timings in the profiler.
+        
+        This method replaces `_refresh` when the game is profiled.  If the game is also
+        paced, the wait for the frame is not part of its timings.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        render = self._pacer is None or self._pacer.wait()
+        start = perf_counter()
+        if render:
+            self.view.clear()
+        cleared = perf_counter()
+        self._advance(dt)
+        updated = perf_counter()
+        if render:
+            self.draw()
+            self.view._commit()
+        drawn = perf_counter()
+        self._profiler.record(dt,cleared-start,updated-cleared,drawn-updated,
+                              self.view.instructions,self.view.churn)
+    
+    def _refresh_loading(self,dt):
+        """
+        Processes a single animation frame while the game assets are loading.
+        
+        This method replaces the usual refresh method until the preloader is ready.  It
+        finishes loaded assets for at most ``PRELOAD_BUDGET`` seconds, and then processes
+        the frame as usual.  Once every asset is loaded, the clock calls the usual 
+        method again, so the frames of a loaded game never check the preloader.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        self._assets.poll(self.PRELOAD_BUDGET)
+        self._frame(dt)
+        if self._assets.ready:
+            self._schedule(self._frame)
+    
+    def _advance(self,dt):
+        """
+        Updates the game for a single animation frame.
+        
+        Depending on the game settings, this either calls ``update`` once with ``dt``,
+        once with the next recorded ``dt`` of a replay, or as many times as fit with the
+        fixed ``timestep``.  The game stops once a replay is finished.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._replay is not None:
+            if self.input.finished:
+                self.stop()
+                return
+            self._step(self.input.advance())
+        elif self._timestep is None:
+            self._step(dt)
+        else:
+            self._lag += dt
+            steps = 0
+            while self._lag >= self._timestep and steps < self.MAX_STEPS:
+                self._step(self._timestep)
+                self._lag -= self._timestep
+                steps += 1
+            if self._lag >= self._timestep:
+                self._lag = 0.0
+    
+    def _step(self,dt):
+        """
+        Updates the game once, recording the input if necessary.
+        
+        The scheduler runs the events that come due before ``update`` is called.
+        
+        :param dt: time in seconds given to update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._recorder is not None:
+            self._recorder.record(self.input,dt)
+        if self._scheduler is not None:
+            self._scheduler.advance(dt)
+        self.update(dt)
+    
+    def _schedule(self,tick):
+        """
+        Makes the clock call the given method for each frame, instead of the last one.
+        
+        A paced game is called on every clock frame, since the pacer does the waiting.
+        
+        :param tick: the method to call for each frame
+        :type tick:  bound method (with the time since the last frame)
+        """
+        Clock.unschedule(self._tick)
+        self._tick = tick
+        if (self.fps < 60 and self._pacer is None):
+            Clock.schedule_interval(self._tick,1.0/self.fps)
+        else:
+            Clock.schedule_interval(self._tick,0)
     
     def _setpaths(self):
         """
@@ -369,8 +824,7 @@ class GameApp(kivy.app.App):
         GameApp.sounds = str(os.path.join(path, 'Sounds'))
         GameApp.images = str(os.path.join(path, 'Images'))
         
-        import kivy.resources
-        kivy.resources.resource_add_path(GameApp.fonts)
-        kivy.resources.resource_add_path(GameApp.sounds)
-        kivy.resources.resource_add_path(GameApp.images)
+        resource_add_path(GameApp.fonts)
+        resource_add_path(GameApp.sounds)
+        resource_add_path(GameApp.images)
 
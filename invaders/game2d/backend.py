@@ -0,0 +1,82 @@
+"""
+The rendering backend for 2D game support.
+
+Every other module in game2d gets its Kivy classes from this module, rather than from
+Kivy directly.  That way the whole package can be switched to a different backend.
+
+There are two backends.  The ``kivy`` backend (the default) draws in a Kivy window.
+The ``headless`` backend has the same classes and the same geometry, but it never
+opens a window, touches the GPU, or loads textures and sounds.  Use it to run game
+code in batch jobs and benchmarks on machines without a display.
+
+To choose a backend, set the environment variable ``GAME2D_BACKEND`` before game2d is
+imported.  For example::
+
+    GAME2D_BACKEND=headless python invaders/bench.py
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import os
+
+#: The name of the active backend ('kivy' or 'headless')
+BACKEND = os.environ.get('GAME2D_BACKEND','kivy')
+assert BACKEND in ('kivy','headless'), '%s is not a valid game2d backend' % repr(BACKEND)
+
+#: Whether the active backend is headless
+HEADLESS = BACKEND == 'headless'
+
+if HEADLESS:
+    from .headless import *
+else:
+    from kivy.graphics import *
+    from kivy.graphics.instructions import *
+    from kivy.app import App
+    from kivy.config import Config
+    from kivy.clock import Clock
+    from kivy.uix.floatlayout import FloatLayout
+    from kivy.uix.label import Label
+    from kivy.metrics import dp
+    from kivy.core.audio import SoundLoader
+    from kivy.resources import resource_add_path
+
+    def get_window():
+        """
+        :return: The Kivy application window.
+
+        The window is imported on demand, since importing it opens the window.
+        """
+        from kivy.core.window import Window
+        return Window
+
+    def load_image(name):
+        """
+        :return: The texture for the given image file.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        from kivy.core.image import Image
+        return Image(name).texture
+
+    def decode_image(filename):
+        """
+        :return: The decoded pixels of the given image file.
+
+        This function does not touch the GPU, so it is safe to call on any thread.  Use
+        :func:`upload_image` (on the main thread) to make a texture from the result.
+
+        :param filename: The path to the file
+        :type filename:  ``str``
+        """
+        from kivy.core.image import ImageLoader
+        return ImageLoader.load(filename)
+
+    def upload_image(data):
+        """
+        :return: The texture for image data made by :func:`decode_image`.
+
+        :param data: The decoded image
+        :type data:  the result of :func:`decode_image`
+        """
+        return None if data is None else data.texture
@@ -0,0 +1,279 @@
+"""
+Broad-phase collision support for 2D games.
+
+This module provides a uniform spatial hash.  The hash divides the plane into square
+cells and remembers which objects overlap which cells.  Two objects can only collide
+if they share a cell, so the hash can find all of the colliding pairs in a frame
+without testing every object against every other object.
+
+Every object in the hash belongs to a collision layer and has a collision mask.  Both
+are bit sets (ints).  An object only looks for objects whose layer is in its mask, so
+that (for example) player bolts look for aliens while alien bolts look for the ship.
+Objects with a mask of 0, like walls or targets, are never checked against anything
+themselves; they are only found by other objects.
+
+The hash is only a broad phase.  It compares bounding boxes, and the game should make
+its own exact test on each pair that it returns.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import math
+
+
+class SpatialHash(object):
+    """
+    A class representing a uniform spatial hash of game objects.
+
+    Objects are usually instances of :class:`GObject`, in which case the hash uses their
+    ``left``, ``right``, ``bottom`` and ``top`` attributes as the bounding box.  Any other
+    (hashable) object may be inserted as well, provided that you give its bounding box
+    explicitly as a tuple ``(left, bottom, right, top)``.
+
+    The hash does not notice when an object moves.  You must call :meth:`update` after
+    moving an object, or it will be found in its old position.  Updating an object that
+    has not left its cells is cheap.
+
+    To find the collisions in a frame, call :meth:`pairs` once.  It checks every object
+    with a nonzero mask against the objects in the cells that it overlaps.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width and height of a single cell.
+
+        For best performance, this should be a bit larger than the typical object.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._cellsize
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize=64):
+        """
+        Creates a new, empty spatial hash.
+
+        :param cellsize: The width and height of a single cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], 'cellsize %s is not a number' % repr(cellsize)
+        assert cellsize > 0, 'cellsize %s is not positive' % repr(cellsize)
+        self._cellsize = cellsize
+        self._cells   = {}
+        self._entries = {}
+        self._active  = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects in this hash.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._entries)
+
+    def __contains__(self,obj):
+        """
+        :return: True if obj is in this hash
+        :rtype:  ``bool``
+        """
+        return obj in self._entries
+
+    def __iter__(self):
+        """
+        :return: The iterator for the objects in this hash.
+        :rtype:  ``iterable``
+        """
+        return iter(self._entries.keys())
+
+
+    # PUBLIC METHODS
+    def insert(self,obj,layer=1,mask=0,box=None):
+        """
+        Inserts an object into this hash.
+
+        If the object is already in the hash, it is updated with the new layer, mask
+        and bounding box.
+
+        :param obj: The object to insert
+        :type obj:  :class:`GObject` or any hashable value if ``box`` is given
+
+        :param layer: The collision layer(s) of this object
+        :type layer:  ``int`` >= 0
+
+        :param mask: The collision layers that this object looks for
+        :type mask:  ``int`` >= 0
+
+        :param box: The bounding box (left, bottom, right, top), or None to use obj
+        :type box:  4-element tuple of numbers or ``None``
+        """
+        assert type(layer) == int and layer >= 0, 'layer %s is not valid' % repr(layer)
+        assert type(mask) == int and mask >= 0, 'mask %s is not valid' % repr(mask)
+        if obj in self._entries:
+            self.remove(obj)
+
+        box = self._bounds(obj) if box is None else tuple(box)
+        keys = self._keys(box)
+        self._entries[obj] = [layer,mask,box,keys]
+        for key in keys:
+            if key in self._cells:
+                self._cells[key].append(obj)
+            else:
+                self._cells[key] = [obj]
+        if mask:
+            self._active[obj] = None
+
+    def update(self,obj,box=None):
+        """
+        Updates the position of an object in this hash.
+
+        Call this method whenever the object moves.
+
+        :param obj: The object to update
+        :type obj:  any object in this hash
+
+        :param box: The bounding box (left, bottom, right, top), or None to use obj
+        :type box:  4-element tuple of numbers or ``None``
+        """
+        entry = self._entries[obj]
+        box = self._bounds(obj) if box is None else tuple(box)
+        entry[2] = box
+        keys = self._keys(box)
+        if keys != entry[3]:
+            self._unlink(obj,entry[3])
+            for key in keys:
+                if key in self._cells:
+                    self._cells[key].append(obj)
+                else:
+                    self._cells[key] = [obj]
+            entry[3] = keys
+
+    def remove(self,obj):
+        """
+        Removes an object from this hash.
+
+        Removing an object that is not in the hash does nothing.
+
+        :param obj: The object to remove
+        :type obj:  any object
+        """
+        if not obj in self._entries:
+            return
+        entry = self._entries.pop(obj)
+        self._unlink(obj,entry[3])
+        self._active.pop(obj,None)
+
+    def clear(self):
+        """
+        Removes every object from this hash.
+        """
+        self._cells.clear()
+        self._entries.clear()
+        self._active.clear()
+
+    def query(self,box,mask=-1):
+        """
+        Returns: the list of objects whose bounding boxes overlap the given box.
+
+        Only objects whose layer is in ``mask`` are returned.
+
+        :param box: The bounding box (left, bottom, right, top) to search
+        :type box:  4-element tuple of numbers
+
+        :param mask: The collision layers to look for (-1 for all of them)
+        :type mask:  ``int``
+        """
+        result = []
+        seen = set()
+        for key in self._keys(box):
+            for other in self._cells.get(key,()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                entry = self._entries[other]
+                if entry[0] & mask and self._overlaps(box,entry[2]):
+                    result.append(other)
+        return result
+
+    def pairs(self):
+        """
+        Returns: the list of all colliding pairs in this hash.
+
+        Each pair is a tuple ``(a, b)`` where the mask of ``a`` includes the layer of
+        ``b`` and the two bounding boxes overlap.  If the masks of two objects include
+        each other's layers, then the pair is reported in both orders.
+
+        This is the broad phase.  Each pair should still be given an exact test.
+        """
+        result = []
+        for obj in self._active:
+            layer, mask, box, keys = self._entries[obj]
+            seen = set()
+            for key in keys:
+                for other in self._cells[key]:
+                    if other is obj or other in seen:
+                        continue
+                    seen.add(other)
+                    entry = self._entries[other]
+                    if entry[0] & mask and self._overlaps(box,entry[2]):
+                        result.append((obj,other))
+        return result
+
+
+    # HIDDEN METHODS
+    def _bounds(self,obj):
+        """
+        Returns: the bounding box (left, bottom, right, top) of a game object
+
+        :param obj: The object to measure
+        :type obj:  :class:`GObject`
+        """
+        return (obj.left,obj.bottom,obj.right,obj.top)
+
+    def _keys(self,box):
+        """
+        Returns: the tuple of cells overlapped by the given bounding box
+
+        :param box: The bounding box (left, bottom, right, top)
+        :type box:  4-element tuple of numbers
+        """
+        size = self._cellsize
+        x0 = math.floor(box[0]/size)
+        y0 = math.floor(box[1]/size)
+        x1 = math.floor(box[2]/size)
+        y1 = math.floor(box[3]/size)
+        if x0 == x1 and y0 == y1:
+            return ((x0,y0),)
+        return tuple((x,y) for x in range(x0,x1+1) for y in range(y0,y1+1))
+
+    def _unlink(self,obj,keys):
+        """
+        Removes an object from the given cells, deleting any cells left empty.
+
+        :param obj: The object to remove
+        :type obj:  any object in this hash
+
+        :param keys: The cells to remove it from
+        :type keys:  tuple of cells
+        """
+        for key in keys:
+            cell = self._cells[key]
+            cell.remove(obj)
+            if not cell:
+                del self._cells[key]
+
+    def _overlaps(self,box1,box2):
+        """
+        Returns: True if the two bounding boxes overlap
+
+        :param box1: The first bounding box (left, bottom, right, top)
+        :type box1:  4-element tuple of numbers
+
+        :param box2: The second bounding box (left, bottom, right, top)
+        :type box2:  4-element tuple of numbers
+        """
+        return (box1[0] <= box2[2] and box2[0] <= box1[2] and
+                box1[1] <= box2[3] and box2[1] <= box1[3])
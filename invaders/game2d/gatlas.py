@@ -0,0 +1,438 @@
+"""
+Texture atlases for 2D game support.
+
+Every image file loaded by :class:`GameApp` is normally its own texture, so drawing a
+ship, some aliens and a filmstrip switches textures several times a frame.  An atlas
+packs many small images into one large image (a page), and each original image becomes
+a region of that page.  A :class:`GAtlas` loads such an atlas, and :class:`GameApp`
+uses it to resolve image files to regions without any change to :class:`GImage`,
+:class:`GSprite` or :class:`GSpriteBatch`.
+
+Atlases are built ahead of time with :func:`build_atlas`, or from the command line::
+
+    GAME2D_BACKEND=headless python -m game2d.gatlas Images sprites
+
+run from the folder with the game2d package.  The atlas is written in the Kivy atlas
+format: a JSON file ``<name>.atlas`` that maps each page file to the regions on it::
+
+    {"<name>-0.png": {"ship": [x, y, width, height], ...}, ...}
+
+where a region is named by its image file without the extension, and ``y`` counts from
+the bottom of the page.  Only PNG files with 8 bits per channel and no interlacing
+(RGB or RGBA) are packed.  Images larger than the size limit, such as backgrounds, are
+left out, and are still loaded as their own textures.  Rebuild the atlas whenever the
+images change; a region whose image no longer has the same size is ignored.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import json
+import os
+import struct
+import zlib
+
+#: The largest width or height of an image packed in an atlas
+ATLAS_LIMIT = 256
+
+#: The width of the pages of an atlas (the height is as small as the images allow)
+ATLAS_SIZE = 512
+
+# The first bytes of every PNG file
+_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+# #mark PNG Files
+def image_size(filename):
+    """
+    :return: The size of a PNG file as a (width, height) pair, or None if not a PNG file.
+
+    Only the header of the file is read.
+
+    :param filename: The file name
+    :type filename:  ``str``
+    """
+    with open(filename,'rb') as file:
+        data = file.read(24)
+    if len(data) < 24 or data[:8] != _SIGNATURE or data[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II',data[16:24])
+
+
+def read_png(filename):
+    """
+    :return: The size and pixels of a PNG file, as a triple (width, height, rows).
+
+    The rows are ``bytearray`` objects of RGBA pixels, from the top of the image down.
+    Only 8 bits per channel, RGB or RGBA, without interlacing are supported.
+
+    :param filename: The file name
+    :type filename:  ``str``
+    """
+    with open(filename,'rb') as file:
+        data = file.read()
+    if data[:8] != _SIGNATURE:
+        raise ValueError('%s is not a PNG file' % repr(filename))
+
+    header = None
+    chunks = []
+    pos = 8
+    while pos+8 <= len(data):
+        size, kind = struct.unpack('>I4s',data[pos:pos+8])
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB',data[pos+8:pos+21])
+        elif kind == b'IDAT':
+            chunks.append(data[pos+8:pos+8+size])
+        elif kind == b'IEND':
+            break
+        pos += 12+size
+
+    if header is None:
+        raise ValueError('%s has no PNG header' % repr(filename))
+    width, height, depth, color, compress, filter, interlace = header
+    if depth != 8 or color not in (2,6) or interlace:
+        raise ValueError('%s is not an 8-bit RGB or RGBA PNG file' % repr(filename))
+
+    channels = 4 if color == 6 else 3
+    stride = width*channels
+    raw = zlib.decompress(b''.join(chunks))
+    rows = []
+    prior = bytearray(stride)
+    for row in range(height):
+        start = row*(stride+1)
+        line = bytearray(raw[start+1:start+1+stride])
+        _unfilter(raw[start],line,prior,channels)
+        prior = line
+        if channels == 3:
+            line = bytearray(width*4)
+            line[0::4] = prior[0::3]
+            line[1::4] = prior[1::3]
+            line[2::4] = prior[2::3]
+            line[3::4] = b'\xff'*width
+        rows.append(line)
+    return (width,height,rows)
+
+
+def write_png(filename,width,height,rows):
+    """
+    Writes RGBA pixels to a PNG file.
+
+    :param filename: The file name
+    :type filename:  ``str``
+
+    :param width: The image width in pixels
+    :type width:  ``int`` > 0
+
+    :param height: The image height in pixels
+    :type height:  ``int`` > 0
+
+    :param rows: The rows of RGBA pixels, from the top of the image down
+    :type rows:  ``list`` of ``height`` byte strings of ``4*width`` bytes
+    """
+    def chunk(kind,body):
+        return struct.pack('>I',len(body))+kind+body+struct.pack('>I',zlib.crc32(kind+body))
+
+    raw = b''.join(b'\x00'+bytes(row) for row in rows)
+    with open(filename,'wb') as file:
+        file.write(_SIGNATURE)
+        file.write(chunk(b'IHDR',struct.pack('>IIBBBBB',width,height,8,6,0,0,0)))
+        file.write(chunk(b'IDAT',zlib.compress(raw,9)))
+        file.write(chunk(b'IEND',b''))
+
+
+def _unfilter(kind,line,prior,step):
+    """
+    Undoes the PNG filter of a single row, in place.
+
+    :param kind: The filter type of the row
+    :type kind:  ``int`` in 0..4
+
+    :param line: The filtered row
+    :type line:  ``bytearray``
+
+    :param prior: The row above, already unfiltered (all zeroes for the first row)
+    :type prior:  ``bytearray``
+
+    :param step: The number of bytes per pixel
+    :type step:  ``int`` > 0
+    """
+    if kind == 1:
+        for ii in range(step,len(line)):
+            line[ii] = (line[ii]+line[ii-step]) & 0xff
+    elif kind == 2:
+        for ii in range(len(line)):
+            line[ii] = (line[ii]+prior[ii]) & 0xff
+    elif kind == 3:
+        for ii in range(len(line)):
+            left = line[ii-step] if ii >= step else 0
+            line[ii] = (line[ii]+((left+prior[ii]) >> 1)) & 0xff
+    elif kind == 4:
+        for ii in range(len(line)):
+            a = line[ii-step] if ii >= step else 0
+            b = prior[ii]
+            c = prior[ii-step] if ii >= step else 0
+            p = a+b-c
+            pa, pb, pc = abs(p-a), abs(p-b), abs(p-c)
+            if pa <= pb and pa <= pc:
+                pred = a
+            elif pb <= pc:
+                pred = b
+            else:
+                pred = c
+            line[ii] = (line[ii]+pred) & 0xff
+    elif kind != 0:
+        raise ValueError('%s is not a PNG filter type' % repr(kind))
+
+
+# #mark -
+# #mark Atlas Building
+def build_atlas(folder,name,size=ATLAS_SIZE,limit=ATLAS_LIMIT,padding=2):
+    """
+    Packs the small PNG files of a folder into an atlas in the same folder.
+
+    The images are placed on shelves, tallest first.  Each image is surrounded by
+    ``padding`` pixels, and the pixels on its edge are copied into the first of them,
+    so that filtering at the edge of a region never picks up its neighbors.  When a
+    page is full, a new page is started.
+
+    :param folder: The folder with the images
+    :type folder:  ``str``
+
+    :param name: The name of the atlas (without extension)
+    :type name:  ``str``
+
+    :param size: The width of each page
+    :type size:  ``int`` > 0
+
+    :param limit: The largest width or height of a packed image
+    :type limit:  ``int`` > 0, at most ``size-2*padding``
+
+    :param padding: The pixels between two images
+    :type padding:  ``int`` >= 0
+
+    :return: The contents of the atlas file
+    :rtype:  ``dict``
+    """
+    assert limit+2*padding <= size, 'limit %s does not fit in a page' % repr(limit)
+    prefix = name+'-'
+    images = []
+    for filename in sorted(os.listdir(folder)):
+        path = os.path.join(folder,filename)
+        if not filename.endswith('.png') or filename.startswith(prefix):
+            continue
+        dims = image_size(path)
+        if dims is None or dims[0] > limit or dims[1] > limit:
+            continue
+        try:
+            images.append((filename,)+read_png(path))
+        except ValueError:
+            continue
+    images.sort(key=lambda image: (-image[2],-image[1],image[0]))
+
+    # Place the images: each page is a list of (image, x, y), y from the top
+    pages = [[]]
+    x = y = shelf = 0
+    for image in images:
+        w = image[1]+2*padding
+        h = image[2]+2*padding
+        if x+w > size:
+            x = 0
+            y += shelf
+            shelf = 0
+        if y+h > size:
+            pages.append([])
+            x = y = shelf = 0
+        pages[-1].append((image,x+padding,y+padding))
+        x += w
+        shelf = max(shelf,h)
+
+    meta = {}
+    for index in range(len(pages)):
+        if not pages[index]:
+            continue
+        used = max(top+image[2]+padding for (image,left,top) in pages[index])
+        height = 1
+        while height < used:
+            height *= 2
+        rows = [bytearray(4*size) for row in range(height)]
+        regions = {}
+        for (image,left,top) in pages[index]:
+            _blit(rows,image,left,top,min(padding,1))
+            uid = os.path.splitext(image[0])[0]
+            regions[uid] = [left,height-top-image[2],image[1],image[2]]
+        page = '%s%d.png' % (prefix,index)
+        write_png(os.path.join(folder,page),size,height,rows)
+        meta[page] = regions
+
+    with open(os.path.join(folder,name+'.atlas'),'w') as file:
+        json.dump(meta,file,sort_keys=True)
+    return meta
+
+
+def _blit(rows,image,left,top,extrude):
+    """
+    Copies an image into a page, copying its edge pixels outwards.
+
+    :param rows: The rows of the page
+    :type rows:  ``list`` of ``bytearray``
+
+    :param image: The image as (file name, width, height, rows)
+    :type image:  ``tuple``
+
+    :param left: The column of the left edge of the image in the page
+    :type left:  ``int`` >= ``extrude``
+
+    :param top: The row of the top edge of the image in the page
+    :type top:  ``int`` >= ``extrude``
+
+    :param extrude: The number of times to copy the edge pixels
+    :type extrude:  ``int`` >= 0
+    """
+    width, height, pixels = image[1:]
+    for row in range(-extrude,height+extrude):
+        source = pixels[min(max(row,0),height-1)]
+        line = rows[top+row]
+        line[4*left:4*(left+width)] = source
+        for col in range(1,extrude+1):
+            line[4*(left-col):4*(left-col+1)] = source[0:4]
+            line[4*(left+width+col-1):4*(left+width+col)] = source[-4:]
+
+
+# #mark -
+class GAtlas(object):
+    """
+    A class representing a texture atlas built by :func:`build_atlas` (or by Kivy).
+
+    An atlas maps image files (such as ``'ship.png'``) to regions of its pages.  The
+    pages are only loaded the first time that one of their regions is needed, and each
+    page is loaded once.  A region is a texture like any other, but it shares the
+    graphics texture of its page, so drawing from two regions of the same page does not
+    switch textures.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def filename(self):
+        """
+        The atlas file.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a string.
+        """
+        return self._filename
+
+    @property
+    def names(self):
+        """
+        The image files with a region in this atlas, in sorted order.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(sorted(self._regions))
+
+    @property
+    def pages(self):
+        """
+        The page files of this atlas, in sorted order.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(sorted(set(region[0] for region in self._regions.values())))
+
+
+    # BUILT-IN METHODS
+    def __init__(self,filename):
+        """
+        Loads the regions of an atlas (but not its pages).
+
+        Regions whose image file is missing, or no longer has the size of the region,
+        are ignored; those images are loaded as their own textures instead.
+
+        :param filename: The atlas file
+        :type filename:  ``str``
+        """
+        assert type(filename) == str, 'filename %s is not a string' % repr(filename)
+        self._filename = filename
+        with open(filename) as file:
+            meta = json.load(file)
+
+        folder = os.path.dirname(filename)
+        self._regions = {}
+        self._textures = {}
+        for page, regions in meta.items():
+            for uid, coords in regions.items():
+                name = uid+'.png'
+                path = os.path.join(folder,name)
+                if os.path.exists(path) and image_size(path) == tuple(coords[2:]):
+                    self._regions[name] = (page,)+tuple(coords)
+
+    def __contains__(self,name):
+        """
+        :return: True if the image file has a region in this atlas.
+
+        :param name: The image file
+        :type name:  ``str``
+        """
+        return name in self._regions
+
+    def __len__(self):
+        """
+        :return: The number of regions in this atlas.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._regions)
+
+
+    # PUBLIC METHODS
+    def region(self,name):
+        """
+        :return: The page file and position of an image, as (page, x, y, width, height).
+
+        The position is in pixels, with ``y`` counting from the bottom of the page.
+
+        :param name: The image file
+        :type name:  ``str``, in this atlas
+        """
+        return self._regions[name]
+
+    def set_texture(self,page,texture):
+        """
+        Sets the texture of a page that was loaded elsewhere (such as by a preloader).
+
+        :param page: The page file
+        :type page:  ``str``, one of :attr:`pages`
+
+        :param texture: The texture of the page
+        :type texture:  a texture, or None
+        """
+        self._textures[page] = texture
+
+    def texture(self,name):
+        """
+        :return: The texture region for an image, or None if its page cannot be loaded.
+
+        :param name: The image file
+        :type name:  ``str``, in this atlas
+        """
+        from .backend import load_image
+        page, x, y, width, height = self._regions[name]
+        if not page in self._textures:
+            self._textures[page] = load_image(os.path.join(os.path.dirname(self._filename),page))
+        texture = self._textures[page]
+        if texture is None:
+            return None
+        return texture.get_region(x,y,width,height)
+
+
+# Application code
+if __name__ == '__main__':
+    import sys
+    folder = sys.argv[1] if len(sys.argv) > 1 else 'Images'
+    name = sys.argv[2] if len(sys.argv) > 2 else 'sprites'
+    meta = build_atlas(folder,name)
+    for page in sorted(meta):
+        print('%s: %s' % (page,', '.join(sorted(meta[page]))))
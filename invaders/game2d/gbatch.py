@@ -0,0 +1,265 @@
+"""
+Batched sprite drawing for 2D game support.
+
+Every :class:`GImage` has its own graphics instructions (a matrix push, a translation,
+a rotation, a scale, a rectangle and a matrix pop), so a screen with hundreds of images
+costs thousands of instructions.  A :class:`GSpriteBatch` instead draws any number of
+images of the same size with one mesh per texture.  Moving a single sprite or hiding it
+only changes the vertex data of its mesh, and moving the whole batch only changes one
+translation.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+from .backend import *
+from .app import GameApp
+
+# The texture coordinates of a whole texture (bottom left, bottom right, top right, top left)
+_WHOLE = (0.0,0.0,1.0,0.0,1.0,1.0,0.0,1.0)
+
+
+class GSpriteBatch(object):
+    """
+    A class representing many images of the same size, drawn together.
+
+    Sprites are added with :meth:`add`, which returns an int handle for the sprite.  Use
+    that handle to :meth:`move` or :meth:`remove` the sprite later.  The position of a
+    sprite is the position of its center, relative to the offset of the batch (the
+    attributes ``x`` and ``y``).  To move every sprite at once, change the offset.
+
+    Sprites cannot be rotated or scaled individually.  All of the sprites that share an
+    image file share a texture and a mesh, so the batch costs a few instructions per
+    image file, no matter how many sprites it has.  Changes to the sprites are collected
+    and sent to the meshes the next time the batch is drawn.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal offset of every sprite in this batch.
+
+        **Invariant**: Must be an ``int`` or ``float``.
+        """
+        return self._trans.x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._trans.x = value
+
+    @property
+    def y(self):
+        """
+        The vertical offset of every sprite in this batch.
+
+        **Invariant**: Must be an ``int`` or ``float``.
+        """
+        return self._trans.y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._trans.y = value
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def width(self):
+        """
+        The width of every sprite in this batch.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of every sprite in this batch.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._height
+
+    @property
+    def count(self):
+        """
+        The number of sprites in this batch that have not been removed.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._count
+
+
+    # BUILT-IN METHODS
+    def __init__(self,width,height):
+        """
+        Creates a new, empty sprite batch.
+
+        :param width: The width of every sprite
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: The height of every sprite
+        :type height:  ``int`` or ``float`` > 0
+        """
+        assert type(width) in [int,float] and width > 0, 'width %s is not valid' % repr(width)
+        assert type(height) in [int,float] and height > 0, 'height %s is not valid' % repr(height)
+        self._width  = width
+        self._height = height
+        self._count  = 0
+
+        # For each image file: [mesh, vertex list, texture coordinates, dirty flag, quads indexed]
+        self._meshes  = {}
+        # For each handle: [image file, quad number in its mesh] (None once removed)
+        self._sprites = []
+
+        self._trans = Translate(0,0)
+        self._cache = InstructionGroup()
+        self._cache.add(PushMatrix())
+        self._cache.add(self._trans)
+        self._cache.add(Color(1,1,1,1))
+        self._cache.add(PopMatrix())
+
+    def __len__(self):
+        """
+        :return: The number of sprites in this batch that have not been removed.
+        :rtype:  ``int`` >= 0
+        """
+        return self._count
+
+
+    # PUBLIC METHODS
+    def add(self,x,y,source):
+        """
+        Adds a sprite to this batch.
+
+        :param x: The x-coordinate of the sprite center (relative to the batch offset)
+        :type x:  ``int`` or ``float``
+
+        :param y: The y-coordinate of the sprite center (relative to the batch offset)
+        :type y:  ``int`` or ``float``
+
+        :param source: The image file of the sprite
+        :type source:  ``str``, a file in the **Images** folder
+
+        :return: The handle of the new sprite
+        :rtype:  ``int``
+        """
+        if not source in self._meshes:
+            self._add_mesh(source)
+        entry = self._meshes[source]
+        quad = len(entry[1])//16
+        entry[1].extend([0.0]*16)
+        entry[3] = True
+        self._sprites.append([source,quad])
+        self._count += 1
+        handle = len(self._sprites)-1
+        self.move(handle,x,y)
+        return handle
+
+    def move(self,handle,x,y):
+        """
+        Moves a sprite in this batch.
+
+        :param handle: The sprite handle
+        :type handle:  ``int``, returned by :meth:`add`
+
+        :param x: The new x-coordinate of the sprite center (relative to the batch offset)
+        :type x:  ``int`` or ``float``
+
+        :param y: The new y-coordinate of the sprite center (relative to the batch offset)
+        :type y:  ``int`` or ``float``
+        """
+        sprite = self._sprites[handle]
+        assert sprite is not None, 'sprite %s was removed' % repr(handle)
+        entry = self._meshes[sprite[0]]
+        left   = x-self._width/2.0
+        right  = x+self._width/2.0
+        bottom = y-self._height/2.0
+        top    = y+self._height/2.0
+        tc = entry[2]
+        pos = 16*sprite[1]
+        entry[1][pos:pos+16] = [left, bottom,tc[0],tc[1], right,bottom,tc[2],tc[3],
+                                right,top,   tc[4],tc[5], left, top,   tc[6],tc[7]]
+        entry[3] = True
+
+    def remove(self,handle):
+        """
+        Removes a sprite from this batch.
+
+        The sprite is collapsed to a point, so that it draws nothing.  Its handle cannot
+        be used again.
+
+        :param handle: The sprite handle
+        :type handle:  ``int``, returned by :meth:`add`
+        """
+        sprite = self._sprites[handle]
+        if sprite is None:
+            return
+        entry = self._meshes[sprite[0]]
+        pos = 16*sprite[1]
+        entry[1][pos:pos+16] = [0.0]*16
+        entry[3] = True
+        self._sprites[handle] = None
+        self._count -= 1
+
+    def draw(self,view):
+        """
+        Draws this batch in the provided view.
+
+        Any changes since the last draw are sent to the meshes first.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        for entry in self._meshes.values():
+            if entry[3]:
+                entry[0].vertices = entry[1]
+                if entry[4] != len(entry[1])//16:
+                    self._index(entry)
+                entry[3] = False
+        view.draw(self._cache)
+
+
+    # HIDDEN METHODS
+    def _add_mesh(self,source):
+        """
+        Creates the mesh for the sprites with the given image file.
+
+        :param source: The image file
+        :type source:  ``str``, a file in the **Images** folder
+        """
+        texture = GameApp.load_texture(source)
+        coords = _WHOLE
+        if texture is not None and hasattr(texture,'tex_coords'):
+            coords = tuple(texture.tex_coords)
+
+        mesh = Mesh(vertices=[],indices=[],mode='triangles',texture=texture)
+        self._meshes[source] = [mesh,[],coords,True,0]
+        # Keep the meshes between the translation and the PopMatrix
+        self._cache.insert(len(self._cache.children)-1,mesh)
+
+    def _index(self,entry):
+        """
+        Sets the index list of a mesh to draw every quad in its vertex list.
+
+        The index list does not depend on the sprite positions, so it only changes when
+        sprites are added.  Removed sprites keep their quads, collapsed to a point.
+
+        :param entry: The mesh entry
+        :type entry:  ``list``
+        """
+        quads = len(entry[1])//16
+        indices = []
+        for quad in range(quads):
+            base = 4*quad
+            indices.extend((base,base+1,base+2,base+2,base+3,base))
+        entry[0].indices = indices
+        entry[4] = quads
@@ -0,0 +1,286 @@
+"""
+A bounded texture cache for 2D game support.
+
+:class:`GameApp` keeps every texture it loads in a :class:`TextureCache`, so that two
+images from the same file share a texture.  The cache has a budget in bytes (the
+memory of the textures, estimated as 4 bytes per pixel).  When the textures go over
+the budget, the least recently used textures are dropped from the cache, except for
+pinned ones.  A dropped texture still works for the objects that already have it; it
+is only loaded again the next time that a new object needs it.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import collections
+
+
+class TextureCache(object):
+    """
+    A class representing a cache of textures by file name, with LRU eviction.
+
+    The cache works like a dictionary from file names to textures (use ``in``, ``[]``
+    and ``del``), but every texture has a size in bytes, and the sizes of the textures
+    in the cache stay within the :attr:`budget` whenever possible.  Looking up a
+    texture with :meth:`get` counts as a hit or a miss, and makes it the most recently
+    used.
+
+    Pinned textures are never evicted.  Pin the textures that are drawn every frame,
+    so that a burst of other textures (such as a new background) cannot push them out.
+    Pins are counted, so each :meth:`pin` needs its own :meth:`unpin`.  A name may be
+    pinned before its texture is loaded.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The most bytes of textures to keep, or None for no limit.
+
+        Lowering the budget evicts textures right away.
+
+        **Invariant**: Must be None or an ``int`` >= 0.
+        """
+        return self._budget
+
+    @budget.setter
+    def budget(self,value):
+        assert value is None or (type(value) == int and value >= 0), 'budget %s is not valid' % repr(value)
+        self._budget = value
+        self._evict()
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def bytes(self):
+        """
+        The total size in bytes of the textures in the cache.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._bytes
+
+    @property
+    def hits(self):
+        """
+        The number of calls to :meth:`get` that found their texture.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        The number of calls to :meth:`get` that did not find their texture.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._misses
+
+    @property
+    def evictions(self):
+        """
+        The number of textures dropped to stay within the budget.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._evictions
+
+
+    # BUILT-IN METHODS
+    def __init__(self,budget=None):
+        """
+        Creates a new, empty cache.
+
+        :param budget: The most bytes of textures to keep, or None for no limit
+        :type budget:  ``int`` >= 0 or None
+        """
+        # For each name, in order from least to most recently used: [texture, size]
+        self._data = collections.OrderedDict()
+        self._pins = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.budget = budget
+
+    def __len__(self):
+        """
+        :return: The number of textures in the cache.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._data)
+
+    def __contains__(self,name):
+        """
+        :return: True if the cache has a texture for the file name.
+
+        This does not count as a hit or a miss.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return name in self._data
+
+    def __getitem__(self,name):
+        """
+        :return: The texture for the file name (without counting a hit).
+
+        :param name: The file name
+        :type name:  ``str``, in the cache
+        """
+        return self._data[name][0]
+
+    def __setitem__(self,name,texture):
+        """
+        Adds a texture to the cache, with the size of the texture itself.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param texture: The texture
+        :type texture:  a texture, or None
+        """
+        self.put(name,texture)
+
+    def __delitem__(self,name):
+        """
+        Removes a texture from the cache (even if it is pinned).
+
+        :param name: The file name
+        :type name:  ``str``, in the cache
+        """
+        self._bytes -= self._data.pop(name)[1]
+
+    def __iter__(self):
+        """
+        :return: The iterator for the file names, from least to most recently used.
+        :rtype:  ``iterable``
+        """
+        return iter(self._data.keys())
+
+
+    # PUBLIC METHODS
+    def get(self,name):
+        """
+        :return: The texture for the file name, or None if it is not in the cache.
+
+        A texture that is found becomes the most recently used.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        entry = self._data.get(name)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._data.move_to_end(name)
+        return entry[0]
+
+    def put(self,name,texture,size=None):
+        """
+        Adds a texture to the cache as the most recently used, evicting as necessary.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param texture: The texture
+        :type texture:  a texture, or None
+
+        :param size: The size of the texture in bytes, or None to use its width and height
+        :type size:  ``int`` >= 0 or None
+        """
+        if size is None:
+            size = 0 if texture is None else int(texture.width*texture.height*4)
+        if name in self._data:
+            del self[name]
+        self._data[name] = [texture,size]
+        self._bytes += size
+        self._evict()
+
+    def pop(self,name):
+        """
+        :return: The texture for the file name, removed from the cache (or None).
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if name in self._data:
+            texture = self._data[name][0]
+            del self[name]
+            return texture
+        return None
+
+    def pin(self,name):
+        """
+        Keeps the texture for the file name from being evicted.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        self._pins[name] = self._pins.get(name,0)+1
+
+    def unpin(self,name):
+        """
+        Undoes one call to :meth:`pin`, evicting textures if the cache is over budget.
+
+        :param name: The file name
+        :type name:  ``str``, pinned
+        """
+        assert name in self._pins, '%s is not pinned' % repr(name)
+        self._pins[name] -= 1
+        if not self._pins[name]:
+            del self._pins[name]
+            self._evict()
+
+    def is_pinned(self,name):
+        """
+        :return: True if the texture for the file name is pinned.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return name in self._pins
+
+    def clear(self):
+        """
+        Removes every texture from the cache (but keeps the pins and the counters).
+        """
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        :return: The size, budget and counters of the cache, as a dictionary.
+        """
+        return {'textures': len(self._data), 'bytes': self._bytes, 'budget': self._budget,
+                'pinned': len(self._pins), 'hits': self._hits, 'misses': self._misses,
+                'evictions': self._evictions}
+
+
+    # HIDDEN METHODS
+    def _evict(self):
+        """
+        Drops the least recently used unpinned textures until the cache is in budget.
+
+        The most recently used texture is never dropped, even if it is bigger than
+        the whole budget, since it was just loaded to be used.
+        """
+        if self._budget is None or self._bytes <= self._budget:
+            return
+        names = list(self._data.keys())[:-1]
+        for name in names:
+            if self._bytes <= self._budget:
+                break
+            if not name in self._pins:
+                del self[name]
+                self._evictions += 1
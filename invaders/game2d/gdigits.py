@@ -0,0 +1,217 @@
+"""
+Numbers drawn from pre-rendered digits for 2D game support.
+
+A :class:`GLabel` renders its text with the font every time the text changes, and
+creating a label creates (and renders) a whole Kivy label.  That is too slow for a
+number that changes often, like a score.  A :class:`GDigits` renders the ten digits
+of its font once (they are shared by every :class:`GDigits` with the same font), and
+draws a number as one textured rectangle per digit.  Changing the number only changes
+the textures of those rectangles, and no text is rendered.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+from .backend import *
+from .gobject import GObject
+
+
+class GDigits(GObject):
+    """
+    A class representing a whole number (>= 0), drawn from pre-rendered digits.
+
+    Unlike other objects, the attribute ``x`` is the left edge of the number, and not
+    its center, so that the number grows to the right as it gets more digits.  The
+    attribute ``y`` is still the vertical center.  The ``width`` and ``height`` are
+    those of the digits, and cannot be changed.  As with :class:`GLabel`, the color of
+    the digits is ``linecolor``.
+
+    The font is fixed when the object is created.  Only the attribute :attr:`value`
+    should change after that.
+    """
+    __slots__ = ('_font','_glyphs','_rects','_value')
+    
+    # Class attribute for the rendered digits, keyed by (font_name, font_size, bold)
+    GLYPH_CACHE = {}
+
+    # MUTABLE PROPERTIES
+    @property
+    def value(self):
+        """
+        The number to display.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._value
+
+    @value.setter
+    def value(self,value):
+        assert type(value) == int and value >= 0, 'value %s is not an int >= 0' % repr(value)
+        if self._defined and value == self._value:
+            return
+        self._value = value
+        if not self._defined:
+            return
+        text = str(value)
+        if self._rects and len(text) == len(self._rects):
+            self._layout(text)
+        else:
+            self._reset()
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_size(self):
+        """
+        The size of the digits in points.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a positive number (int or float).
+        """
+        return self._font[1]
+
+    @property
+    def font_name(self):
+        """
+        The font file of the digits (or the name of a Kivy font).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a string.
+        """
+        return self._font[0]
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new number.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show a
+        score of 0 starting 20 pixels from the left of the window, use::
+
+            GDigits(value=0,x=20,y=650,font_size=25,font_name='RetroGame.ttf')
+
+        This class supports the keywords of :class:`GObject` (except ``width`` and
+        ``height``), as well as ``value``, ``font_size``, ``font_name`` and ``bold``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._font = (keywords.pop('font_name','Roboto'),keywords.pop('font_size',15),
+                      keywords.pop('bold',False))
+        self._glyphs = self.prerender(*self._font)
+        self._rects = []
+        self.value = keywords.pop('value',0)
+
+        keywords.pop('width',None)
+        keywords.pop('height',None)
+        GObject.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (1,1,1,1)
+        self._reset()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,value=%s,left=%s,y=%s]' % (s,repr(self.value),repr(self.x),repr(self.y))
+
+
+    # PUBLIC METHODS
+    def contains(self,point):
+        """
+        Checks whether this number contains the point.
+
+        This method checks the bounding box of the digits, and ignores any rotation.
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: True if the number contains this point
+        :rtype:  ``bool``
+        """
+        if hasattr(point,'x'):
+            point = (point.x,point.y)
+        return 0 <= point[0]-self.x < self.width and abs(point[1]-self.y) < self.height/2.0
+
+    @classmethod
+    def prerender(cls,font_name,font_size,bold=False):
+        """
+        :return: The rendered digits 0..9 of a font, as (texture, width, height) triples.
+
+        Each font is only rendered once, and then shared by every :class:`GDigits`
+        with that font.  Call this ahead of time to avoid rendering the digits when the
+        first :class:`GDigits` is created.
+
+        :param font_name: The font file (or the name of a Kivy font)
+        :type font_name:  ``str``
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether to render the bold version of the font
+        :type bold:  ``bool``
+        """
+        key = (font_name,font_size,bold)
+        if not key in cls.GLYPH_CACHE:
+            glyphs = []
+            for digit in '0123456789':
+                label = Label(text=digit,font_name=font_name,font_size=font_size,bold=bold)
+                label.texture_update()
+                size = label.texture_size
+                glyphs.append((getattr(label,'texture',None),size[0],size[1]))
+            cls.GLYPH_CACHE[key] = tuple(glyphs)
+        return cls.GLYPH_CACHE[key]
+
+
+    # HIDDEN METHODS
+    def _layout(self,text):
+        """
+        Measures the given digits, and moves the digit rectangles (if any) to show them.
+
+        :param text: The digits to show, one for each rectangle
+        :type text:  ``str``
+        """
+        left = 0
+        height = 0
+        for pos in range(len(text)):
+            texture, w, h = self._glyphs[ord(text[pos])-48]
+            if self._rects:
+                rect = self._rects[pos]
+                rect.texture = texture
+                rect.pos  = (left,-h/2.0)
+                rect.size = (w,h)
+            left += w
+            height = max(height,h)
+        self._width = left
+        self._height = height
+
+    def _reset(self):
+        """
+        Resets the drawing cache, after measuring the digits.
+        """
+        GObject._reset(self)
+        self._rects = []
+        self._layout(str(self._value))
+    
+    def _build(self):
+        """
+        Builds the drawing cache, with a rectangle for each digit.
+        """
+        GObject._build(self)
+        text = str(self._value)
+        self._rects = [Rectangle() for digit in text]
+        self._layout(text)
+        self._cache.add(Color(*self._linecolor))
+        for rect in self._rects:
+            self._cache.add(rect)
+        self._cache.add(PopMatrix())
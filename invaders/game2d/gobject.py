@@ -8,8 +8,7 @@ These classes will not work unless you adhere to proper subclassing practices.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.graphics import *
-from kivy.graphics.instructions import *
+from .backend import *
 from cornell import Point2, Matrix
 
 def is_color(c):
@@ -88,7 +87,15 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the 
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`, 
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+    
+    The position, angle and scale are plain attributes.  The Kivy instructions to draw 
+    the object are only made the first time that it is drawn, so objects that are never 
+    drawn (or not drawn yet) are cheap to make and to move.  Subclasses should declare 
+    their attributes in ``__slots__`` to keep the objects small.
     """
+    __slots__ = ('_defined','_x','_y','_angle','_sx','_sy','_width','_height',
+                 '_linecolor','_fillcolor','_name','_trans','_rotate','_scale',
+                 '_cache','_matrix','_invrse','_mtrue','__weakref__')
     
     # MUTABLE PROPERTIES 
     @property
@@ -98,12 +105,14 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.x
+        return self._x
     
     @x.setter
     def x(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.x = float(value)
+        self._x = float(value)
+        if self._trans is not None:
+            self._trans.x = self._x
         self._mtrue = False
     
     @property
@@ -113,12 +122,14 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.y
+        return self._y
     
     @y.setter
     def y(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.y = float(value)
+        self._y = float(value)
+        if self._trans is not None:
+            self._trans.y = self._y
         self._mtrue = False
     
     @property
@@ -136,6 +147,8 @@ class GObject(object):
     def width(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
+        if self._defined and self._width == value:
+            return
         self._width = float(value)
         if self._defined:
             self._reset()
@@ -155,6 +168,8 @@ class GObject(object):
     def height(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
+        if self._defined and self._height == value:
+            return
         self._height = float(value)
         if self._defined:
             self._reset()
@@ -174,7 +189,7 @@ class GObject(object):
         
         **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
         """ 
-        return (self._scale.x,self._scale.y)
+        return (self._sx,self._sy)
     
     @scale.setter
     def scale(self,value):
@@ -182,11 +197,14 @@ class GObject(object):
         assert type(value) in [int,float] or is_num_tuple(value,2), \
                 '%s is not a valid scaling factor' % repr(value)
         if type(value) in [int,float]:
-            self._scale.x = float(value)
-            self._scale.y = float(value)
+            self._sx = float(value)
+            self._sy = float(value)
         else:
-            self._scale.x = float(value[0])
-            self._scale.y = float(value[1])
+            self._sx = float(value[0])
+            self._sy = float(value[1])
+        if self._scale is not None:
+            self._scale.x = self._sx
+            self._scale.y = self._sy
         self._mtrue = False
     
     @property
@@ -198,15 +216,16 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``
         """ 
-        return self._rotate.angle
+        return self._angle
     
     @angle.setter
     def angle(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
-        self._rotate.angle = float(value)
-        if not diff:
+        if self._angle != value:
             self._mtrue = False
+        self._angle = float(value)
+        if self._rotate is not None:
+            self._rotate.angle = self._angle
     
     @property
     def linecolor(self):
@@ -225,7 +244,7 @@ class GObject(object):
         
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._linecolor is None else self._linecolor.rgba
+        return None if self._linecolor is None else list(self._linecolor)
     
     @linecolor.setter
     def linecolor(self,value):
@@ -241,7 +260,10 @@ class GObject(object):
             else:
                 value = cornell.RGB.CreateName(value).glColor()
         
-        self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        value = None if value is None else tuple(map(float,value[:4]))
+        if self._defined and value == self._linecolor:
+            return
+        self._linecolor = value
         if self._defined:
             self._reset()
             
@@ -263,7 +285,7 @@ class GObject(object):
         
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._fillcolor is None else self._fillcolor.rgba
+        return None if self._fillcolor is None else list(self._fillcolor)
     
     @fillcolor.setter
     def fillcolor(self,value):
@@ -279,7 +301,10 @@ class GObject(object):
             else:
                 value = cornell.RGB.CreateName(value).glColor()
         
-        self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        value = None if value is None else tuple(map(float,value[:4]))
+        if self._defined and value == self._fillcolor:
+            return
+        self._fillcolor = value
         if self._defined:
             self._reset()
     
@@ -317,7 +342,7 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -347,7 +372,7 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -377,7 +402,7 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -408,7 +433,7 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -479,10 +504,19 @@ class GObject(object):
         # Set the properties.
         self._defined = False
         
-        # Create the Kivy transforms for position and size
-        self._trans  = Translate(0,0,0)
-        self._rotate = Rotate(angle=0,axis=(0,0,1))
-        self._scale  = Scale(1,1,1)
+        # The transforms for position and size (Kivy versions are made by _build)
+        self._x  = 0.0
+        self._y  = 0.0
+        self._angle = 0.0
+        self._sx = 1.0
+        self._sy = 1.0
+        self._trans  = None
+        self._rotate = None
+        self._scale  = None
+        self._cache  = None
+        self._matrix = None
+        self._invrse = None
+        self._mtrue  = False
         
         # Now update these with the keywords; size first
         try:
@@ -556,7 +590,7 @@ class GObject(object):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
         
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
         
         p = self.matrix.inverse()._transform(point[0],point[1])
@@ -594,6 +628,8 @@ class GObject(object):
         :type view:  :class:`GView`
         """
         try:
+            if self._cache is None:
+                self._build()
             view.draw(self._cache)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
@@ -602,7 +638,22 @@ class GObject(object):
     def _reset(self):
         """
         Resets the drawing cache.
+        
+        The cache is not rebuilt until the object is next drawn (see :meth:`_build`).
+        """
+        self._cache = None
+    
+    def _build(self):
         """
+        Builds the drawing cache, starting with the Kivy transforms.
+        
+        Subclasses add their own instructions to the cache after calling this method,
+        and end it with a matrix pop.  The transforms are only made the first time.
+        """
+        if self._trans is None:
+            self._trans  = Translate(self._x,self._y,0)
+            self._rotate = Rotate(angle=self._angle,axis=(0,0,1))
+            self._scale  = Scale(self._sx,self._sy,1)
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
@@ -614,13 +665,13 @@ class GObject(object):
         Builds the transform matrices after a settings change.
         """
         self._matrix = Matrix()
-        self._matrix.translate(self._trans.x,self._trans.y)
-        self._matrix.rotate(self._rotate.angle)
-        self._matrix.scale(self._scale.x,self._scale.y)
+        self._matrix.translate(self._x,self._y)
+        self._matrix.rotate(self._angle)
+        self._matrix.scale(self._sx,self._sy)
         self._invrse = Matrix()
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._invrse.rotate(-self._rotate.angle)
-        self._invrse.translate(-self._trans.x,-self._trans.y)
+        self._invrse.scale(1.0/self._sx,1.0/self._sy)
+        self._invrse.rotate(-self._angle)
+        self._invrse.translate(-self._x,-self._y)
         self._mtrue = True
 
 
@@ -642,6 +693,7 @@ class GScene(GObject):
     
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
     """
+    __slots__ = ('_children',)
     
     # MUTABLE PROPERTIES
     @property
@@ -755,11 +807,13 @@ class GScene(GObject):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache
+        Builds the drawing cache (and those of the children that need it)
         """
-        GObject._reset(self)
+        GObject._build(self)
         for x in self.children:
+            if x._cache is None:
+                x._build()
             self._cache.add(x._cache)
         self._cache.add(PopMatrix())
\ No newline at end of file
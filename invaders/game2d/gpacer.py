@@ -0,0 +1,229 @@
+"""
+Frame pacing for 2D game support.
+
+At 60 FPS or more, :class:`GameApp` asks the Kivy clock to call it as often as it can,
+so the game loop never rests and keeps a whole core busy.  A :class:`FramePacer` holds
+each frame back until its deadline instead, one target frame time after the last one.
+It sleeps for most of the wait (so the core is idle) and spins for the last moment (since
+a sleep can wake up late).
+
+When a frame starts a whole frame time or more after its deadline, the game is behind.
+The pacer then tells the game to skip ``draw`` for that frame, so that the time goes to
+``update`` and the game catches up.  It never skips too many draws in a row, and it
+never skips ``update``, so the game still plays at the right speed.  The pacer counts
+the late and skipped frames, so the pacing can be checked while the game runs.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+from time import perf_counter, sleep
+
+
+class FramePacer(object):
+    """
+    A class to hold a game loop to a target frame time, skipping draws when it falls behind.
+
+    Call :meth:`wait` at the start of every frame.  It returns once the frame is due,
+    and returns whether the frame should be drawn.
+
+    A frame is late if it starts after its deadline.  A late frame that is less than a
+    frame time behind is still drawn; the next deadline stays on the same schedule, so
+    the lost time is made up in the next wait.  A frame that is a frame time (or more) behind is
+    not drawn, unless the last :attr:`max_skips` frames were not drawn either.  If the
+    game falls so far behind that skipping cannot catch up, the deadlines start over
+    from the current time, and the lost time is dropped.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def target(self):
+        """
+        The target seconds per frame.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._target
+
+    @target.setter
+    def target(self,value):
+        assert type(value) in [int,float] and value > 0, 'target %s is not valid' % repr(value)
+        self._target = float(value)
+        self._deadline = None
+
+    @property
+    def spin(self):
+        """
+        The seconds before a deadline to stop sleeping and spin instead.
+
+        This should be a little more than the time it takes the system to wake up a
+        sleeping thread.  A larger value is more precise, but uses more of the core.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._spin
+
+    @spin.setter
+    def spin(self,value):
+        assert type(value) in [int,float] and value >= 0, 'spin %s is not valid' % repr(value)
+        self._spin = float(value)
+
+    @property
+    def max_skips(self):
+        """
+        The most draws in a row to skip when the game is behind.
+
+        If this value is 0, every frame is drawn.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._maxskips
+
+    @max_skips.setter
+    def max_skips(self,value):
+        assert type(value) == int and value >= 0, 'max_skips %s is not valid' % repr(value)
+        self._maxskips = value
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def frames(self):
+        """
+        The number of frames paced so far.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def late(self):
+        """
+        The number of frames that started after their deadline.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int in 0..frames.
+        """
+        return self._late
+
+    @property
+    def skipped(self):
+        """
+        The number of frames whose draw was skipped.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int in 0..late.
+        """
+        return self._skipped
+
+    @property
+    def slept(self):
+        """
+        The total seconds spent sleeping (and not spinning) in :meth:`wait`.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._slept
+
+
+    # BUILT-IN METHODS
+    def __init__(self,target,spin=0.002,max_skips=2):
+        """
+        Creates a new pacer.
+
+        :param target: The target seconds per frame
+        :type target:  ``int`` or ``float`` > 0
+
+        :param spin: The seconds before a deadline to stop sleeping and spin instead
+        :type spin:  ``int`` or ``float`` >= 0
+
+        :param max_skips: The most draws in a row to skip when the game is behind
+        :type max_skips:  ``int`` >= 0
+        """
+        self.target = target
+        self.spin = spin
+        self.max_skips = max_skips
+        self._skips = 0
+        self._frames = 0
+        self._late = 0
+        self._skipped = 0
+        self._slept = 0.0
+
+
+    # PUBLIC METHODS
+    def wait(self):
+        """
+        Waits until the next frame is due.
+
+        The first frame (and the first frame after the target changes) is due at once.
+
+        :return: True if the frame should be drawn, False to skip the draw
+        :rtype:  ``bool``
+        """
+        self._frames += 1
+        now = perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+        behind = now-self._deadline
+        if behind <= 0:
+            self._hold(self._deadline)
+            self._deadline += self._target
+            self._skips = 0
+            return True
+
+        self._late += 1
+        if behind > self._target*(self._maxskips+1):
+            self._deadline = now+self._target
+        else:
+            self._deadline += self._target
+        if behind >= self._target and self._skips < self._maxskips:
+            self._skips += 1
+            self._skipped += 1
+            return False
+        self._skips = 0
+        return True
+
+    def reset(self):
+        """
+        Starts the deadlines over, so that the next frame is due at once.
+
+        Call this after a pause in the game loop (such as a blocking load), so that the
+        pause does not count as late frames.  The counters are kept.
+        """
+        self._deadline = None
+        self._skips = 0
+
+    def stats(self):
+        """
+        :return: The target and counters of the pacer, as a dictionary.
+        """
+        return {'target': self._target, 'frames': self._frames, 'late': self._late,
+                'skipped': self._skipped, 'slept': self._slept}
+
+    def report(self):
+        """
+        :return: A line with the counters, for printing.
+        """
+        return 'pacing: %d frames at %.3f ms, %d late, %d draws skipped, %.3f s asleep' % (
+            self._frames,self._target*1000,self._late,self._skipped,self._slept)
+
+
+    # HIDDEN METHODS
+    def _hold(self,deadline):
+        """
+        Sleeps and then spins until the given time.
+
+        :param deadline: The time to wait for, in the units of ``perf_counter``
+        :type deadline:  ``float``
+        """
+        remaining = deadline-perf_counter()
+        if remaining > self._spin:
+            start = perf_counter()
+            sleep(remaining-self._spin)
+            self._slept += perf_counter()-start
+        while perf_counter() < deadline:
+            pass
@@ -8,8 +8,7 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 # Lower-level kivy modules to support animation
-from kivy.graphics import *
-from kivy.graphics.instructions import *
+from .backend import *
 from .gobject import GObject
 
 
@@ -103,6 +102,7 @@ class GPath(GObject):
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
     """
+    __slots__ = ('_points','_linewidth')
     
     # MUTABLE PROPERTIES
     @property
@@ -250,13 +250,13 @@ class GPath(GObject):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache
+        Builds the drawing cache
         """
-        GObject._reset(self)
+        GObject._build(self)
         if not self._linecolor is None:
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
             self._cache.add(line)
         self._cache.add(PopMatrix())
@@ -280,6 +280,7 @@ class GTriangle(GPath):
     will add them to the triangle vertices.  Similarly, the attributes `width` and 
     `height` are immutable, and are computed directly from the points
     """
+    __slots__ = ()
     
     # MUTABLE PROPERTIES
     @property
@@ -349,23 +350,23 @@ class GTriangle(GPath):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache
+        Builds the drawing cache
         """
-        GObject._reset(self)
+        GObject._build(self)
         
         vertices = ()
         for x in range(3):
             # Need to tack on degenerate texture coords
             vertices += self.points[2*x:2*x+2]+(0,0)
         mesh = Mesh(vertices=vertices, indices=range(3), mode='triangle_strip')
-        self._cache.add(self._fillcolor)
+        self._cache.add(Color(*self._fillcolor))
         self._cache.add(mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -397,6 +398,7 @@ class GPolygon(GPath):
     As with :class:`GPath`, the attributes ``width`` and ``height`` are immutable, and 
     are computed directly from the points
     """
+    __slots__ = ('_source','_source_width','_source_height','_mesh')
     
     # MUTABLE PROPERTIES
     @property
@@ -571,19 +573,19 @@ class GPolygon(GPath):
             verts += self.points[0:2]+(0,0)
             self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan')
     
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache
+        Builds the drawing cache
         """
-        GObject._reset(self)
+        GObject._build(self)
         self._make_mesh()
         
-        self._cache.add(self._fillcolor)
+        self._cache.add(Color(*self._fillcolor))
         self._cache.add(self._mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
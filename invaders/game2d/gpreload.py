@@ -0,0 +1,323 @@
+"""
+Asset preloading for 2D game support.
+
+Images, fonts and sounds are normally loaded the first time they are used, which puts
+a pause into the first frames that use them.  An :class:`AssetLoader` loads them while
+the game shows its start screen instead.  A :class:`GameApp` makes one the first time
+its attribute ``assets`` is used.  Add the assets to it in the method ``start``; the
+game starts loading them as soon as ``start`` returns, and the attribute ``ready`` of
+the loader becomes True once every asset is loaded.
+
+Each asset is loaded in two parts.  The slow part that does not need the graphics or
+audio system, like reading and decoding a file, runs on a pool of worker threads.  The
+rest, like making a texture, must run on the main thread.  The game does that part
+between frames, in :meth:`AssetLoader.poll`, and only for a small time budget each
+frame, so the start screen keeps animating while the assets load.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+
+def _read(filename):
+    """
+    :return: The contents of a file (read so the file is in the disk cache)
+
+    :param filename: The path to the file
+    :type filename:  ``str``
+    """
+    with open(filename,'rb') as file:
+        return file.read()
+
+
+class AssetLoader(object):
+    """
+    A class to load game assets on worker threads, with progress.
+
+    An asset is added with a name, a function ``work`` that runs on a worker thread,
+    and a function ``finish`` that runs on the main thread with the result of ``work``.
+    The methods :meth:`add_image`, :meth:`add_images`, :meth:`add_font` and
+    :meth:`add_sounds` add the assets of a :class:`GameApp`.  The assets are finished
+    in the order they were added, so :attr:`progress` only goes up.
+
+    If an asset fails to load, its name is added to :attr:`errors` and it counts as
+    loaded.  It is then loaded (or fails again) the first time that the game uses it.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def total(self):
+        """
+        The number of assets added to this loader.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._total
+
+    @property
+    def loaded(self):
+        """
+        The number of assets that are loaded (or failed to load).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int in 0..total.
+        """
+        return self._loaded
+
+    @property
+    def progress(self):
+        """
+        The fraction of the assets that are loaded (1 if there are no assets).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float in 0..1.
+        """
+        return 1.0 if self._total == 0 else self._loaded/float(self._total)
+
+    @property
+    def ready(self):
+        """
+        Whether the loader has started and every asset is loaded.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._ready.is_set()
+
+    @property
+    def errors(self):
+        """
+        The names of the assets that failed to load.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a list of strings.
+        """
+        return list(self._errors)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,workers=4):
+        """
+        Creates a new loader with no assets.
+
+        :param workers: The number of worker threads
+        :type workers:  ``int`` > 0
+        """
+        assert type(workers) == int and workers > 0, 'workers %s is not a positive int' % repr(workers)
+        self._workers = workers
+        self._pool = None
+        # The assets not yet finished, in order, as [name, future or None, finish]
+        self._pending = []
+        self._total = 0
+        self._loaded = 0
+        self._errors = []
+        self._ready = threading.Event()
+        self._pages = set()
+
+
+    # PUBLIC METHODS
+    def add(self,name,work,finish,*args):
+        """
+        Adds an asset to load.
+
+        If the loader has already started, the work starts right away.
+
+        :param name: The name of the asset (for :attr:`errors`)
+        :type name:  ``str``
+
+        :param work: The function to call on a worker thread, or None for no work
+        :type work:  callable (with the arguments ``args``)
+
+        :param finish: The function to call on the main thread with the result of work
+        :type finish:  callable (with one argument)
+
+        :param args: The arguments of work
+        """
+        entry = [name,None,finish]
+        if work is not None:
+            entry[1] = (work,args)
+            if self._pool is not None:
+                entry[1] = self._pool.submit(work,*args)
+        self._pending.append(entry)
+        self._total += 1
+        self._ready.clear()
+
+    def add_image(self,name):
+        """
+        Adds an image file from the **Images** folder.
+
+        If the game has an atlas with this file, its atlas page is loaded instead (once,
+        no matter how many of its images are added).  An image that is already loaded
+        is not loaded again.
+
+        :param name: The image file
+        :type name:  ``str``
+        """
+        from .app import GameApp
+        from .backend import decode_image, upload_image
+        assert GameApp.is_image(name), '%s is not an image file' % repr(name)
+        if name in GameApp.TEXTURE_CACHE:
+            return
+
+        atlas = GameApp.ATLAS
+        if atlas is not None and name in atlas:
+            page = atlas.region(name)[0]
+            if page in self._pages:
+                self.add(name,None,lambda data: GameApp.load_texture(name))
+                return
+            self._pages.add(page)
+            def finish(data):
+                atlas.set_texture(page,upload_image(data))
+                GameApp.load_texture(name)
+            path = os.path.join(os.path.dirname(atlas.filename),page)
+        else:
+            def finish(data):
+                GameApp._cache_texture(name,upload_image(data))
+            path = os.path.join(GameApp.images,name)
+        self.add(name,decode_image,finish,path)
+
+    def add_images(self,extension='.png'):
+        """
+        Adds every image file in the **Images** folder with the given extension.
+
+        The pages of the game atlas (if any) are not added themselves, since they are
+        loaded for the images on them.
+
+        :param extension: The extension of the image files
+        :type extension:  ``str``
+        """
+        from .app import GameApp
+        pages = GameApp.ATLAS.pages if GameApp.ATLAS is not None else ()
+        for name in sorted(GameApp.ASSET_INDEX['images']):
+            if name.endswith(extension) and not name in pages:
+                self.add_image(name)
+
+    def add_font(self,name,size,bold=False):
+        """
+        Adds a font from the **Fonts** folder, at the given size.
+
+        The font is opened by rendering its digits for :class:`GDigits`, so a
+        :class:`GDigits` with this font never has to render them itself.
+
+        :param name: The font name (the file in the **Fonts** folder, with or without .ttf)
+        :type name:  ``str``
+
+        :param size: The size of the font in points
+        :type size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether to render the bold version of the font
+        :type bold:  ``bool``
+        """
+        from .app import GameApp
+        from .gdigits import GDigits
+        path = os.path.join(GameApp.fonts,name if name.endswith('.ttf') else name+'.ttf')
+        work = _read if os.path.exists(path) else None
+        self.add(name,work,lambda data: GDigits.prerender(name,size,bold),path)
+
+    def add_sounds(self,bank,extension='.wav'):
+        """
+        Adds every sound file in the **Sounds** folder to a sound bank.
+
+        Each effect is keyed by its file name.  Audio must be opened on the main
+        thread, so the workers only read the files ahead of time.
+
+        :param bank: The sound bank to load the sounds into
+        :type bank:  :class:`SoundBank`
+
+        :param extension: The extension of the sound files
+        :type extension:  ``str``
+        """
+        from .app import GameApp
+        for name in sorted(GameApp.ASSET_INDEX['sounds']):
+            if name.endswith(extension):
+                path = os.path.join(GameApp.sounds,name)
+                self.add(name,_read,lambda data, name=name: bank.load(name,name),path)
+
+    def start(self):
+        """
+        Starts the work of every asset added so far on the worker threads.
+
+        Once started, the loader is ready as soon as every asset is finished (by
+        :meth:`poll`).  It does nothing if the loader has already started.
+        """
+        if self._pool is not None:
+            return
+        self._pool = ThreadPoolExecutor(self._workers)
+        for entry in self._pending:
+            if entry[1] is not None:
+                work, args = entry[1]
+                entry[1] = self._pool.submit(work,*args)
+        self._check()
+
+    def poll(self,budget=None):
+        """
+        Finishes the assets whose work is done, in order, on this (the main) thread.
+
+        This method never waits for a worker.  It stops at the first asset whose work
+        is not done, or once it has taken ``budget`` seconds.  It starts the loader if
+        it has not started yet.
+
+        :param budget: The most seconds to spend, or None for no limit
+        :type budget:  ``int`` or ``float`` > 0, or None
+
+        :return: The number of assets finished
+        :rtype:  ``int`` >= 0
+        """
+        self.start()
+        start = perf_counter()
+        count = 0
+        while self._pending:
+            name, future, finish = self._pending[0]
+            if future is not None and not future.done():
+                break
+            self._pending.pop(0)
+            try:
+                finish(None if future is None else future.result())
+            except Exception:
+                self._errors.append(name)
+            self._loaded += 1
+            count += 1
+            if budget is not None and perf_counter()-start >= budget:
+                break
+        self._check()
+        return count
+
+    def wait(self):
+        """
+        Loads every asset, waiting for the workers as necessary.
+
+        This method blocks until the loader is ready, so it is for scripts and tests
+        rather than games.
+        """
+        self.start()
+        while self._pending:
+            future = self._pending[0][1]
+            if future is not None:
+                future.exception()
+            self.poll()
+
+    def shutdown(self):
+        """
+        Stops the worker threads, once their current work is done.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+    # HIDDEN METHODS
+    def _check(self):
+        """
+        Sets the ready event if the loader has started and every asset is finished.
+        """
+        if self._pool is not None and not self._pending:
+            self._ready.set()
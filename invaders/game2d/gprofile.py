@@ -0,0 +1,321 @@
+"""
+Frame timing instrumentation for 2D game support.
+
+A :class:`FrameProfiler` collects, for every animation frame, the time spent clearing
+the view, updating and drawing, the number of graphics instructions drawn, and the
+``dt`` reported by the clock (along with its jitter, the distance from the target frame
+time).  Each of these is kept in a :class:`RollingHistogram`, which only remembers the
+most recent frames, so the statistics follow the game as it changes.
+
+You do not create a profiler yourself.  Instead, create the game with the keyword
+``profile`` (see :class:`GameApp`) and use the attribute ``profiler`` of the game.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import bisect
+import collections
+import json
+import math
+
+#: The upper bounds (in seconds) of the histogram bins for times: 10us to ~1.3s, four per octave
+TIME_BINS = tuple(1e-5*2**(k/4.0) for k in range(69))
+
+#: The upper bounds of the histogram bins for counts: 0, 1, 2, 4, ..., 65536
+COUNT_BINS = (0,)+tuple(2**k for k in range(17))
+
+
+class RollingHistogram(object):
+    """
+    A class representing a histogram of the most recent samples of a value.
+
+    The bins are fixed when the histogram is created.  A sample goes in the first bin
+    whose upper bound is at least the sample (samples larger than every bound go in an
+    overflow bin).  Once the histogram holds ``window`` samples, each new sample pushes
+    out the oldest one.  Adding a sample takes O(log bins) time.
+
+    Percentiles are estimated from the bins, so they are the upper bound of the bin
+    that holds the percentile (or the largest sample seen, for the overflow bin).
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def bounds(self):
+        """
+        The upper bounds of the bins, in increasing order.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of numbers.
+        """
+        return self._bounds
+
+    @property
+    def window(self):
+        """
+        The number of recent samples remembered.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._samples.maxlen
+
+    @property
+    def count(self):
+        """
+        The number of samples currently in the histogram.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int in 0..window.
+        """
+        return len(self._samples)
+
+    @property
+    def total(self):
+        """
+        The number of samples ever added to the histogram.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._total
+
+    @property
+    def mean(self):
+        """
+        The mean of the samples currently in the histogram (0 if it is empty).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float.
+        """
+        if not self._samples:
+            return 0.0
+        return self._sum/len(self._samples)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,bounds,window=600):
+        """
+        Creates a new, empty histogram.
+
+        :param bounds: The upper bounds of the bins
+        :type bounds:  increasing sequence of numbers
+
+        :param window: The number of recent samples to remember
+        :type window:  ``int`` > 0
+        """
+        assert type(window) == int and window > 0, 'window %s is not a positive int' % repr(window)
+        self._bounds  = tuple(bounds)
+        self._counts  = [0]*(len(self._bounds)+1)
+        self._samples = collections.deque(maxlen=window)
+        self._sum   = 0.0
+        self._total = 0
+        self._peak  = 0.0
+
+
+    # PUBLIC METHODS
+    def add(self,value):
+        """
+        Adds a sample to the histogram, pushing out the oldest one if it is full.
+
+        :param value: The sample
+        :type value:  ``int`` or ``float``
+        """
+        if len(self._samples) == self._samples.maxlen:
+            old, pos = self._samples[0]
+            self._counts[pos] -= 1
+            self._sum -= old
+        pos = bisect.bisect_left(self._bounds,value)
+        self._samples.append((value,pos))
+        self._counts[pos] += 1
+        self._sum += value
+        self._total += 1
+        if value > self._peak:
+            self._peak = value
+
+    def percentile(self,p):
+        """
+        :return: An estimate of the ``p``-th percentile of the samples (0 if empty).
+
+        :param p: The percentile
+        :type p:  ``int`` or ``float`` in 0..100
+        """
+        if not self._samples:
+            return 0.0
+        rank = max(1,int(math.ceil(p/100.0*len(self._samples))))
+        seen = 0
+        for pos in range(len(self._counts)):
+            seen += self._counts[pos]
+            if seen >= rank:
+                return self._bounds[pos] if pos < len(self._bounds) else self._peak
+        return self._peak
+
+    def bins(self):
+        """
+        :return: The nonempty bins, as a list of (upper bound, count) pairs.
+
+        The upper bound of the overflow bin is None.
+        """
+        result = []
+        for pos in range(len(self._counts)):
+            if self._counts[pos]:
+                bound = self._bounds[pos] if pos < len(self._bounds) else None
+                result.append((bound,self._counts[pos]))
+        return result
+
+    def summary(self):
+        """
+        :return: The count, mean and 50th, 90th and 99th percentiles, as a dictionary.
+        """
+        return {'count': self.count, 'total': self.total, 'mean': self.mean,
+                'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p99': self.percentile(99)}
+
+    def clear(self):
+        """
+        Removes every sample from the histogram.
+        """
+        self._counts  = [0]*(len(self._bounds)+1)
+        self._samples.clear()
+        self._sum  = 0.0
+        self._peak = 0.0
+
+
+# #mark -
+class FrameProfiler(object):
+    """
+    A class to collect per-frame timings of a :class:`GameApp`.
+
+    The profiler has one :class:`RollingHistogram` for each of the following:
+
+    * ``clear``: the seconds spent clearing the view
+    * ``update``: the seconds spent in ``update`` (all of the calls in the frame)
+    * ``draw``: the seconds spent in ``draw``
+    * ``frame``: the seconds spent in the whole frame
+    * ``instructions``: the number of graphics instructions drawn in the frame
+    * ``churn``: the number of graphics instructions added to or removed from the canvas
+    * ``dt``: the time since the last frame, as reported by the clock
+    * ``jitter``: the distance between ``dt`` and the target frame time
+    """
+    #: The names of the histograms in every profiler
+    NAMES = ('clear','update','draw','frame','instructions','churn','dt','jitter')
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def target(self):
+        """
+        The target frame time in seconds, used to compute the jitter.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._target
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded since the profiler was created.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._histograms['frame'].total
+
+
+    # BUILT-IN METHODS
+    def __init__(self,target,window=600):
+        """
+        Creates a new profiler.
+
+        :param target: The target frame time in seconds
+        :type target:  ``int`` or ``float`` > 0
+
+        :param window: The number of recent frames in each histogram
+        :type window:  ``int`` > 0
+        """
+        self._target = float(target)
+        self._histograms = {}
+        for name in self.NAMES:
+            bins = COUNT_BINS if name in ('instructions','churn') else TIME_BINS
+            self._histograms[name] = RollingHistogram(bins,window)
+
+    def __getitem__(self,name):
+        """
+        :return: The histogram with the given name.
+
+        :param name: The histogram name
+        :type name:  one of :attr:`NAMES`
+        """
+        return self._histograms[name]
+
+
+    # PUBLIC METHODS
+    def record(self,dt,clear,update,draw,instructions,churn=0):
+        """
+        Records the measurements of a single frame.
+
+        :param dt: The time since the last frame, as reported by the clock
+        :type dt:  ``float``
+
+        :param clear: The seconds spent clearing the view
+        :type clear:  ``float``
+
+        :param update: The seconds spent updating
+        :type update:  ``float``
+
+        :param draw: The seconds spent drawing
+        :type draw:  ``float``
+
+        :param instructions: The number of graphics instructions drawn
+        :type instructions:  ``int``
+        
+        :param churn: The number of graphics instructions added to or removed from the canvas
+        :type churn:  ``int``
+        """
+        histograms = self._histograms
+        histograms['clear'].add(clear)
+        histograms['update'].add(update)
+        histograms['draw'].add(draw)
+        histograms['frame'].add(clear+update+draw)
+        histograms['instructions'].add(instructions)
+        histograms['churn'].add(churn)
+        histograms['dt'].add(dt)
+        histograms['jitter'].add(abs(dt-self._target))
+
+    def summary(self):
+        """
+        :return: The summary of every histogram, as a dictionary keyed by name.
+        """
+        return dict((name,self._histograms[name].summary()) for name in self.NAMES)
+
+    def report(self):
+        """
+        :return: A table of the summaries, with times in milliseconds.
+        """
+        lines = ['%-13s %8s %10s %10s %10s %10s' % ('frames=%d' % self.frames,'count',
+                                                    'mean','p50','p90','p99')]
+        for name in self.NAMES:
+            data = self._histograms[name].summary()
+            scale = 1 if name in ('instructions','churn') else 1000
+            lines.append('%-13s %8d %10.3f %10.3f %10.3f %10.3f' %
+                         (name,data['count'],data['mean']*scale,data['p50']*scale,
+                          data['p90']*scale,data['p99']*scale))
+        return '\n'.join(lines)
+
+    def dump(self,filename):
+        """
+        Writes the summaries and the histogram bins to a JSON file.
+
+        :param filename: The file to write
+        :type filename:  ``str``
+        """
+        data = {'frames': self.frames, 'target': self._target, 'summary': self.summary(),
+                'bins': dict((name,self._histograms[name].bins()) for name in self.NAMES)}
+        with open(filename,'w') as file:
+            json.dump(data,file,indent=1)
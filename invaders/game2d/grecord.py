@@ -0,0 +1,347 @@
+"""
+Input recording and replay for 2D game support.
+
+An :class:`InputRecorder` saves the keyboard state that the game saw on every call to
+``update``, together with the ``dt`` of that call.  An :class:`InputReplay` reads such
+a recording back, and can stand in for the :class:`GInput` of a :class:`GameApp`.  A
+game that is deterministic (given its input and ``dt``) then plays out exactly as it
+did when it was recorded, which is useful for load tests and regression tests.
+
+Most games also use random numbers.  A recording keeps the seed of the game (if it has
+one), and a replay hands it back, so that the game can use the same random numbers.
+
+Only a fixed set of keys is recorded.  A recording is a short header followed by one
+fixed-size record per update: the recorded keys as a bitfield, the number of keys held
+down (``key_count``), and ``dt`` as a double::
+
+    header: b'G2DI', version (byte), number of keys (byte),
+            then each key name as a length (byte) and UTF-8 bytes,
+            then 1 if there is a seed or 0 if not (byte), and the seed (unsigned 64-bit)
+    record: keys (unsigned short), key count (byte), dt (double), little-endian
+
+Mouse input is not recorded.  Recordings of version 1 (which have no seed) can still be
+replayed.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import struct
+
+#: The first bytes of every recording
+MAGIC = b'G2DI'
+
+#: The version of the recording format
+VERSION = 2
+
+# The layout of a single update record
+_RECORD = struct.Struct('<HBd')
+
+# The layout of the seed in the header
+_SEED = struct.Struct('<BQ')
+
+
+def _write_header(file,keys,seed):
+    """
+    Writes the header of a recording.
+
+    :param file: The file to write to
+    :type file:  binary file
+
+    :param keys: The names of the recorded keys
+    :type keys:  ``tuple`` of ``str``
+
+    :param seed: The seed of the game, or None if it has none
+    :type seed:  ``int`` or None
+    """
+    file.write(MAGIC+bytes([VERSION,len(keys)]))
+    for key in keys:
+        name = key.encode('utf-8')
+        file.write(bytes([len(name)])+name)
+    file.write(_SEED.pack(0,0) if seed is None else _SEED.pack(1,seed))
+
+
+def _read_header(data):
+    """
+    :return: The recorded keys, the seed (or None) and the offset of the first record.
+
+    :param data: The contents of a recording
+    :type data:  ``bytes``
+    """
+    assert data[:4] == MAGIC, 'data is not an input recording'
+    assert data[4] in (1,VERSION), 'input recording version %d is not supported' % data[4]
+    keys = []
+    pos = 6
+    for ii in range(data[5]):
+        size = data[pos]
+        keys.append(data[pos+1:pos+1+size].decode('utf-8'))
+        pos += 1+size
+    seed = None
+    if data[4] >= 2:
+        flag, value = _SEED.unpack_from(data,pos)
+        if flag:
+            seed = value
+        pos += _SEED.size
+    return (tuple(keys),seed,pos)
+
+
+class InputRecorder(object):
+    """
+    A class to record the keyboard state of a game, one update at a time.
+
+    The records are written to the file as they are made, so a recording survives a
+    game that crashes or is killed (except perhaps for the last few records).  Call
+    :meth:`close` when done to flush the file.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def keys(self):
+        """
+        The names of the recorded keys.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of at most 16 strings.
+        """
+        return self._keys
+
+    @property
+    def seed(self):
+        """
+        The seed of the recorded game, or None if it has none.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be None or an int in 0..2**64-1.
+        """
+        return self._seed
+
+    @property
+    def frames(self):
+        """
+        The number of updates recorded so far.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+
+    # BUILT-IN METHODS
+    def __init__(self,filename,keys=('left','right','spacebar'),seed=None):
+        """
+        Creates a new recording, replacing any file with the same name.
+
+        :param filename: The file to record to
+        :type filename:  ``str``
+
+        :param keys: The names of the keys to record
+        :type keys:  ``tuple`` of at most 16 ``str``
+
+        :param seed: The seed of the game, or None if it has none
+        :type seed:  ``int`` in 0..2**64-1 or None
+        """
+        assert type(filename) == str, 'filename %s is not a string' % repr(filename)
+        assert 0 < len(keys) <= 16, 'keys %s must have 1 to 16 names' % repr(keys)
+        assert seed is None or (type(seed) == int and 0 <= seed < 2**64), 'seed %s is not valid' % repr(seed)
+        self._keys = tuple(keys)
+        self._seed = seed
+        self._frames = 0
+        self._file = open(filename,'wb')
+        _write_header(self._file,self._keys,self._seed)
+
+
+    # PUBLIC METHODS
+    def record(self,input,dt):
+        """
+        Records the keyboard state for one update.
+
+        :param input: The input that the update will see
+        :type input:  :class:`GInput` (or any object with the same key methods)
+
+        :param dt: The time in seconds given to the update
+        :type dt:  ``int`` or ``float``
+        """
+        bits = 0
+        for pos in range(len(self._keys)):
+            if input.is_key_down(self._keys[pos]):
+                bits |= 1 << pos
+        count = min(max(input.key_count,0),255)
+        self._file.write(_RECORD.pack(bits,count,dt))
+        self._frames += 1
+
+    def close(self):
+        """
+        Finishes the recording and closes the file.
+        """
+        if not self._file.closed:
+            self._file.close()
+
+
+# #mark -
+class InputReplay(object):
+    """
+    A class to play back an input recording.
+
+    An instance has the keyboard methods and attributes of :class:`GInput`, so it can be
+    used in place of it.  Only the recorded keys are ever down.  The mouse is never
+    pressed.
+
+    Call :meth:`advance` once before each update.  It moves to the next record and
+    returns the ``dt`` that was recorded for that update.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def recorded(self):
+        """
+        The names of the recorded keys.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of strings.
+        """
+        return self._recorded
+
+    @property
+    def seed(self):
+        """
+        The seed of the recorded game, or None if it had none.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be None or an int in 0..2**64-1.
+        """
+        return self._seed
+
+    @property
+    def frames(self):
+        """
+        The number of updates in the recording.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._records)
+
+    @property
+    def frame(self):
+        """
+        The number of updates played back so far.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int in 0..frames.
+        """
+        return self._frame
+
+    @property
+    def finished(self):
+        """
+        Whether every update in the recording has been played back.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._frame >= len(self._records)
+
+    @property
+    def touch(self):
+        """
+        The mouse position, which is always None in a replay.
+
+        **Immutable**: This value cannot be altered.
+        """
+        return None
+
+    @property
+    def key_count(self):
+        """
+        The number of keys held down in the current update.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._count
+
+    @property
+    def keys(self):
+        """
+        The list of recorded keys held down in the current update.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of strings (possibly empty)
+        """
+        return tuple(k for (k,v) in self._keystate.items() if v)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,filename):
+        """
+        Loads a recording for playback.
+
+        :param filename: The recording to load
+        :type filename:  ``str``
+        """
+        assert type(filename) == str, 'filename %s is not a string' % repr(filename)
+        with open(filename,'rb') as file:
+            data = file.read()
+
+        self._recorded, self._seed, pos = _read_header(data)
+        # Drop a partial record at the end, in case the recording was cut off
+        end = pos+(len(data)-pos)//_RECORD.size*_RECORD.size
+        self._records = list(_RECORD.iter_unpack(data[pos:end]))
+        self._frame = 0
+        self._keystate = {}
+        self._count = 0
+
+
+    # PUBLIC METHODS
+    def advance(self):
+        """
+        Moves to the next recorded update, and returns its ``dt``.
+
+        :return: The time in seconds given to the recorded update
+        :rtype:  ``float``
+        """
+        assert not self.finished, 'the recording is finished'
+        bits, self._count, dt = self._records[self._frame]
+        self._keystate = {}
+        for pos in range(len(self._recorded)):
+            self._keystate[self._recorded[pos]] = bool(bits & (1 << pos))
+        self._frame += 1
+        return dt
+
+    def rewind(self):
+        """
+        Moves back to the start of the recording.
+        """
+        self._frame = 0
+        self._keystate = {}
+        self._count = 0
+
+    def is_key_down(self,key):
+        """
+        Checks wether the key was held down in the current update.
+
+        :param key: the key to test
+        :type key:  ``str``
+
+        :return: True if ``key`` was recorded as held down
+        :rtype:  ``bool``
+        """
+        return key in self._keystate and self._keystate[key]
+
+    def is_touch_down(self):
+        """
+        Checks wether the mouse is currently held down.
+
+        :return: Always False, since the mouse is not recorded
+        :rtype:  ``bool``
+        """
+        return False
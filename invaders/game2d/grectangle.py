@@ -8,10 +8,7 @@ to draw shapes.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.graphics import *
-from kivy.graphics.instructions import *
-from kivy.uix.label import Label
-from kivy.uix.image import Image
+from .backend import *
 from .gobject import GObject
 from .app import GameApp
 
@@ -28,6 +25,7 @@ class GRectangle(GObject):
     The only new property for this class is ``linewidth``, which controls the width of
     the border around the rectangle.  For all other properties, see the documentation
     for :class:`GObject`."""
+    __slots__ = ('_linewidth',)
     
     # MUTABLE PROPERTIES 
     @property
@@ -76,23 +74,23 @@ class GRectangle(GObject):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache
+        Builds the drawing cache
         """
-        GObject._reset(self)
+        GObject._build(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
         if not self._fillcolor is None:
             fill = Rectangle(pos=(x,y), size=(self.width, self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
                         close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -111,6 +109,7 @@ class GEllipse(GRectangle):
     This class has exactly the same properties as :class:`GRectangle`.  See the 
     documentation of that class and :class:`GObject` for a complete list of attributes.
     """
+    __slots__ = ()
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -150,7 +149,7 @@ class GEllipse(GRectangle):
         
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
@@ -162,22 +161,22 @@ class GEllipse(GRectangle):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache.
+        Builds the drawing cache.
         """
-        GObject._reset(self)
+        GObject._build(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
         if not self._fillcolor is None:
             fill = Ellipse(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -204,6 +203,7 @@ class GImage(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -249,25 +249,25 @@ class GImage(GRectangle):
     
     
     # HIDDEN METHODS
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache.
+        Builds the drawing cache.
         """
-        GObject._reset(self)
+        GObject._build(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
         self._texture = GameApp.load_texture(self.source)
         fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -297,6 +297,7 @@ class GLabel(GRectangle):
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
     provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    __slots__ = ('_label','_fsize','_halign','_valign','_hanchor','_vanchor','_ha','_hv')
     
     # MUTABLE PROPERTIES
     @property
@@ -421,13 +422,11 @@ class GLabel(GRectangle):
         The horizontal coordinate of the object center.
         
         **Invariant**: Must be an int or float."""
-        return self._trans.x
+        return self._x
     
     @x.setter
     def x(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.x = float(value)
-        self._mtrue = False
+        GObject.x.fset(self,value)
         self._hanchor = 'center'
         self._ha = value
     
@@ -437,13 +436,11 @@ class GLabel(GRectangle):
         The vertical coordinate of the object center..
         
         **Invariant**: Must be an int or float."""
-        return self._trans.y
+        return self._y
     
     @y.setter
     def y(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.y = float(value)
-        self._mtrue = False
+        GObject.y.fset(self,value)
         self._vanchor = 'center'
         self._hv = value
     
@@ -462,7 +459,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -494,7 +491,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -526,7 +523,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -557,7 +554,7 @@ class GLabel(GRectangle):
         **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -636,7 +633,10 @@ class GLabel(GRectangle):
     
     def _reset(self):
         """
-        Resets the drawing cache.
+        Resets the drawing cache, after laying out the text.
+        
+        The layout changes the size of the label (and so its position, if it is anchored
+        by an edge), so it cannot wait for the cache to be built.
         """
         # Set up the label at the center.
         self._label.size = self._label.texture_size
@@ -652,15 +652,15 @@ class GLabel(GRectangle):
         
         # Reset the absolute anchor
         if self._hanchor == 'left':
-            self._trans.x = self._ha+self.width/2.0
+            GObject.x.fset(self,self._ha+self.width/2.0)
         elif self._hanchor == 'right':
-            self._trans.x = self._ha-self.width/2.0
+            GObject.x.fset(self,self._ha-self.width/2.0)
         
         # Reset the absolute anchor
         if self._vanchor == 'top':
-            self._trans.y = self._hv-self.height/2.0
+            GObject.y.fset(self,self._hv-self.height/2.0)
         elif self._vanchor == 'bottom':
-            self._trans.y = self._hv+self.height/2.0
+            GObject.y.fset(self,self._hv+self.height/2.0)
         
         # Reset the label anchor.
         if self.halign == 'left':
@@ -675,19 +675,25 @@ class GLabel(GRectangle):
             self._label.bottom = -self.height/2.0
         
         GObject._reset(self)
+    
+    def _build(self):
+        """
+        Builds the drawing cache.
+        """
+        GObject._build(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
         if self.fillcolor:
             fill = Rectangle(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         self._cache.add(self._label.canvas)
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -0,0 +1,339 @@
+"""
+A simulation thread for 2D game support.
+
+Normally ``update`` and ``draw`` both run on the main thread, one after the other, so
+a slow update delays the next frame on the screen.  A :class:`SimulationThread` runs
+the simulation on a worker thread instead, at a fixed rate.  After every step it
+publishes a snapshot of the game state, which the main thread reads to move its own
+objects and draw them.  The main thread never waits for a step, so it keeps drawing at
+its own frame rate, showing the latest snapshot, even when a step takes a long time.
+
+The two threads share only two things, each handed over under a single lock:
+
+* The input, which the main thread posts as an :class:`InputState` once per frame.
+* The snapshots, which are double-buffered.  The worker writes each new snapshot into
+  the back buffer while the main thread reads the front one, and then swaps them.
+
+The snapshots must be immutable (such as tuples of numbers), so that the main thread
+can keep one for as long as it likes while the worker goes on.  The simulation itself
+must only be touched on the worker thread, except in :meth:`SimulationThread.call`.
+
+Python only runs one thread at a time, so the worker does not make the game faster.
+It lets the main thread interrupt a long step to draw, so that the frames stay smooth.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import threading
+from time import perf_counter, sleep
+
+
+class InputState(object):
+    """
+    A class representing the keys held down at one moment.
+
+    An input state is immutable, so it is safe to hand to another thread.  It has the
+    same methods as :class:`GInput` for the keyboard.
+    """
+    __slots__ = ('_keys',)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def keys(self):
+        """
+        The keys held down.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of strings (possibly empty).
+        """
+        return tuple(self._keys)
+
+    @property
+    def key_count(self):
+        """
+        The number of keys held down.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._keys)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,keys=()):
+        """
+        Creates a new input state with the given keys held down.
+
+        :param keys: The keys held down
+        :type keys:  iterable of ``str``
+        """
+        self._keys = frozenset(keys)
+
+
+    # PUBLIC METHODS
+    def is_key_down(self,key):
+        """
+        :return: True if ``key`` is held down.
+
+        :param key: the key to test
+        :type key:  ``str``
+        """
+        return key in self._keys
+
+
+class SimulationThread(object):
+    """
+    A class to run a game simulation on a worker thread, at a fixed rate.
+
+    The simulation is given as two functions.  The function ``step`` advances the
+    simulation by one step, given the latest :class:`InputState` and the fixed step
+    time.  If it returns False, the worker pauses (for example, when the player loses
+    a life).  The function ``snapshot`` returns an immutable copy of the state that the
+    main thread needs to draw.
+
+    The worker runs as many steps as are due (at most ``max_steps`` at a time; if it
+    falls further behind, the extra time is dropped), and sleeps until the next one.
+    An exception in a step stops the worker, and is raised again on the main thread
+    by the next call to :meth:`latest`.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def timestep(self):
+        """
+        The seconds of game time in each step.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._timestep
+
+    @property
+    def steps(self):
+        """
+        The number of steps run so far.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._steps
+
+    @property
+    def dropped(self):
+        """
+        The number of steps dropped because the worker fell too far behind.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._dropped
+
+    @property
+    def paused(self):
+        """
+        Whether the worker is paused.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool.
+        """
+        return not self._awake.is_set()
+
+    @property
+    def running(self):
+        """
+        Whether the worker thread has started and not stopped.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+
+    # BUILT-IN METHODS
+    def __init__(self,step,snapshot,timestep=1/60.0,max_steps=5):
+        """
+        Creates a new simulation thread, but does not start it.
+
+        The first snapshot is taken right away, so :meth:`latest` always has one.
+
+        :param step: The function to advance the simulation by one step
+        :type step:  callable (with an InputState and the timestep), returning a bool
+
+        :param snapshot: The function to take a snapshot of the simulation
+        :type snapshot:  callable (with no arguments), returning an immutable value
+
+        :param timestep: The seconds of game time in each step
+        :type timestep:  ``int`` or ``float`` > 0
+
+        :param max_steps: The most steps to run at a time to catch up
+        :type max_steps:  ``int`` > 0
+        """
+        assert callable(step), '%s is not callable' % repr(step)
+        assert callable(snapshot), '%s is not callable' % repr(snapshot)
+        assert type(timestep) in [int,float] and timestep > 0, 'timestep %s is not valid' % repr(timestep)
+        assert type(max_steps) == int and max_steps > 0, 'max_steps %s is not valid' % repr(max_steps)
+        self._step = step
+        self._snapshot = snapshot
+        self._timestep = float(timestep)
+        self._maxsteps = max_steps
+
+        # The lock for the handoff of the input and the snapshots
+        self._lock = threading.Lock()
+        # The lock held by the worker for each step
+        self._steplock = threading.Lock()
+        self._awake = threading.Event()
+        self._awake.set()
+        self._stopping = False
+        self._thread = None
+        self._error = None
+
+        self._input = InputState()
+        self._buffers = [snapshot(),None]
+        self._front = 0
+        self._steps = 0
+        self._dropped = 0
+
+
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts the worker thread.
+
+        It does nothing if the worker has already started.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run,name='simulation',daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread, and waits for it to finish its current step.
+        """
+        self._stopping = True
+        self._awake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def pause(self):
+        """
+        Pauses the worker, and waits for it to finish its current step.
+
+        Once this method returns, no step runs until :meth:`resume`.
+        """
+        self._awake.clear()
+        with self._steplock:
+            pass
+
+    def resume(self):
+        """
+        Resumes the worker after a pause.
+
+        The time spent paused is not simulated.
+        """
+        self._awake.set()
+
+    def call(self,func,*args):
+        """
+        Calls a function on the simulation between two steps, and publishes a snapshot.
+
+        Use this to change the simulation from the main thread (for example, to bring
+        back the ship after the player lost a life).  The worker does not run while the
+        function does.
+
+        :param func: The function to call
+        :type func:  callable
+
+        :param args: The arguments of the function
+
+        :return: The result of the function
+        """
+        with self._steplock:
+            result = func(*args)
+            self._publish(self._snapshot())
+        return result
+
+    def post_input(self,input):
+        """
+        Hands the keys held down right now to the worker.
+
+        The worker uses the last input posted for every step until a new one is posted.
+
+        :param input: The input to copy
+        :type input:  :class:`GInput`, or any object with the attribute ``keys``
+        """
+        state = InputState(input.keys)
+        with self._lock:
+            self._input = state
+
+    def latest(self):
+        """
+        :return: The most recent snapshot published by the worker.
+
+        If the worker stopped with an exception, this method raises it.
+        """
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+        with self._lock:
+            return self._buffers[self._front]
+
+
+    # HIDDEN METHODS
+    def _publish(self,snapshot):
+        """
+        Writes a snapshot to the back buffer, and swaps it to the front.
+
+        :param snapshot: The snapshot to publish
+        :type snapshot:  immutable value
+        """
+        back = 1-self._front
+        self._buffers[back] = snapshot
+        with self._lock:
+            self._front = back
+
+    def _run(self):
+        """
+        Runs the steps of the simulation on the worker thread until stopped.
+        """
+        last = perf_counter()
+        lag = 0.0
+        try:
+            while not self._stopping:
+                if not self._awake.is_set():
+                    self._awake.wait()
+                    last = perf_counter()
+                    lag = 0.0
+                    continue
+
+                now = perf_counter()
+                lag += now-last
+                last = now
+                steps = 0
+                while lag >= self._timestep and steps < self._maxsteps:
+                    with self._steplock:
+                        if self._stopping or not self._awake.is_set():
+                            break
+                        with self._lock:
+                            input = self._input
+                        if self._step(input,self._timestep) is False:
+                            self._awake.clear()
+                        self._publish(self._snapshot())
+                        self._steps += 1
+                    lag -= self._timestep
+                    steps += 1
+                if lag >= self._timestep and self._awake.is_set():
+                    self._dropped += int(lag/self._timestep)
+                    lag = 0.0
+                if self._awake.is_set():
+                    sleep(max(0.0,self._timestep-lag))
+        except Exception as e:
+            self._error = e
@@ -9,8 +9,7 @@ by changing the current frame.
 Author: Walker M. White (wmw2)
 Date:   November 1, 2017 (Python 3 version)
 """
-from kivy.graphics import *
-from kivy.graphics.instructions import *
+from .backend import *
 from .grectangle import GRectangle, GObject
 from .app import GameApp
 
@@ -34,6 +33,7 @@ class GSprite(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture','_format','_frame','_images','_bounds')
     
     # MUTABLE PROPERTIES
     @property
@@ -122,11 +122,11 @@ class GSprite(GRectangle):
         assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
         self._format = value
     
-    def _reset(self):
+    def _build(self):
         """
-        Resets the drawing cache.
+        Builds the drawing cache.
         """
-        GObject._reset(self)
+        GObject._build(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
@@ -141,21 +141,21 @@ class GSprite(GRectangle):
                 for col in range(self._format[1]):
                     self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
                     tx += width
-                ty += width
+                ty += height
         else:
             print('Failed to load',repr(self.source))
         
         self._texture = self._images[self._frame]
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(self._bounds)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -0,0 +1,327 @@
+"""
+A timer wheel for scheduling game events.
+
+Kivy has its own clock, but it runs on the time of the computer, so it keeps going when
+a game is paused, and it does not run in step with a fixed timestep or a replay.  A
+:class:`Scheduler` runs on game time instead: it only moves forward when the game calls
+:meth:`Scheduler.advance` with the time of an update.  A :class:`GameApp` makes one
+the first time its attribute ``scheduler`` is used, and a subcontroller can make its
+own, so that its events stop when it is not updated.
+
+The scheduler is a hashed timer wheel.  Time is cut into ticks of a fixed length, and
+each event goes in the slot of the wheel for the tick that it is due.  Advancing by one
+frame only looks at the slots of the ticks in that frame, so the cost does not depend on
+how many events are waiting.  Periodic events run at their own rate, so (for example)
+one system can run at 120 Hz while another runs at 10 Hz.  An event that is due more
+than once in a frame runs once for each time.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+import math
+
+# The fraction of a tick that is allowed as rounding error in the game time
+_EPSILON = 1e-6
+
+
+class ScheduledEvent(object):
+    """
+    A class representing an event in a :class:`Scheduler`.
+
+    You never make one of these directly.  They are returned by the methods
+    :meth:`Scheduler.schedule_once` and :meth:`Scheduler.schedule_interval`, so that
+    the event can be cancelled later.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def active(self):
+        """
+        Whether this event is still waiting to run.
+
+        A one-time event is no longer active once it has run, and no event is active
+        once it is cancelled.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._active
+
+    @property
+    def period(self):
+        """
+        The seconds between two runs of this event, or None if it only runs once.
+
+        The value is rounded to a whole number of ticks of the scheduler.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be None or a float > 0.
+        """
+        return None if self._period is None else self._period*self._resolution
+
+    @property
+    def due(self):
+        """
+        The game time (in seconds) at which this event runs next.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._tick*self._resolution
+
+
+    # BUILT-IN METHODS
+    def __init__(self,callback,args,tick,period,wait,resolution):
+        """
+        Creates a new event.
+
+        :param callback: The function to call when the event is due
+        :type callback:  callable (with the seconds since the last run, and args)
+
+        :param args: The extra arguments for the callback
+        :type args:  ``tuple``
+
+        :param tick: The tick at which the event is due
+        :type tick:  ``int`` >= 0
+
+        :param period: The ticks between two runs, or None to run once
+        :type period:  ``int`` > 0 or None
+
+        :param wait: The ticks from when the event was scheduled to when it is due
+        :type wait:  ``int`` > 0
+
+        :param resolution: The seconds in a tick of the scheduler
+        :type resolution:  ``float`` > 0
+        """
+        self._callback = callback
+        self._args = args
+        self._tick = tick
+        self._period = period
+        self._wait = wait
+        self._resolution = resolution
+        self._active = True
+
+
+    # PUBLIC METHODS
+    def cancel(self):
+        """
+        Stops this event from running again.
+
+        It is safe to cancel an event that has already run or was already cancelled.
+        """
+        self._active = False
+
+
+class Scheduler(object):
+    """
+    A class to run one-time and periodic events on game time.
+
+    Add events with :meth:`schedule_once` and :meth:`schedule_interval`, and call
+    :meth:`advance` once per update with the time of that update.  As with the Kivy
+    clock, the callback of an event gets the seconds since the event was scheduled (or
+    since it last ran) as its first argument.  For a periodic event this is always its
+    period, even if the frames are longer or shorter.
+
+    Events that are due at the same tick run in the order that they were scheduled (a
+    periodic event is scheduled again each time it runs).  A callback may schedule or
+    cancel events, including its own.  An event scheduled by a callback never runs in
+    the same tick, even with a delay of 0.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def time(self):
+        """
+        The game time in seconds, which is the sum of the times given to :meth:`advance`.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._time
+
+    @property
+    def resolution(self):
+        """
+        The seconds in a tick of the wheel.
+
+        Every delay and period is rounded to a whole number of ticks (at least one).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._resolution
+
+    @property
+    def pending(self):
+        """
+        The number of events waiting to run.
+
+        A cancelled event still counts until the tick that it was due has passed.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._count
+
+
+    # BUILT-IN METHODS
+    def __init__(self,resolution=1/120.0,slots=256):
+        """
+        Creates a new scheduler at time 0, with no events.
+
+        The resolution should be no larger than the smallest period used, and the wheel
+        is fastest when most delays are shorter than ``resolution*slots`` seconds.  An
+        event due later than that is passed over once for each turn of the wheel.
+
+        :param resolution: The seconds in a tick of the wheel
+        :type resolution:  ``int`` or ``float`` > 0
+
+        :param slots: The number of slots in the wheel
+        :type slots:  ``int`` > 0
+        """
+        assert type(resolution) in [int,float] and resolution > 0, 'resolution %s is not valid' % repr(resolution)
+        assert type(slots) == int and slots > 0, 'slots %s is not a positive int' % repr(slots)
+        self._resolution = float(resolution)
+        self._wheel = [[] for x in range(slots)]
+        self._time = 0.0
+        self._tick = 0
+        self._count = 0
+
+
+    # PUBLIC METHODS
+    def schedule_once(self,callback,delay,*args):
+        """
+        Schedules a callback to run once, after a delay.
+
+        :param callback: The function to call
+        :type callback:  callable (with the seconds since it was scheduled, and args)
+
+        :param delay: The seconds to wait
+        :type delay:  ``int`` or ``float`` >= 0
+
+        :param args: Extra arguments for the callback
+
+        :return: The event, which may be used to cancel it
+        :rtype:  :class:`ScheduledEvent`
+        """
+        assert callable(callback), '%s is not callable' % repr(callback)
+        assert type(delay) in [int,float] and delay >= 0, 'delay %s is not valid' % repr(delay)
+        return self._add(callback,args,self._ticks(delay),None)
+
+    def schedule_interval(self,callback,period,*args):
+        """
+        Schedules a callback to run every ``period`` seconds, starting one period from now.
+
+        :param callback: The function to call
+        :type callback:  callable (with the period, and args)
+
+        :param period: The seconds between two runs
+        :type period:  ``int`` or ``float`` > 0
+
+        :param args: Extra arguments for the callback
+
+        :return: The event, which may be used to cancel it
+        :rtype:  :class:`ScheduledEvent`
+        """
+        assert callable(callback), '%s is not callable' % repr(callback)
+        assert type(period) in [int,float] and period > 0, 'period %s is not valid' % repr(period)
+        ticks = self._ticks(period)
+        return self._add(callback,args,ticks,ticks)
+
+    def advance(self,dt):
+        """
+        Moves game time forward, running every event that comes due.
+
+        :param dt: The seconds to move forward
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        self._time += dt
+        target = int(math.floor(self._time/self._resolution+_EPSILON))
+        while self._tick < target:
+            self._tick += 1
+            self._run(self._tick)
+
+    def clear(self):
+        """
+        Cancels every event (but keeps the game time).
+        """
+        for slot in self._wheel:
+            for event in slot:
+                event._active = False
+            del slot[:]
+        self._count = 0
+
+
+    # HIDDEN METHODS
+    def _ticks(self,seconds):
+        """
+        :return: The number of ticks (at least one) closest to the given seconds.
+
+        :param seconds: The seconds to convert
+        :type seconds:  ``int`` or ``float`` >= 0
+        """
+        return max(1,int(round(seconds/self._resolution)))
+
+    def _add(self,callback,args,wait,period):
+        """
+        :return: A new event, added to the wheel ``wait`` ticks from now.
+
+        :param callback: The function to call
+        :type callback:  callable
+
+        :param args: The extra arguments for the callback
+        :type args:  ``tuple``
+
+        :param wait: The ticks to wait
+        :type wait:  ``int`` > 0
+
+        :param period: The ticks between two runs, or None to run once
+        :type period:  ``int`` > 0 or None
+        """
+        event = ScheduledEvent(callback,args,self._tick+wait,period,wait,self._resolution)
+        self._wheel[event._tick % len(self._wheel)].append(event)
+        self._count += 1
+        return event
+
+    def _run(self,tick):
+        """
+        Runs the events due at the given tick, and drops the cancelled ones in its slot.
+
+        :param tick: The tick to run
+        :type tick:  ``int`` >= 0
+        """
+        index = tick % len(self._wheel)
+        slot = self._wheel[index]
+        if not slot:
+            return
+
+        due = []
+        keep = []
+        for event in slot:
+            if not event._active:
+                self._count -= 1
+            elif event._tick == tick:
+                due.append(event)
+            else:
+                keep.append(event)
+        self._wheel[index] = keep
+
+        for event in due:
+            # A callback earlier in this tick may have cancelled it
+            if not event._active:
+                self._count -= 1
+                continue
+            if event._period is None:
+                event._active = False
+                self._count -= 1
+            else:
+                event._tick += event._period
+                event._wait = event._period
+                self._wheel[event._tick % len(self._wheel)].append(event)
+            event._callback(event._wait*self._resolution,*event._args)
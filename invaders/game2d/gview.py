@@ -9,10 +9,7 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 # Basic Kivy Modules
-from kivy.graphics import *
-from kivy.graphics.instructions import *
-from kivy.uix.floatlayout import FloatLayout
-from kivy.metrics import dp
+from .backend import *
 
 from cornell import Point2
 
@@ -230,8 +227,7 @@ class GInput(object):
         """
         if self._view is None:
             return
-        from kivy.core.window import Window
-        self._keyboard = Window.request_keyboard(self._disable_keyboard, self._view, 'text')
+        self._keyboard = get_window().request_keyboard(self._disable_keyboard, self._view, 'text')
         self._keyboard.bind(on_key_down=self._capture_key)
         self._keyboard.bind(on_key_up=self._release_key)
     
@@ -323,8 +319,37 @@ class GView(FloatLayout):
     of this class will not properly display it on the screen.  Instead, you should 
     only use the one provided in the `view` attribute of :class:`GameApp`. 
     See the documentation of that class for more information.
+    
+    By default the view is in immediate mode: clearing the view removes every 
+    command from the canvas, and drawing adds them back.  In retained mode (see the
+    attribute :attr:`retained`) you still clear and draw everything every frame, but 
+    the canvas keeps its commands.  At the end of the frame, the view compares the
+    commands drawn with those of the previous frame, and only removes and inserts the
+    ones that changed.  An object that moves keeps the same command (its position is
+    inside it), so a frame in which nothing appears or disappears changes nothing.
     """
     
+    # MUTABLE ATTRIBUTES
+    @property
+    def retained(self):
+        """
+        Whether this view is in retained mode.
+        
+        Changing this value empties the canvas.  The value is False by default.
+        
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+    
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._frame.clear()
+        self._drawn = []
+        self._pending = []
+        self._retained = value
+    
+    
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -337,11 +362,44 @@ class GView(FloatLayout):
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
+        self._retained = False
+        self._drawn = []
+        self._pending = []
+        self._churn = 0
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
     
     
+    # IMMUTABLE PROPERTIES
+    @property
+    def instructions(self):
+        """
+        The number of graphics commands drawn to this view since it was last cleared.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        if self._retained:
+            return len(self._pending)
+        return len(self._frame.children)
+    
+    @property
+    def churn(self):
+        """
+        The number of graphics commands added to or removed from the canvas last frame.
+        
+        In immediate mode every command is removed and added again every frame.  In 
+        retained mode, only the commands that changed are.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._churn
+    
+    
     # PUBLIC METHODS
     def draw(self,cmd):
         """
@@ -353,7 +411,10 @@ class GView(FloatLayout):
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        self._frame.add(cmd)
+        if self._retained:
+            self._pending.append(cmd)
+        else:
+            self._frame.add(cmd)
     
     def clear(self):
         """
@@ -361,11 +422,47 @@ class GView(FloatLayout):
         
         This method is called for you automatically at the start of the animation
         frame.  That way, you are not drawing images on top of one another.
+        
+        In retained mode, the canvas is not touched until the end of the frame.
         """
-        self._frame.clear()
+        if self._retained:
+            self._pending = []
+        else:
+            self._churn = 2*len(self._frame.children)
+            self._frame.clear()
     
     
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Applies the commands drawn this frame to the canvas (in retained mode).
+        
+        The commands that start and end both the old and the new list of commands are
+        kept.  Only the commands between them are removed and inserted.  This method
+        is called for you automatically at the end of the animation frame.
+        """
+        if not self._retained:
+            return
+        
+        old = self._drawn
+        new = self._pending
+        size = min(len(old),len(new))
+        head = 0
+        while head < size and old[head] is new[head]:
+            head += 1
+        tail = 0
+        while tail < size-head and old[-1-tail] is new[-1-tail]:
+            tail += 1
+        
+        gone  = old[head:len(old)-tail]
+        added = new[head:len(new)-tail]
+        for cmd in gone:
+            self._frame.remove(cmd)
+        for pos in range(len(added)):
+            self._frame.insert(head+pos,added[pos])
+        self._churn = len(gone)+len(added)
+        self._drawn = new
+    
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -0,0 +1,724 @@
+"""
+The headless (null) backend for 2D game support.
+
+This module provides stand-ins for the parts of Kivy that game2d uses.  They keep the
+same attributes as the Kivy classes, so that all of the geometry in game2d (positions,
+sizes, ``contains``, and so on) works exactly as before.  However, they never open a
+window, touch the GPU, or load a texture or a sound from disk.
+
+This makes it possible to create and update game objects in batch jobs and benchmarks
+on a machine with no display.  Nothing is ever shown on screen.
+
+You should never import this module directly.  Set the environment variable
+``GAME2D_BACKEND`` to ``headless`` before importing game2d instead.  See the module
+:mod:`backend` for more information.
+
+Author: Walker M. White (wmw2)
+Date:   August 1, 2017 (Python 3 version)
+"""
+
+
+# #mark Graphics Instructions
+class Instruction(object):
+    """
+    A class representing a graphics instruction that does nothing.
+
+    Any keyword arguments given to the constructor are stored as attributes.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new null instruction.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        for key in keywords:
+            setattr(self,key,keywords[key])
+
+
+class InstructionGroup(Instruction):
+    """
+    A class representing a list of graphics instructions.
+
+    As with Kivy, the list of children is available in the attribute ``children``.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty instruction group.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        Instruction.__init__(self,**keywords)
+        self.children = []
+
+    def add(self,c):
+        """
+        Adds an instruction to the end of this group.
+
+        :param c: The instruction to add
+        :type c:  :class:`Instruction`
+        """
+        self.children.append(c)
+
+    def insert(self,index,c):
+        """
+        Inserts an instruction into this group at the given position.
+
+        :param index: The position to insert at
+        :type index:  ``int``
+
+        :param c: The instruction to add
+        :type c:  :class:`Instruction`
+        """
+        self.children.insert(index,c)
+
+    def remove(self,c):
+        """
+        Removes an instruction from this group.
+
+        :param c: The instruction to remove
+        :type c:  :class:`Instruction`
+        """
+        self.children.remove(c)
+
+    def clear(self):
+        """
+        Removes every instruction from this group.
+        """
+        self.children = []
+
+    def length(self):
+        """
+        :return: The number of instructions in this group
+        :rtype:  ``int`` >= 0
+        """
+        return len(self.children)
+
+
+class Canvas(InstructionGroup):
+    """
+    A class representing the canvas of a widget.
+    """
+    pass
+
+
+class PushMatrix(Instruction):
+    """
+    A class representing an instruction to save the current transform.
+    """
+    pass
+
+
+class PopMatrix(Instruction):
+    """
+    A class representing an instruction to restore the last saved transform.
+    """
+    pass
+
+
+class Translate(Instruction):
+    """
+    A class representing a translation.
+    """
+
+    def __init__(self,x=0.0,y=0.0,z=0.0):
+        """
+        Creates a new translation.
+
+        :param x: The horizontal offset
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical offset
+        :type y:  ``int`` or ``float``
+
+        :param z: The depth offset
+        :type z:  ``int`` or ``float``
+        """
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Rotate(Instruction):
+    """
+    A class representing a rotation.
+    """
+
+    def __init__(self,angle=0.0,axis=(0,0,1)):
+        """
+        Creates a new rotation.
+
+        :param angle: The angle of rotation in degrees
+        :type angle:  ``int`` or ``float``
+
+        :param axis: The axis of rotation
+        :type axis:  3-element tuple of numbers
+        """
+        self.angle = angle
+        self.axis = axis
+
+
+class Scale(Instruction):
+    """
+    A class representing a scaling factor.
+    """
+
+    def __init__(self,x=1.0,y=1.0,z=1.0):
+        """
+        Creates a new scaling factor.
+
+        :param x: The horizontal scale
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical scale
+        :type y:  ``int`` or ``float``
+
+        :param z: The depth scale
+        :type z:  ``int`` or ``float``
+        """
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Color(Instruction):
+    """
+    A class representing a color change.
+    """
+
+    def __init__(self,r=1.0,g=1.0,b=1.0,a=1.0):
+        """
+        Creates a new color change.
+
+        :param r: The red component
+        :type r:  ``float`` in 0..1
+
+        :param g: The green component
+        :type g:  ``float`` in 0..1
+
+        :param b: The blue component
+        :type b:  ``float`` in 0..1
+
+        :param a: The alpha component
+        :type a:  ``float`` in 0..1
+        """
+        self.rgba = [r,g,b,a]
+
+
+class Rectangle(Instruction):
+    """
+    A class representing a (possibly textured) rectangle.
+    """
+
+    def __init__(self,pos=(0,0),size=(100,100),texture=None,**keywords):
+        """
+        Creates a new rectangle.
+
+        :param pos: The bottom left corner
+        :type pos:  2-element tuple of numbers
+
+        :param size: The width and height
+        :type size:  2-element tuple of numbers
+
+        :param texture: The texture to draw in the rectangle
+        :type texture:  any value
+        """
+        Instruction.__init__(self,**keywords)
+        self.pos = pos
+        self.size = size
+        self.texture = texture
+
+
+class Ellipse(Rectangle):
+    """
+    A class representing an ellipse inside of a rectangle.
+    """
+    pass
+
+
+class Line(Instruction):
+    """
+    A class representing a line or an outline.
+    """
+    pass
+
+
+class Mesh(Instruction):
+    """
+    A class representing a triangle mesh.
+    """
+
+    def __init__(self,vertices=(),indices=(),**keywords):
+        """
+        Creates a new mesh.
+
+        :param vertices: The vertex data
+        :type vertices:  list of numbers
+
+        :param indices: The vertex indices
+        :type indices:  list of ints
+        """
+        Instruction.__init__(self,**keywords)
+        self.vertices = list(vertices)
+        self.indices = list(indices)
+
+
+# #mark Application Support
+class NullConfig(object):
+    """
+    A class representing a configuration that remembers its settings but ignores them.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty configuration.
+        """
+        self._data = {}
+
+    def set(self,section,option,value):
+        """
+        Sets a configuration option.
+
+        :param section: The option section
+        :type section:  ``str``
+
+        :param option: The option name
+        :type option:  ``str``
+
+        :param value: The option value
+        :type value:  ``str``
+        """
+        self._data[(section,option)] = value
+
+    def get(self,section,option):
+        """
+        :return: The value of the given configuration option
+        :rtype:  ``str``
+
+        :param section: The option section
+        :type section:  ``str``
+
+        :param option: The option name
+        :type option:  ``str``
+        """
+        return self._data[(section,option)]
+
+
+class NullClock(object):
+    """
+    A class representing a simulated clock.
+
+    The clock does not follow the wall clock.  Instead, every call to :meth:`tick`
+    advances the simulated time by :attr:`frametime` and fires any callbacks that are
+    now due.  Callbacks scheduled with an interval of 0 fire on every tick.
+    """
+
+    def __init__(self):
+        """
+        Creates a new clock at time 0.
+        """
+        self.frametime = 1.0/60
+        self.time = 0.0
+        self._events = []
+
+    def schedule_interval(self,callback,timeout):
+        """
+        Schedules a callback to fire every ``timeout`` seconds.
+
+        :param callback: The function to call with the time since its last call
+        :type callback:  callable
+
+        :param timeout: The number of seconds between calls
+        :type timeout:  ``int`` or ``float`` >= 0
+        """
+        self._events.append([callback,timeout,self.time,self.time+timeout,True])
+
+    def schedule_once(self,callback,timeout=0):
+        """
+        Schedules a callback to fire once after ``timeout`` seconds.
+
+        :param callback: The function to call with the time since it was scheduled
+        :type callback:  callable
+
+        :param timeout: The number of seconds to wait
+        :type timeout:  ``int`` or ``float``
+        """
+        self._events.append([callback,max(timeout,0),self.time,self.time+max(timeout,0),False])
+
+    def unschedule(self,callback):
+        """
+        Cancels every scheduled call to the given callback.
+
+        :param callback: The function to cancel
+        :type callback:  callable
+        """
+        self._events = [e for e in self._events if e[0] != callback]
+
+    def tick(self):
+        """
+        Advances the simulated time by one frame, firing any callbacks that are due.
+        """
+        self.time += self.frametime
+        for event in list(self._events):
+            if event[3] <= self.time+1e-9 and event in self._events:
+                dt = self.time-event[2]
+                event[2] = self.time
+                if event[4]:
+                    event[3] = self.time+event[1]
+                else:
+                    self._events.remove(event)
+                event[0](dt)
+
+
+Config = NullConfig()
+Clock  = NullClock()
+
+
+class App(object):
+    """
+    A class representing an application with no window.
+
+    Calling :meth:`run` builds the application and then ticks the simulated
+    :data:`Clock` as fast as possible until :meth:`stop` is called.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates, but does not start, a new application.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.root = None
+        self._running = False
+
+    def build(self):
+        """
+        :return: The root widget of this application.
+        """
+        return None
+
+    def run(self):
+        """
+        Builds the application and runs it until it is stopped.
+        """
+        self.root = self.build()
+        self._running = True
+        while self._running:
+            Clock.tick()
+
+    def stop(self):
+        """
+        Stops the application.
+        """
+        self._running = False
+
+
+def resource_add_path(path):
+    """
+    Adds a path to search for resources (ignored).
+
+    :param path: The path to add
+    :type path:  ``str``
+    """
+    pass
+
+
+def dp(value):
+    """
+    :return: The given density-independent size in pixels (always unchanged).
+    :rtype:  ``float``
+
+    :param value: The size to convert
+    :type value:  ``int`` or ``float``
+    """
+    return value
+
+
+def load_image(name):
+    """
+    :return: The texture for the given image file (always None).
+
+    :param name: The file name
+    :type name:  ``str``
+    """
+    return None
+
+
+def decode_image(filename):
+    """
+    :return: The decoded pixels of the given image file (always None).
+
+    :param filename: The path to the file
+    :type filename:  ``str``
+    """
+    return None
+
+
+def upload_image(data):
+    """
+    :return: The texture for decoded image data (always None).
+
+    :param data: The decoded image
+    :type data:  the result of :func:`decode_image`
+    """
+    return None
+
+
+# #mark Widgets
+class Widget(object):
+    """
+    A class representing a rectangular widget with a canvas and no window.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new widget at the origin.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.canvas = Canvas()
+        self.size_hint = (1,1)
+        self.pos  = (0,0)
+        self.size = (100,100)
+        self._bindings = {}
+
+    @property
+    def x(self):
+        return self.pos[0]
+
+    @x.setter
+    def x(self,value):
+        self.pos = (value,self.pos[1])
+
+    @property
+    def y(self):
+        return self.pos[1]
+
+    @y.setter
+    def y(self,value):
+        self.pos = (self.pos[0],value)
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @width.setter
+    def width(self,value):
+        self.size = (value,self.size[1])
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    @height.setter
+    def height(self,value):
+        self.size = (self.size[0],value)
+
+    @property
+    def right(self):
+        return self.x+self.width
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width
+
+    @property
+    def top(self):
+        return self.y+self.height
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height
+
+    @property
+    def bottom(self):
+        return self.y
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value
+
+    @property
+    def center(self):
+        return (self.x+self.width/2.0,self.y+self.height/2.0)
+
+    @center.setter
+    def center(self,value):
+        self.pos = (value[0]-self.width/2.0,value[1]-self.height/2.0)
+
+    def bind(self,**keywords):
+        """
+        Binds callbacks to the events of this widget.
+
+        :param keywords: dictionary of event names to callbacks
+        :type keywords:  keys are event names
+        """
+        for key in keywords:
+            self._bindings.setdefault(key,[]).append(keywords[key])
+
+    def unbind(self,**keywords):
+        """
+        Unbinds callbacks from the events of this widget.
+
+        :param keywords: dictionary of event names to callbacks
+        :type keywords:  keys are event names
+        """
+        for key in keywords:
+            if keywords[key] in self._bindings.get(key,[]):
+                self._bindings[key].remove(keywords[key])
+
+    def _dispatch(self,name,value):
+        """
+        Calls every callback bound to the given event.
+
+        :param name: The event name
+        :type name:  ``str``
+
+        :param value: The new value of the property
+        :type value:  any
+        """
+        for callback in self._bindings.get(name,[]):
+            callback(self,value)
+
+
+class FloatLayout(Widget):
+    """
+    A class representing a layout widget with no window.
+    """
+    pass
+
+
+class Label(Widget):
+    """
+    A class representing a text label with no font rendering.
+
+    The size of the text is estimated from the number of characters and the font size,
+    so that labels still have a reasonable width and height.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new text label.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        Widget.__init__(self)
+        self.text = ''
+        self.font_size = 15
+        self.font_name = 'Roboto'
+        self.bold = False
+        self.halign = 'left'
+        self.valign = 'bottom'
+        self.color = [1,1,1,1]
+        self.texture_size = (0,0)
+        for key in keywords:
+            setattr(self,key,keywords[key])
+        self.texture_update()
+
+    def texture_update(self):
+        """
+        Recomputes the (estimated) size of the rendered text.
+        """
+        lines = self.text.split('\n')
+        size = (max(len(line) for line in lines)*self.font_size*0.6,
+                len(lines)*self.font_size*1.2)
+        if size != self.texture_size:
+            self.texture_size = size
+            self._dispatch('texture_size',size)
+
+
+# #mark Input and Sound
+class NullKeyboard(object):
+    """
+    A class representing a keyboard that never has any key presses.
+    """
+
+    def bind(self,**keywords):
+        """
+        Binds callbacks to keyboard events (ignored).
+        """
+        pass
+
+    def unbind(self,**keywords):
+        """
+        Unbinds callbacks from keyboard events (ignored).
+        """
+        pass
+
+
+class NullWindow(object):
+    """
+    A class representing a window that is never shown.
+    """
+
+    def request_keyboard(self,callback,target,input_type='text'):
+        """
+        :return: A keyboard that never has any key presses.
+        :rtype:  :class:`NullKeyboard`
+        """
+        return NullKeyboard()
+
+
+_window = NullWindow()
+
+def get_window():
+    """
+    :return: The (null) application window.
+    :rtype:  :class:`NullWindow`
+    """
+    return _window
+
+
+class NullSound(object):
+    """
+    A class representing a sound that is never heard.
+    """
+
+    def __init__(self,source):
+        """
+        Creates a new silent sound.
+
+        :param source: The name of the sound file
+        :type source:  ``str``
+        """
+        self.source = source
+        self.volume = 1.0
+        self.loop = False
+        self.state = 'stop'
+
+    def play(self):
+        """
+        Plays this sound (silently).
+        """
+        self.state = 'play'
+
+    def stop(self):
+        """
+        Stops this sound.
+        """
+        self.state = 'stop'
+
+
+class NullSoundLoader(object):
+    """
+    A class representing a sound loader that never reads a file.
+    """
+
+    def load(self,filename):
+        """
+        :return: A silent sound for the given file
+        :rtype:  :class:`NullSound`
+
+        :param filename: The name of the sound file
+        :type filename:  ``str``
+        """
+        return NullSound(filename)
+
+
+SoundLoader = NullSoundLoader()
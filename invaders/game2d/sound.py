@@ -2,12 +2,15 @@
 Sound classes for 2D game support.
 
 This classes wrap the Kivy audio interface, making it simpler for students to use.
+Games with many sound effects should use a :class:`SoundBank`, which loads every
+effect before the game starts.
 
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.core.audio import SoundLoader
+from .backend import SoundLoader
 from .app import GameApp
+from time import perf_counter
 
 
 class Sound(object):
@@ -179,3 +182,229 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+
+
+# #mark -
+class SoundBank(object):
+    """
+    A class representing preloaded sound effects, each with a pool of voices.
+    
+    Creating a :class:`Sound` reads and decodes its file, which is far too slow to do
+    in the middle of an animation frame.  A sound bank loads every effect ahead of
+    time, usually with :meth:`preload` when the game starts, and never touches a file 
+    after that.
+    
+    A :class:`Sound` cannot play again until it has finished, so each effect is loaded 
+    several times, as a pool of voices.  The method :meth:`play` uses a voice that is 
+    not playing.  If every voice is playing, it steals the one that started first 
+    (cutting it off).  The bank counts its loads, plays and steals, and keeps the time 
+    that each call to play takes in a :class:`RollingHistogram`.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def voices(self):
+        """
+        The default number of voices for each effect.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an ``int`` > 0.
+        """
+        return self._voices
+    
+    @property
+    def loads(self):
+        """
+        The number of sound files loaded (one for each voice).
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._loads
+    
+    @property
+    def plays(self):
+        """
+        The number of times an effect was played.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._plays
+    
+    @property
+    def steals(self):
+        """
+        The number of plays that had to cut off a voice that was still playing.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return self._steals
+    
+    @property
+    def latency(self):
+        """
+        The seconds taken by the most recent calls to :meth:`play`.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a :class:`RollingHistogram`.
+        """
+        return self._latency
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,voices=4):
+        """
+        Creates a new, empty sound bank.
+        
+        :param voices: The default number of voices for each effect
+        :type voices:  ``int`` > 0
+        """
+        from .gprofile import RollingHistogram, TIME_BINS
+        assert type(voices) == int and voices > 0, 'voices %s is not a positive int' % repr(voices)
+        self._voices = voices
+        # For each effect: [list of voices, index of the next voice to use]
+        self._data = {}
+        self._loads  = 0
+        self._plays  = 0
+        self._steals = 0
+        self._load_time = 0.0
+        self._latency = RollingHistogram(TIME_BINS)
+    
+    def __len__(self):
+        """
+        :return: The number of effects in this bank.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._data)
+    
+    def __contains__(self,key):
+        """
+        :return: True if the bank has an effect with the given key.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        """
+        return key in self._data
+    
+    def __iter__(self):
+        """
+        :return: The iterator for the keys of this bank.
+        :rtype:  ``iterable``
+        """
+        return iter(self._data.keys())
+    
+    
+    # PUBLIC METHODS
+    def keys(self):
+        """
+        :return: The keys of the effects in this bank.
+        :rtype:  ``iterable``
+        """
+        return self._data.keys()
+    
+    def load(self,key,filename,voices=None):
+        """
+        Loads an effect from a file, once for each voice.
+        
+        Loading a key that is already in the bank replaces its effect.
+        
+        :param key: The key identifying the effect
+        :type key:  ``str``
+        
+        :param filename: The name of the sound file
+        :type filename:  ``str``, a file in the **Sounds** folder
+        
+        :param voices: The number of voices, or None for the default
+        :type voices:  ``int`` > 0 or None
+        """
+        if voices is None:
+            voices = self._voices
+        assert type(voices) == int and voices > 0, 'voices %s is not a positive int' % repr(voices)
+        start = perf_counter()
+        self._data[key] = [[Sound(filename) for ii in range(voices)],0]
+        self._load_time += perf_counter()-start
+        self._loads += voices
+    
+    def preload(self,extension='.wav'):
+        """
+        Loads every sound file in the **Sounds** folder with the given extension.
+        
+        Each effect is keyed by its file name, as in ``bank.play('pew1.wav')``.
+        
+        :param extension: The extension of the files to load
+        :type extension:  ``str``
+        
+        :return: The keys of the effects loaded
+        :rtype:  ``list`` of ``str``
+        """
+        loaded = []
+        for filename in sorted(GameApp.ASSET_INDEX['sounds']):
+            if filename.endswith(extension):
+                self.load(filename,filename)
+                loaded.append(filename)
+        return loaded
+    
+    def play(self,key,volume=1.0):
+        """
+        Plays an effect with the next free voice (or the oldest voice, if none is free).
+        
+        :param key: The key identifying the effect
+        :type key:  ``str``, a key in this bank
+        
+        :param volume: The volume of this play
+        :type volume:  ``float`` in 0..1
+        
+        :return: The voice playing the effect
+        :rtype:  :class:`Sound`
+        """
+        start = perf_counter()
+        entry = self._data[key]
+        voices = entry[0]
+        first = entry[1]
+        choice = None
+        for pos in range(len(voices)):
+            voice = voices[(first+pos) % len(voices)]
+            if not voice.playing:
+                choice = (first+pos) % len(voices)
+                break
+        if choice is None:
+            # Voices start in turn, so the next one in turn started first
+            choice = first
+            voices[choice].stop()
+            self._steals += 1
+        entry[1] = (choice+1) % len(voices)
+        
+        voice = voices[choice]
+        voice.volume = volume
+        voice.play()
+        self._plays += 1
+        self._latency.add(perf_counter()-start)
+        return voice
+    
+    def stop(self,key=None):
+        """
+        Stops every voice of an effect, or of every effect if ``key`` is None.
+        
+        :param key: The key identifying the effect
+        :type key:  ``str``, a key in this bank, or None
+        """
+        keys = self._data.keys() if key is None else [key]
+        for k in keys:
+            for voice in self._data[k][0]:
+                voice.stop()
+    
+    def stats(self):
+        """
+        :return: The loads, plays, steals and play latency, as a dictionary.
+        
+        The load time and latencies are in seconds.
+        """
+        return {'effects': len(self._data), 'loads': self._loads, 'load_time': self._load_time,
+                'plays': self._plays, 'steals': self._steals, 'latency': self._latency.summary()}
@@ -24,6 +24,14 @@ Debasmita Bhattacharya (db758) and Amelia Myers (arm293)
 """
 from consts import *
 from game2d import *
+import math
+import collections
+
+# NumPy is optional; the alien formation falls back to plain lists without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than 
 # consts.py.  If you need extra information from Gameplay, then it should be
@@ -55,6 +63,7 @@ class Ship(GImage):
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     """
+    __slots__ = ()
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     
@@ -124,6 +133,7 @@ class Alien(GImage):
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     """
+    __slots__ = ('_score',)
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     
@@ -206,6 +216,8 @@ class Bolt(GRectangle):
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     """
+    __slots__ = ('_velocity',)
+    
     def __init__(self, x, bottom, width, height, linecolor, fillcolor, velocity):
         """ Initializer for a bolt.
         This method initilizes a bolt image in the game.
@@ -252,6 +264,41 @@ class Bolt(GRectangle):
     # INITIALIZER TO SET THE VELOCITY
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
+    def reset(self, x, bottom, width, height, linecolor, fillcolor, velocity):
+        """ Reuses this bolt for a new shot.
+        
+        This method takes the same arguments as the initializer.  Only the attributes
+        that changed are set again, so a bolt reused with the same size and colors
+        keeps the drawing instructions it already made.
+        
+        Parameter x: the x-coordinate of the middle of the bolt
+        Precondition: x is an int or float
+        
+        Parameter bottom: the y coordinate of the bottom edge of the bolt
+        Precondition: bottom is an int or float
+        
+        Parameter width: the width of the bolt
+        Precondition: width is an int or float > 0
+        
+        Parameter height: the height of the bolt
+        Precondition: height is an int or float > 0
+        
+        Parameter linecolor: the color of the outline of the bolt
+        Precondition: linecolor is a valid color
+        
+        Parameter fillcolor: the color of the bolt
+        Precondition: fillcolor is a valid color
+        
+        Parameter velocity: the velocity of the bolt when fired
+        Precondition: velocity is a number"""
+        self.width = width
+        self.height = height
+        self.linecolor = linecolor
+        self.fillcolor = fillcolor
+        self.x = x
+        self.bottom = bottom
+        self._velocity = velocity
+    
     def isPlayerBolt(self):
         """ Returns: True if the velocity of a bolt object is positive.
         
@@ -269,3 +316,595 @@ class Bolt(GRectangle):
             return True
         
 #IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
+
+class Formation(object):
+    """
+    A class to represent the alien formation as a lattice with an offset.
+
+    Every alien in the wave moves by the same amount at the same time, so the formation
+    keeps the starting position of each column and row, and one offset for the whole
+    formation, instead of asking each Alien to move itself.  A march step or a descent
+    only changes the offset, so it takes O(1) time, and the position of an alien is
+    computed from its column, its row and the offset when it is needed.  The alive
+    flags are a rows x cols array, which is a NumPy array when NumPy is installed (and
+    FORMATION_NUMPY is True) and a list of lists otherwise.
+
+    The Alien objects are only views used for drawing and exact collision tests.  Their
+    positions are set lazily.  A lookup with alien moves only the view it returns, and
+    the other views are only moved (by sync) when they are drawn one by one.
+
+    When FORMATION_BATCH is True, the formation is drawn as a single GSpriteBatch with
+    one sprite per alien, placed at its starting position.  A march step or a descent
+    then only moves the whole batch, and a dead alien is removed from it, so the
+    Alien views are only used for collision tests.
+
+    The formation never adds a step to the old positions.  Instead it counts how far it
+    has moved from its starting lattice, in fixed-point units (FORMATION_UNITS per pixel),
+    and recomputes the positions from that offset.  So the positions after any sequence
+    of steps are exact, and do not depend on the order of the steps or on the backend.
+
+    Row 0 is the bottom row of the formation and column 0 is the leftmost column.
+
+    INSTANCE ATTRIBUTES:
+        _rows:   the number of rows in the formation [int > 0]
+        _cols:   the number of aliens in each row [int > 0]
+        _numpy:  whether _alive is a NumPy array [bool]
+        _alive:  whether each alien is still alive [rows x cols array of bool]
+        _xs:     the x-coordinate of each column before any march [list of float]
+        _ys:     the y-coordinate of each row before any descent [list of float]
+        _dx:     the distance marched to the right, in fixed-point units [int]
+        _dy:     the distance descended, in fixed-point units [int]
+        _views:  the images used to draw each alien [2d list of Alien or None]
+        _batch:  the sprites used to draw the whole formation [GSpriteBatch or None]
+        _sprites: the sprite handle of each alien in _batch [2d list of int, or None]
+        _synced: whether every view is at the current position of its alien [bool]
+        _front:  the row of the bottom live alien in each column, or -1 if the column
+                 is empty [list of int]
+        _columns: the columns that still have a live alien, in no order [list of int]
+        _place:  the index of each column in _columns, or -1 if it is not there [list of int]
+        _live:   the number of aliens still alive [int >= 0]
+        _inrow:  the number of aliens still alive in each row [list of int >= 0]
+        _lowest: the bottom row with a live alien, or rows if there is none [int]
+        _left:   the leftmost column with a live alien, or cols if there is none [int]
+        _right:  the rightmost column with a live alien, or -1 if there is none [int]
+        _kills:  the (row, col) of every alien destroyed, in order [list of pairs of int]
+    """
+
+    # INITIALIZER TO CREATE THE FORMATION
+    def __init__(self, rows, cols, vectorized=FORMATION_NUMPY, batched=FORMATION_BATCH):
+        """ Initializer for an alien formation.
+        This method places rows x cols aliens on the lattice defined in consts.py.
+        Attributes:
+        rows: the number of rows of aliens [int > 0]
+        cols: the number of aliens in each row [int > 0]
+        vectorized: whether to keep the alive flags in a NumPy array when NumPy is installed [bool]
+        batched: whether to draw the formation as one GSpriteBatch [bool]"""
+        self._rows = rows
+        self._cols = cols
+        self._numpy = vectorized and numpy is not None
+
+        bottom = (GAME_HEIGHT - ALIEN_CEILING - 0.5*ALIEN_HEIGHT
+                  - (rows-1)*ALIEN_V_SEP - (rows-1)*ALIEN_HEIGHT)
+        vert = ALIEN_V_SEP + ALIEN_HEIGHT
+        xs = [float((col+1)*ALIEN_WIDTH + col*ALIEN_H_SEP) for col in range(cols)]
+        ys = [float(bottom + row*vert) for row in range(rows)]
+        self._xs = xs
+        self._ys = ys
+        self._dx = 0
+        self._dy = 0
+
+        if self._numpy:
+            self._alive = numpy.ones((rows, cols), dtype=bool)
+        else:
+            self._alive = [[True]*cols for row in range(rows)]
+
+        self._views = []
+        self._batch = GSpriteBatch(ALIEN_WIDTH, ALIEN_HEIGHT) if batched else None
+        self._sprites = [] if batched else None
+        for row in range(rows):
+            if row%6 == 0 or row%6 == 1:
+                source = ALIEN_IMAGES[0]
+            elif row%6 == 2 or row%6 == 3:
+                source = ALIEN_IMAGES[1]
+            else:
+                source = ALIEN_IMAGES[2]
+            self._views.append([Alien(xs[col], ys[row], ALIEN_WIDTH, ALIEN_HEIGHT, source)
+                                for col in range(cols)])
+            if batched:
+                self._sprites.append([self._batch.add(xs[col], ys[row], source)
+                                      for col in range(cols)])
+        self._synced = True
+        self._front = [0]*cols
+        self._columns = list(range(cols))
+        self._place = list(range(cols))
+        self._live = rows*cols
+        self._inrow = [cols]*rows
+        self._lowest = 0
+        self._left = 0
+        self._right = cols-1
+        self._kills = []
+
+    # GETTERS
+    def rows(self):
+        """ Returns: the number of rows in the formation"""
+        return self._rows
+
+    def cols(self):
+        """ Returns: the number of aliens in each row of the formation"""
+        return self._cols
+
+    def is_alive(self, row, col):
+        """ Returns: True if the alien at (row, col) has not been destroyed
+
+        Parameter row: the row of the alien
+        Precondition: row is an int in 0..rows-1 (negative indices count from the end)
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..cols-1 (negative indices count from the end)"""
+        return bool(self._alive[row][col])
+
+    def get_x(self, row, col):
+        """ Returns: the x-coordinate of the center of the alien at (row, col)
+
+        The value is a float, even when the formation is stored in NumPy arrays."""
+        return self._col_x(col)
+
+    def get_y(self, row, col):
+        """ Returns: the y-coordinate of the center of the alien at (row, col)
+
+        The value is a float, even when the formation is stored in NumPy arrays."""
+        return self._row_y(row)
+
+    def count(self):
+        """ Returns: the number of aliens still alive in the formation
+
+        The formation counts the aliens as they are destroyed, so this takes O(1) time."""
+        return self._live
+
+    def lowest_row(self):
+        """ Returns: the bottom row with a live alien, or None if every alien is dead
+
+        Like count, this is kept up to date as aliens are destroyed, so it takes O(1) time."""
+        return self._lowest if self._lowest < self._rows else None
+
+    def lowest_y(self):
+        """ Returns: the y-coordinate of the center of the bottom live aliens, or None
+
+        The value is None if every alien is dead.  It follows the formation as it descends."""
+        if self._lowest == self._rows:
+            return None
+        return self._row_y(self._lowest)
+
+    def front_count(self):
+        """ Returns: the number of columns that still have a live alien"""
+        return len(self._columns)
+
+    def front(self, index):
+        """ Returns: the (row, col) of the bottom live alien in a column with live aliens
+
+        Only the aliens at the front of their columns can shoot.  The columns with live
+        aliens are numbered 0..front_count()-1 in no particular order, so a random index
+        picks a random shooter in O(1) time, without looking at any dead aliens.
+
+        Parameter index: the number of the column
+        Precondition: index is an int in 0..front_count()-1"""
+        col = self._columns[index]
+        return (self._front[col], col)
+
+    def left_x(self):
+        """ Returns: the x-coordinate of the center of the leftmost live aliens, or None
+
+        The value is None if every alien is dead.  The formation keeps track of the
+        leftmost column with a live alien as aliens are destroyed, so this takes O(1) time."""
+        if self._left == self._cols:
+            return None
+        return self._col_x(self._left)
+
+    def right_x(self):
+        """ Returns: the x-coordinate of the center of the rightmost live aliens, or None
+
+        The value is None if every alien is dead.  Like left_x, this takes O(1) time."""
+        if self._right == -1:
+            return None
+        return self._col_x(self._right)
+
+    def bounds(self):
+        """ Returns: the bounding box (left, bottom, right, top) of the whole formation
+
+        The box covers every slot in the lattice, including destroyed aliens, so it can
+        be used as the broad-phase shape of the formation in a SpatialHash."""
+        return (self._col_x(0) - 0.5*ALIEN_WIDTH, self._row_y(0) - 0.5*ALIEN_HEIGHT,
+                self._col_x(-1) + 0.5*ALIEN_WIDTH, self._row_y(-1) + 0.5*ALIEN_HEIGHT)
+
+    def offset(self):
+        """ Returns: the distance (dx, dy) that the formation has marched right and descended
+        
+        Both distances are in fixed-point units (FORMATION_UNITS per pixel)."""
+        return (self._dx, self._dy)
+
+    def kills(self):
+        """ Returns: the (row, col) of every alien destroyed so far, in the order they died
+        
+        The result is the list kept by the formation, not a copy.  A kill only appends
+        to it, so the first n pairs never change, and another thread may read them while
+        this one goes on (see WaveSnapshot).  Never change the list."""
+        return self._kills
+
+    def alien(self, row, col):
+        """ Returns: the Alien drawn at (row, col), or None if it was destroyed
+
+        The alien is moved to its current position before it is returned, so it can be
+        used for exact collision tests.  Only this alien is moved, so this takes O(1)
+        time even right after the formation moves."""
+        view = self._views[row][col]
+        if view is not None and not self._synced:
+            view.x = self._col_x(col)
+            view.y = self._row_y(row)
+        return view
+
+    # METHODS TO MOVE THE FORMATION
+    def march(self, distance):
+        """ Returns: the number of live aliens that were moved
+
+        This method moves the whole formation distance pixels to the right (or to the
+        left if distance is negative).
+
+        Parameter distance: the number of pixels to move
+        Precondition: distance is a number"""
+        self._dx += round(distance*FORMATION_UNITS)
+        if self._batch is not None:
+            self._batch.x = self._dx/FORMATION_UNITS
+        self._synced = False
+        return self.count()
+
+    def descend(self, distance):
+        """ Moves the whole formation distance pixels down.
+
+        Parameter distance: the number of pixels to move
+        Precondition: distance is a number"""
+        self._dy += round(distance*FORMATION_UNITS)
+        if self._batch is not None:
+            self._batch.y = -self._dy/FORMATION_UNITS
+        self._synced = False
+
+    def place(self, dx, dy):
+        """ Moves the whole formation to the given offset from its starting lattice.
+        
+        Parameter dx: the distance marched to the right, in fixed-point units
+        Precondition: dx is an int
+        
+        Parameter dy: the distance descended, in fixed-point units
+        Precondition: dy is an int"""
+        if dx != self._dx:
+            self.march((dx - self._dx)/FORMATION_UNITS)
+        if dy != self._dy:
+            self.descend((dy - self._dy)/FORMATION_UNITS)
+
+    def kill(self, row, col):
+        """ Destroys the alien at (row, col).
+
+        Parameter row: the row of the alien
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..cols-1"""
+        self._alive[row][col] = False
+        self._views[row][col] = None
+        if self._batch is not None:
+            self._batch.remove(self._sprites[row][col])
+        self._live -= 1
+        self._inrow[row] -= 1
+        self._kills.append((row, col))
+        while self._lowest < self._rows and self._inrow[self._lowest] == 0:
+            self._lowest += 1
+        if row == self._front[col]:
+            self._advance(col)
+
+    def _col_x(self, col):
+        """ Returns: the x-coordinate of the aliens in a column, from the march offset
+
+        Parameter col: the column
+        Precondition: col is an int in 0..cols-1 (negative indices count from the end)"""
+        return self._xs[col] + self._dx/FORMATION_UNITS
+
+    def _row_y(self, row):
+        """ Returns: the y-coordinate of the aliens in a row, from the descent offset
+
+        Parameter row: the row
+        Precondition: row is an int in 0..rows-1 (negative indices count from the end)"""
+        return self._ys[row] - self._dy/FORMATION_UNITS
+
+    def _advance(self, col):
+        """ Moves the front of a column up to its next live alien.
+
+        If the column has no live aliens left, it is removed from the live columns, by
+        moving the last live column into its place, and the leftmost and rightmost live
+        columns move in past it (and any other empty columns) as needed.  Each row of a column is passed at
+        most once over the whole wave, so the index costs O(1) time per kill on average.
+
+        Parameter col: the column whose front alien was destroyed
+        Precondition: col is an int in 0..cols-1 and is in the live columns"""
+        row = self._front[col] + 1
+        while row < self._rows and not self._alive[row][col]:
+            row += 1
+        if row < self._rows:
+            self._front[col] = row
+            return
+        self._front[col] = -1
+        while self._left < self._cols and self._front[self._left] == -1:
+            self._left += 1
+        while self._right >= 0 and self._front[self._right] == -1:
+            self._right -= 1
+        index = self._place[col]
+        last = self._columns.pop()
+        if last != col:
+            self._columns[index] = last
+            self._place[last] = index
+        self._place[col] = -1
+
+    # METHODS TO CHECK FOR COLLISIONS
+    def collide(self, bolt):
+        """ Returns: the (row, col) of the alien hit by bolt, or None if there is none.
+
+        The formation is a regular lattice, so the rows and columns that the bolt could
+        touch are computed directly from the bolt position, the lattice spacing and the
+        current formation offset.  Only those aliens get an exact Alien.alien_collides
+        test.  With the sizes in consts.py (a bolt is narrower than ALIEN_H_SEP and
+        shorter than ALIEN_V_SEP) there is at most one candidate, so this takes O(1)
+        time no matter how large the formation is.
+
+        This gives the same answer as collide_scan, which tests every live alien.
+
+        Parameter bolt: The laser bolt to check
+        Precondition: bolt is of class Bolt"""
+        if not bolt.isPlayerBolt():
+            return None
+
+        x0 = self._col_x(0)
+        y0 = self._row_y(0)
+        hpitch = ALIEN_WIDTH + ALIEN_H_SEP
+        vpitch = ALIEN_HEIGHT + ALIEN_V_SEP
+        hreach = (BOLT_WIDTH + ALIEN_WIDTH)/2
+        vreach = (BOLT_HEIGHT + ALIEN_HEIGHT)/2
+        midx = bolt.x
+        midy = bolt.bottom + BOLT_HEIGHT/2
+
+        # Lattice cells whose center is (strictly) within reach of the bolt center
+        lo_col = max(0, math.floor((midx - hreach - x0)/hpitch) + 1)
+        hi_col = min(self._cols-1, math.ceil((midx + hreach - x0)/hpitch) - 1)
+        lo_row = max(0, math.floor((midy - vreach - y0)/vpitch) + 1)
+        hi_row = min(self._rows-1, math.ceil((midy + vreach - y0)/vpitch) - 1)
+
+        for row in range(lo_row, hi_row+1):
+            for col in range(lo_col, hi_col+1):
+                if self._alive[row][col] and self.alien(row, col).alien_collides(bolt):
+                    return (row, col)
+        return None
+
+    def collide_scan(self, bolt):
+        """ Returns: the (row, col) of the alien hit by bolt, or None if there is none.
+
+        This is the reference version of collide.  It tests every live alien in the
+        formation, row by row, and so takes time proportional to the formation size.
+
+        Parameter bolt: The laser bolt to check
+        Precondition: bolt is of class Bolt"""
+        for row in range(self._rows):
+            for col in range(self._cols):
+                if self._alive[row][col] and self.alien(row, col).alien_collides(bolt):
+                    return (row, col)
+        return None
+
+    # METHODS TO DRAW THE FORMATION
+    def sync(self):
+        """ Moves the Alien views of the live aliens to their current positions.
+
+        This takes O(rows x cols) time, so it is only used to draw the aliens one by one."""
+        for row in range(self._rows):
+            y = self._row_y(row)
+            for col in range(self._cols):
+                view = self._views[row][col]
+                if view is not None:
+                    view.x = self._col_x(col)
+                    view.y = y
+        self._synced = True
+
+    def draw(self, view):
+        """ Draws every live alien in the formation.
+
+        Parameter view: the view to draw to
+        Precondition: view is a GView"""
+        if self._batch is not None:
+            self._batch.draw(view)
+            return
+        if not self._synced:
+            self.sync()
+        for row in self._views:
+            for alien in row:
+                if alien is not None:
+                    alien.draw(view)
+
+
+class Hud(object):
+    """
+    A class representing the heads-up display with the lives and the score.
+    
+    The labels are created once, with the wave.  Rendering text is slow, so the lives
+    label is only given new text when the number of lives changes, and the score is a
+    GDigits, which draws pre-rendered digits instead of rendering text.  Call update
+    every frame with the current lives and score; it does nothing unless one changed.
+    
+    INSTANCE ATTRIBUTES:
+        _lives:     the number of lives on display [int >= 0]
+        _livestext: the label displaying the number of lives [GLabel]
+        _scoretext: the label in front of the score [GLabel]
+        _digits:    the score on display [GDigits]
+    """
+    
+    def __init__(self, lives, score):
+        """ Initializer for the heads-up display.
+        
+        Parameter lives: the number of lives to display
+        Precondition: lives is an int >= 0
+        
+        Parameter score: the score to display
+        Precondition: score is an int >= 0"""
+        self._lives = lives
+        self._livestext = GLabel(text="Lives: " + str(lives), x=120, y=650, linecolor=cornell.WHITE,
+                                 font_size=25, font_name="RetroGame")
+        self._scoretext = GLabel(text="Score:", x=600, y=650, linecolor=cornell.WHITE,
+                                 font_size=25, font_name="RetroGame")
+        self._digits = GDigits(value=score, x=self._scoretext.right+12, y=650,
+                               linecolor=cornell.WHITE, font_size=25, font_name="RetroGame")
+    
+    def update(self, lives, score):
+        """ Changes the lives and score on display, if they are different.
+        
+        Parameter lives: the number of lives to display
+        Precondition: lives is an int >= 0
+        
+        Parameter score: the score to display
+        Precondition: score is an int >= 0"""
+        if lives != self._lives:
+            self._lives = lives
+            self._livestext.text = "Lives: " + str(lives)
+        self._digits.value = score
+    
+    def draw(self, view):
+        """ Draws the heads-up display.
+        
+        Parameter view: the view to draw to
+        Precondition: view is a GView"""
+        self._livestext.draw(view)
+        self._scoretext.draw(view)
+        self._digits.draw(view)
+
+
+class WaveSnapshot(collections.namedtuple('WaveSnapshot',
+                                           'ship offset kills killed bolts lives score shots')):
+    """
+    A class representing the state of a wave at one moment, as needed to draw it.
+    
+    A snapshot is a tuple of numbers (and tuples), so it cannot change.  The one
+    exception is kills, which is the list of the formation itself, so that a snapshot
+    does not copy every kill so far.  Only its first killed pairs belong to the snapshot,
+    and those never change.  A wave run on the simulation thread hands one to the main
+    thread after every step (see Wave.snapshot and Wave.apply).
+    
+    ATTRIBUTES:
+        ship:   the x-coordinate of the ship [number, or None if it was destroyed]
+        offset: the distance the formation has moved, as in Formation.offset [pair of int]
+        kills:  the aliens destroyed, as in Formation.kills [list of pairs of int]
+        killed: the number of aliens destroyed so far [int >= 0]
+        bolts:  the laser bolts on screen [tuple of (x, bottom, velocity) triples]
+        lives:  the number of lives left [int >= 0]
+        score:  the current score [int >= 0]
+        shots:  the number of bolts fired by the player so far [int >= 0]
+    """
+    __slots__ = ()
+
+
+class BoltPool(object):
+    """
+    A class to recycle laser bolts instead of making a new Bolt for every shot.
+    
+    Making a Bolt runs the whole GObject initializer, and its drawing instructions are
+    made again the first time it is drawn.  A pool keeps the bolts that left the screen
+    and hands them out again for new shots, with a new position and velocity (and new
+    colors and size, only if they are different).  So a reused bolt keeps its drawing
+    instructions, and a steady stream of shots makes no new objects at all.
+    
+    The pool holds at most capacity idle bolts.  A bolt released to a full pool is
+    dropped, so a burst of shots does not keep its bolts forever.
+    
+    INSTANCE ATTRIBUTES:
+        _free:      the idle bolts, ready to reuse [list of Bolt]
+        _capacity:  the most idle bolts to keep [int >= 0]
+        _live:      the number of bolts handed out and not yet released [int >= 0]
+        _highwater: the most bolts that were ever out at the same time [int >= 0]
+        _made:      the number of bolts that the pool had to make [int >= 0]
+        _reused:    the number of bolts handed out from the idle bolts [int >= 0]
+    """
+    
+    def __init__(self, capacity=BOLT_POOL_SIZE):
+        """ Initializer for an empty bolt pool.
+        
+        Parameter capacity: the most idle bolts to keep
+        Precondition: capacity is an int >= 0"""
+        self._free = []
+        self._capacity = capacity
+        self._live = 0
+        self._highwater = 0
+        self._made = 0
+        self._reused = 0
+    
+    # GETTERS
+    def size(self):
+        """ Returns: the number of idle bolts in the pool"""
+        return len(self._free)
+    
+    def capacity(self):
+        """ Returns: the most idle bolts that the pool keeps"""
+        return self._capacity
+    
+    def live(self):
+        """ Returns: the number of bolts handed out and not yet released"""
+        return self._live
+    
+    def high_water(self):
+        """ Returns: the most bolts that were ever out at the same time"""
+        return self._highwater
+    
+    def stats(self):
+        """ Returns: the size and counters of the pool, as a dictionary"""
+        return {'size': len(self._free), 'capacity': self._capacity, 'live': self._live,
+                'highwater': self._highwater, 'made': self._made, 'reused': self._reused}
+    
+    def acquire(self, x, bottom, width, height, linecolor, fillcolor, velocity):
+        """ Returns: a bolt for a new shot, reused from the pool if possible.
+        
+        This method takes the same arguments as the Bolt initializer.
+        
+        Parameter x: the x-coordinate of the middle of the bolt
+        Precondition: x is an int or float
+        
+        Parameter bottom: the y coordinate of the bottom edge of the bolt
+        Precondition: bottom is an int or float
+        
+        Parameter width: the width of the bolt
+        Precondition: width is an int or float > 0
+        
+        Parameter height: the height of the bolt
+        Precondition: height is an int or float > 0
+        
+        Parameter linecolor: the color of the outline of the bolt
+        Precondition: linecolor is a valid color
+        
+        Parameter fillcolor: the color of the bolt
+        Precondition: fillcolor is a valid color
+        
+        Parameter velocity: the velocity of the bolt when fired
+        Precondition: velocity is a number"""
+        if self._free:
+            bolt = self._free.pop()
+            bolt.reset(x, bottom, width, height, linecolor, fillcolor, velocity)
+            self._reused += 1
+        else:
+            bolt = Bolt(x, bottom, width, height, linecolor, fillcolor, velocity)
+            self._made += 1
+        self._live += 1
+        if self._live > self._highwater:
+            self._highwater = self._live
+        return bolt
+    
+    def release(self, bolt):
+        """ Gives back a bolt that is no longer on screen.
+        
+        The bolt must not be used again after it is released, since the pool may
+        hand it out for another shot.
+        
+        Parameter bolt: the bolt to give back
+        Precondition: bolt is a Bolt from acquire, and not already released"""
+        self._live -= 1
+        if len(self._free) < self._capacity:
+            self._free.append(bolt)
@@ -0,0 +1,212 @@
+"""
+Parameter sweeps for Alien Invaders
+
+This module plays many simulated games over a grid of game settings, to see how the
+settings change the difficulty.  The grid covers ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED,
+BOLT_RATE and BOLT_SPEED.  The games are played by WaveBatch (see batch.py), so the
+settings are passed as arguments instead of being read from consts.py.
+
+Every combination of settings (and every repeat of it) is one job.  The jobs are spread
+over a pool of worker processes, and each result is appended to a JSON Lines file as soon
+as it finishes.  If a sweep is interrupted, run the same command again: jobs that are
+already in the results file are skipped.
+
+For example, to compare three formation sizes at two speeds:
+
+    python invaders/sweep.py --rows 3,5,8 --cols 12 --speed 0.5,1.0 --out sweep.jsonl
+
+The settings are given as options, never as plain numbers, because consts.py reads plain
+numbers on the command line as the formation size.
+
+Debasmita Bhattacharya (db758) and Amelia Myers (arm293)
+2 December 2017
+"""
+from consts import *
+from batch import WaveBatch, random_actions, tracking_actions
+import argparse
+import itertools
+import json
+import multiprocessing
+import numpy
+import os
+import time
+import zlib
+
+# The policies that a sweep can use to play the games
+POLICIES = {'random': lambda batch, rng: random_actions(rng, batch.envs()),
+            'track':  lambda batch, rng: tracking_actions(batch)}
+
+# The names of the swept settings, in the order they appear in a job key
+SETTINGS = ('rows', 'cols', 'speed', 'bolt_rate', 'bolt_speed')
+
+
+def job_key(job):
+    """ Returns: the string that identifies a job in the results file
+
+    Parameter job: the job to identify
+    Precondition: job is a dictionary with the keys in SETTINGS and 'policy', 'games',
+    'repeat', 'seed' and 'frames'"""
+    parts = ['%s=%s' % (name, job[name])
+             for name in SETTINGS + ('policy', 'games', 'repeat', 'seed', 'frames')]
+    return ','.join(parts)
+
+
+def make_jobs(grid, policy='random', games=256, repeats=1, seed=0, frames=36000):
+    """ Returns: the list of jobs for every combination of settings in grid
+
+    Parameter grid: the values to try for each setting
+    Precondition: grid is a dictionary that maps each name in SETTINGS to a list of values
+
+    Parameter policy: the name of the policy that plays the games
+    Precondition: policy is a key of POLICIES
+
+    Parameter games: the number of games in each job
+    Precondition: games is an int > 0
+
+    Parameter repeats: the number of jobs for each combination of settings
+    Precondition: repeats is an int > 0
+
+    Parameter seed: the base seed for the random number generators
+    Precondition: seed is an int >= 0
+
+    Parameter frames: the most frames to play before giving up on a game
+    Precondition: frames is an int > 0"""
+    jobs = []
+    for values in itertools.product(*[grid[name] for name in SETTINGS]):
+        for repeat in range(repeats):
+            job = dict(zip(SETTINGS, values))
+            job.update(policy=policy, games=games, repeat=repeat, seed=seed, frames=frames)
+            jobs.append(job)
+    return jobs
+
+
+def run_job(job, dt=1/60):
+    """ Returns: the result record of playing the games of one job
+
+    The random number generator is seeded from the job key, so a job always plays the
+    same games, no matter which worker runs it or in which order.
+
+    Parameter job: the job to run
+    Precondition: job is a dictionary made by make_jobs
+
+    Parameter dt: the time in seconds of one frame
+    Precondition: dt is a number > 0"""
+    key = job_key(job)
+    rng = numpy.random.default_rng([job['seed'], zlib.crc32(key.encode())])
+    batch = WaveBatch(job['games'], job['rows'], job['cols'], job['speed'],
+                      job['bolt_rate'], job['bolt_speed'], seed=rng.integers(2**32))
+    policy = POLICIES[job['policy']]
+
+    start = time.perf_counter()
+    for frame in range(job['frames']):
+        batch.step(policy(batch, rng), dt)
+        if batch.done().all():
+            break
+    runtime = time.perf_counter() - start
+
+    done = batch.done()
+    frames = batch.frames()
+    result = {'key': key}
+    result.update((name, job[name]) for name in SETTINGS)
+    result.update(policy=job['policy'], games=job['games'], repeat=job['repeat'], seed=job['seed'],
+                  finished=int(done.sum()),
+                  win_rate=float(batch.won().mean()),
+                  duration=float(batch.elapsed().mean()),
+                  frames=float(frames.mean()),
+                  score=float(batch.scores().mean()),
+                  lives=float(batch.lives().mean()),
+                  runtime=runtime,
+                  steps_per_second=float(frames.sum()/runtime) if runtime > 0 else 0.0)
+    return result
+
+
+def finished_keys(path):
+    """ Returns: the set of job keys already in the results file
+
+    Lines that cannot be read (such as a line cut off by an interruption) are ignored,
+    so those jobs are run again.
+
+    Parameter path: the results file
+    Precondition: path is a string"""
+    keys = set()
+    if not os.path.exists(path):
+        return keys
+    with open(path) as file:
+        for line in file:
+            try:
+                keys.add(json.loads(line)['key'])
+            except (ValueError, KeyError, TypeError):
+                pass
+    return keys
+
+
+def sweep(jobs, path, workers=None):
+    """ Runs every job that is not yet in the results file, and appends the results.
+
+    Results are written (and flushed) in the order the jobs finish, so an interrupted
+    sweep loses at most the jobs that were running.  Returns the number of jobs run.
+
+    Parameter jobs: the jobs to run
+    Precondition: jobs is a list of jobs made by make_jobs
+
+    Parameter path: the results file
+    Precondition: path is a string
+
+    Parameter workers: the number of worker processes, or None for one per core
+    Precondition: workers is None or an int > 0"""
+    done = finished_keys(path)
+    todo = [job for job in jobs if job_key(job) not in done]
+    print('%d jobs, %d already done, %d to run' % (len(jobs), len(jobs) - len(todo), len(todo)))
+    if not todo:
+        return 0
+
+    start = time.perf_counter()
+    with open(path, 'a') as file, multiprocessing.Pool(workers) as pool:
+        for count, result in enumerate(pool.imap_unordered(run_job, todo), 1):
+            file.write(json.dumps(result) + '\n')
+            file.flush()
+            print('[%d/%d] %s: win rate %.2f, score %.1f, %.1f s' %
+                  (count, len(todo), result['key'], result['win_rate'], result['score'],
+                   result['duration']))
+    elapsed = time.perf_counter() - start
+    print('%d jobs in %.1f seconds' % (len(todo), elapsed))
+    return len(todo)
+
+
+def parse_list(kind):
+    """ Returns: a function that converts a comma-separated string to a list of kind
+
+    Parameter kind: the type of each element
+    Precondition: kind is int or float"""
+    return lambda text: [kind(item) for item in text.split(',')]
+
+
+def parse_args(args=None):
+    """ Returns: the command line options of a sweep
+
+    Parameter args: the command line arguments, or None for sys.argv
+    Precondition: args is None or a list of strings"""
+    parser = argparse.ArgumentParser(description='Sweep Alien Invaders settings.')
+    parser.add_argument('--rows', type=parse_list(int), default=[ALIEN_ROWS])
+    parser.add_argument('--cols', type=parse_list(int), default=[ALIENS_IN_ROW])
+    parser.add_argument('--speed', type=parse_list(float), default=[ALIEN_SPEED])
+    parser.add_argument('--bolt-rate', type=parse_list(int), default=[BOLT_RATE])
+    parser.add_argument('--bolt-speed', type=parse_list(float), default=[BOLT_SPEED])
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--games', type=int, default=256, help='games per job')
+    parser.add_argument('--repeats', type=int, default=1, help='jobs per setting')
+    parser.add_argument('--frames', type=int, default=36000, help='frame limit per game')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='default: one per core')
+    parser.add_argument('--out', default='sweep.jsonl', help='results file (JSON Lines)')
+    return parser.parse_args(args)
+
+
+# Application code
+if __name__ == '__main__':
+    options = parse_args()
+    grid = {'rows': options.rows, 'cols': options.cols, 'speed': options.speed,
+            'bolt_rate': options.bolt_rate, 'bolt_speed': options.bolt_speed}
+    jobs = make_jobs(grid, options.policy, options.games, options.repeats,
+                     options.seed, options.frames)
+    sweep(jobs, options.out, options.workers)
@@ -45,11 +45,11 @@ class Wave(object):
     #UPDATE ME LATER
     INSTANCE ATTRIBUTES:
         _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave [rectangular 2d list of Alien or None] 
+        _formation: the aliens in the wave, stored as a lattice with one offset [Formation]
         _bolts:  the laser bolts currently on screen [list of Bolt, possibly empty]
         _dline:  the defensive line being protected [GPath]
         _lives:  the number of lives left  [int >= 0]
-        _time:   The amount of time since the last Alien "step" [number >= 0]
+        _clock:  the timers of the alien steps and fire, on the time of this wave [Scheduler]
 
     
     As you can see, all of these attributes are hidden.  You may find that you want to
@@ -64,41 +64,74 @@ class Wave(object):
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
         _direction: the direction that the aliens are moving in [right, down, left]
-        _alienfire: The number of steps until the aliens fire
+        _alienfire: the aliens only fire while more than this many are alive [int in 1..BOLT_RATE]
         _score: the current game score
+        _collider: the broad phase for all collisions in the wave [SpatialHash]
+        _random: the random numbers for alien fire, seeded per wave [random.Random]
+        _hud: the display of the lives and score [Hud]
+        _sounds: the preloaded sound effects [SoundBank, or None for no sound]
+        _pool: the bolts that left the screen, kept for new shots [BoltPool]
+        _shots: the number of bolts fired by the player so far [int >= 0]
     
     """
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def bolt_count(self):
+        """ Returns: the number of laser bolts currently on screen"""
+        return len(self._bolts)
+    
+    def alien_count(self):
+        """ Returns: the number of aliens still alive (in O(1) time)"""
+        return self._formation.count()
+    
+    def lowest_alien_y(self):
+        """ Returns: the y-coordinate of the lowest live aliens, or None if all are dead
+        
+        This takes O(1) time, so it is cheap enough to show every frame."""
+        return self._formation.lowest_y()
+    
+    def bolt_stats(self):
+        """ Returns: the size and counters of the bolt pool, as a dictionary"""
+        return self._pool.stats()
     
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, seed=None, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, sounds=None,
+                 batched=FORMATION_BATCH):
         """ Initializer to create ship and aliens.
         This method initializes the ship and alien wave in the game by constructing them.
+        The wave has its own random number generator, so two waves made with the same seed
+        (and given the same input and dt) play out exactly the same way.
+        Parameter seed: the seed for the random numbers, or None to seed from the system
+        Precondition: seed is an int or None
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+        Parameter sounds: the preloaded sound effects, or None for a silent wave
+        Precondition: sounds is a SoundBank with 'pew2.wav', or None
+        Parameter batched: whether to draw the aliens as one GSpriteBatch (see Formation)
+        Precondition: batched is a bool
         """
-        acc1 = []
-        for row in range(ALIEN_ROWS):
-            acc2 = []
-            for alien in range(ALIENS_IN_ROW):
-                if alien != None:
-                    y = GAME_HEIGHT - ALIEN_CEILING - 0.5*ALIEN_HEIGHT - (ALIEN_ROWS -1)*ALIEN_V_SEP - (ALIEN_ROWS -1)*ALIEN_HEIGHT
-                    vert = ALIEN_V_SEP + ALIEN_HEIGHT
-                    if row%6 == 0 or row%6 ==1:
-                        source = ALIEN_IMAGES[0]
-                    elif row%6 == 2 or row%6 ==3:
-                        source = ALIEN_IMAGES[1]
-                    elif row%6 == 4 or row%6 ==5:
-                        source = ALIEN_IMAGES[2]
-                    acc2.append(Alien((alien+1)*ALIEN_WIDTH + alien*ALIEN_H_SEP, y +row*vert, ALIEN_WIDTH, ALIEN_HEIGHT, source))
-            acc1.append(acc2)
-        self._aliens = acc1
+        self._random = random.Random(seed)
+        self._sounds = sounds
+        self._formation = Formation(rows, cols, batched=batched)
         self._ship = Ship(x=GAME_WIDTH/2, bottom = SHIP_BOTTOM, width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
         self._dline = GPath(points=[0, DEFENSE_LINE, GAME_WIDTH, DEFENSE_LINE], linewidth = 1, linecolor = cornell.WHITE)
         self._direction = 'right'
-        self._time = 0
         self._bolts = []
-        self._alienfire = random.randint(1, BOLT_RATE)
+        self._pool = BoltPool(BOLT_POOL_SIZE)
+        self._clock = Scheduler(TIMER_RESOLUTION, TIMER_SLOTS)
+        # The aliens step twice every ALIEN_SPEED seconds, once for alien_wave and once for alien_bolt
+        step = self._clock.schedule_interval(self._alien_step, ALIEN_SPEED/2)
+        # The fire runs right after every other step (events due at the same tick run in order)
+        self._clock.schedule_interval(self._alien_fire, 2*step.period)
+        self._alienfire = self._random.randint(1, BOLT_RATE)
         self._lives = 3
         self._score = 0
+        self._shots = 0
+        self._hud = Hud(self._lives, self._score)
+        self._collider = SpatialHash(COLLISION_CELL)
+        self._collider.insert(self._ship, LAYER_SHIP)
+        self._collider.insert(self._formation, LAYER_ALIENS, box=self._formation.bounds())
         
         
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
@@ -114,34 +147,98 @@ class Wave(object):
         self.ship_movement(input)
         self.alien_wave(dt)
         self.fireBolt(input)
-        self.alien_bolt(dt)
-        if self._ship != None:
-            for bolt in self._bolts:    
-                if self._ship.ship_collides(self._bolts[0]) == True:
+        self._collider.update(self._formation, self._formation.bounds())
+        for bolt, target in self._collider.pairs():
+            if bolt not in self._collider:
+                pass # Already used up on something else this frame
+            elif target is self._ship and self._ship != None:
+                if self._ship.ship_collides(bolt) == True:
+                    self._collider.remove(self._ship)
                     self._ship = None
                     self._lives -= 1
-                    del self._bolts[0]           
-        if self._aliens != None:
-            for row in range(len(self._aliens)):
-                for alien in range(len(self._aliens[row])):
-                    for bolt in self._bolts:
-                        if self._aliens[row][alien] != None: 
-                            if self._aliens[row][alien].alien_collides(bolt) == True:
-                                self._aliens[row][alien] = None
-                                pos = self._bolts.index(bolt)
-                                del self._bolts[pos]
-                                self._score += 10
+                    self.remove_bolt(bolt)
+            elif target is self._formation:
+                hit = self._formation.collide(bolt)
+                if hit != None:
+                    self._formation.kill(hit[0], hit[1])
+                    self.remove_bolt(bolt)
+                    self._score += 10
+        
+    
+    # METHODS TO RUN THE WAVE ON THE SIMULATION THREAD
+    
+    def simulate(self, input, dt):
+        """ Returns: True if the wave is still in play after moving it, False otherwise
+        
+        This is the step function for a SimulationThread.  It updates the wave, and
+        returns False once the ship is destroyed or the wave is over, so the thread
+        pauses until Invaders decides what to do next.
+        Parameter input: the keys held down
+        Precondition: input is an InputState (or GInput)
+        Parameter dt: time in seconds since the last step
+        Precondition: dt is a number"""
+        self.update(input, dt)
+        return not (self.checkPaused() or self.checkGameOver() or self.aliens_dead()
+                    or self.aliens_win())
+    
+    def snapshot(self):
+        """ Returns: the state of the wave needed to draw it, as a WaveSnapshot
         
+        The snapshot only holds numbers and tuples (and the list of kills, of which it
+        only uses the part that never changes), so the simulation thread can hand it to
+        the main thread while it goes on updating this wave."""
+        ship = None if self._ship is None else self._ship.x
+        bolts = tuple((x.x, x.bottom, x.GetBoltVelocity()) for x in self._bolts)
+        kills = self._formation.kills()
+        return WaveSnapshot(ship, self._formation.offset(), kills, len(kills),
+                            bolts, self._lives, self._score, self._shots)
+    
+    def apply(self, snapshot):
+        """ Moves the ship, aliens and laser bolts of this wave to match a snapshot
+        
+        This is for a wave that is only drawn, while another wave (made with the same
+        seed) is updated on the simulation thread.  The aliens destroyed since the last
+        snapshot are destroyed here too, and the bolts are reused from the bolt pool.
+        The shot sound is played here, on the main thread, when the player fired.
+        Parameter snapshot: the state to show
+        Precondition: snapshot is a WaveSnapshot from a wave with the same rows and cols"""
+        if snapshot.ship is None:
+            self._ship = None
+        else:
+            if self._ship is None:
+                self._ship = Ship(x=GAME_WIDTH/2, bottom = SHIP_BOTTOM,
+                                  width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
+            self._ship.x = snapshot.ship
+        
+        self._formation.place(*snapshot.offset)
+        kills = snapshot.kills
+        for index in range(len(self._formation.kills()), snapshot.killed):
+            self._formation.kill(*kills[index])
+        
+        # The bolts have the sizes and colors used in fireBolt and alien_bolt
+        bolts = snapshot.bolts
+        while len(self._bolts) > len(bolts):
+            self._pool.release(self._bolts.pop())
+        for index in range(len(bolts)):
+            x, bottom, velocity = bolts[index]
+            color = cornell.BLUE if velocity > 0 else cornell.GREEN
+            if index < len(self._bolts):
+                self._bolts[index].reset(x, bottom, 5, 20, color, color, velocity)
+            else:
+                self._bolts.append(self.new_bolt(x, bottom, 5, 20, color, color, velocity))
+        
+        if snapshot.shots > self._shots and self._sounds is not None:
+            self._sounds.play('pew2.wav')
+        self._shots = snapshot.shots
+        self._lives = snapshot.lives
+        self._score = snapshot.score
     
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
     def draw_aliens(self, view):
         """ Draws the alien wave on the screen
         
         This procedure draws each alien in the wave on the screen""" 
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    alien.draw(view)
+        self._formation.draw(view)
     
     def draw_ship(self, view):
         """ Draws the ship on the screen
@@ -156,6 +253,13 @@ class Wave(object):
         This procedure draws the defense line on the screen""" 
         self._dline.draw(view)
         
+    def draw_hud(self, view):
+        """ Draws the lives and score on the screen
+        
+        This procedure only renders new text when the lives or score changed""" 
+        self._hud.update(self._lives, self._score)
+        self._hud.draw(view)
+        
     def draw_bolt(self, view):
         """ Draws a bolt on the screen
         
@@ -179,11 +283,12 @@ class Wave(object):
         if True not in list:
             if input.is_key_down('spacebar'):
                 if self._ship != None:
-                    self._bolts.append(Bolt(x=self._ship.x, bottom = SHIP_BOTTOM + SHIP_HEIGHT,
-                                        width = 5, height = 20, linecolor= cornell.BLUE,
-                                        fillcolor = cornell.BLUE, velocity = BOLT_SPEED))
-                    pewSound = Sound('pew2.wav')
-                    pewSound.play()
+                    self.add_bolt(self.new_bolt(x=self._ship.x, bottom = SHIP_BOTTOM + SHIP_HEIGHT,
+                                                width = 5, height = 20, linecolor= cornell.BLUE,
+                                                fillcolor = cornell.BLUE, velocity = BOLT_SPEED))
+                    self._shots += 1
+                    if self._sounds is not None:
+                        self._sounds.play('pew2.wav')
         self.move_bolt()
                 
     def move_bolt(self):
@@ -191,76 +296,85 @@ class Wave(object):
         This helper method to fireBolt moves the bolt image a certain distance when called.
         Parameter velocity: the distance to move the bolt
         Precondition: velocity is a number"""
-        for x in self._bolts:
+        for x in list(self._bolts):
             if x.GetBoltVelocity() >0:
                 x.SetBoltY(BOLT_SPEED)
             if x.GetBoltVelocity() <0:
                 x.SetBoltY(-BOLT_SPEED)
             if x.GetBoltY() > GAME_HEIGHT + BOLT_HEIGHT/2 or x.GetBoltY() < BOLT_HEIGHT/2:
-                pos = self._bolts.index(x)
-                del self._bolts[pos]
+                self.remove_bolt(x)
+            else:
+                self._collider.update(x)
+    
+    def new_bolt(self, x, bottom, width, height, linecolor, fillcolor, velocity):
+        """ Returns: a bolt for a new shot, reused from the bolt pool if possible.
+        This helper method takes the same arguments as the Bolt initializer.  The bolt is
+        given back to the pool when it is removed, so never keep it after that.
+        Parameter velocity: the velocity of the bolt when fired
+        Precondition: velocity is a number (see Bolt for the other parameters)"""
+        return self._pool.acquire(x, bottom, width, height, linecolor, fillcolor, velocity)
+    
+    def add_bolt(self, bolt):
+        """ Puts a newly fired bolt on screen.
+        This helper method adds the bolt to the list of bolts and to the collision broad phase.
+        Player bolts look for the aliens, and alien bolts look for the ship.
+        Parameter bolt: the bolt that was fired
+        Precondition: bolt is of class Bolt"""
+        self._bolts.append(bolt)
+        if bolt.isPlayerBolt():
+            self._collider.insert(bolt, LAYER_PLAYER_BOLT, LAYER_ALIENS)
+        else:
+            self._collider.insert(bolt, LAYER_ALIEN_BOLT, LAYER_SHIP)
+    
+    def remove_bolt(self, bolt):
+        """ Takes a bolt off the screen.
+        This helper method removes the bolt from the list of bolts and from the collision broad phase.
+        Parameter bolt: the bolt to remove
+        Precondition: bolt is of class Bolt and is on screen"""
+        self._bolts.remove(bolt)
+        self._collider.remove(bolt)
+        self._pool.release(bolt)
     
       
-    def alien_bolt(self, dt):
-        """ We discussed how to implement the final for loop with Lawrence Li
-        
-        Fires a bolt from an alien
-        
-        This procedure randomly fires a bolt from a non-empty alien in the alien wave""" 
-        count = 0
-        if self._time >= ALIEN_SPEED and self._direction == 'right':
-            for row in self._aliens:
-                for alien in row:
-                    if alien != None:
-                        alien.move_aliens_right(); self._time = 0; count += 1
-        if self._time >= ALIEN_SPEED and  self._direction =='left':
-            for row in self._aliens:
-                for alien in row:
-                    if alien != None:
-                        alien.move_aliens_left(); self._time = 0; count += 1
-        self._time += dt
-        if count > self._alienfire:
-            list = []
-            for x in self._bolts:
-                list.append(x.isAlienBolt())
-            if True not in list:
-                for col in range(ALIENS_IN_ROW):
-                    for row in range(len(self._aliens)):
-                        random_col = random.randint(0, ALIENS_IN_ROW -1)
-                        if self._aliens[row][random_col] is None:
-                            pass
-                        elif self._aliens[row][random_col] != None:
-                            self._bolts.append(Bolt(x = self._aliens[row][random_col].x,
-                                                    bottom = self._aliens[row][random_col].y
-                                                    - 0.5*ALIEN_HEIGHT - BOLT_HEIGHT -2, width = 5,
-                                                    height = 20, linecolor= cornell.GREEN,
-                                                    fillcolor = cornell.GREEN, velocity = -BOLT_SPEED))
-                            self.move_bolt(); self._alienfire = random.randint(1, BOLT_RATE) 
-                            return ''
+    def alien_bolt(self):
+        """ Returns: True if an alien fired a bolt, False if it could not
+        
+        This procedure fires a bolt from the bottom alien of a random column that still
+        has live aliens, so only the aliens at the front of the formation shoot.  The
+        formation keeps these front aliens up to date as aliens are destroyed, so picking
+        the shooter takes one random number no matter how many aliens are dead.  The
+        aliens cannot fire while one of their bolts is still on screen.""" 
+        list = []
+        for x in self._bolts:
+            list.append(x.isAlienBolt())
+        if True in list or self._formation.front_count() == 0:
+            return False
+        index = self._random.randrange(self._formation.front_count())
+        row, col = self._formation.front(index)
+        self.add_bolt(self.new_bolt(x = self._formation.get_x(row, col),
+                                    bottom = self._formation.get_y(row, col)
+                                    - 0.5*ALIEN_HEIGHT - BOLT_HEIGHT -2, width = 5,
+                                    height = 20, linecolor= cornell.GREEN,
+                                    fillcolor = cornell.GREEN, velocity = -BOLT_SPEED))
+        return True
+    
                         
     def aliens_dead(self):
         """Returns: False if there are still live aliens in the alien wave
         
-        This method checks to see if there are still live aliens in the alien wave. If there are none, it returns False.
+        This method checks to see if there are still live aliens in the alien wave. If there are none, it returns True.
         """ 
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    return False
-                #if this doesn't work append True and False to a list and then check the list
+        return self._formation.count() == 0
     
     def aliens_win(self):
         """Returns: True if an alien dips below the defense line
         
-        This method checks to see if any aliens have dipped below the defense line by checking each y coordinate
+        This method checks to see if any aliens have dipped below the defense line.  Every
+        alien in a row is at the same height, so it only checks the lowest row with a live
+        alien, which the formation keeps track of as aliens are destroyed.
         """
-        for row in range(len(self._aliens)):
-                for alien in range(len(self._aliens[row])):
-                    if self._aliens[row][alien] != None:
-                        row_as_list = self._aliens[row]
-                        alien_as_object = row_as_list[alien]
-                        if alien_as_object.y < DEFENSE_LINE + 0.5*ALIEN_HEIGHT:
-                            return True 
+        lowest = self._formation.lowest_y()
+        return lowest is not None and lowest < DEFENSE_LINE + 0.5*ALIEN_HEIGHT
                         
     def ship_movement(self, input):
         """ Moves the ship left or right
@@ -268,45 +382,58 @@ class Wave(object):
         """
         if input.is_key_down('left') and self._ship != None:
             self._ship.move_ship((-1)*SHIP_MOVEMENT)
+            self._collider.update(self._ship)
         if input.is_key_down('right') and self._ship != None:
             self._ship.move_ship(SHIP_MOVEMENT)
+            self._collider.update(self._ship)
             
     def alien_wave(self, dt):
-        """ Creates the alien and moves the aliens across the screen
+        """ Moves the aliens across the screen and lets them fire
         
-        This procedure creates a wave of aliens on the screen and moves them across and down over time
+        This procedure advances the timers of the wave by dt.  The aliens take a step
+        every ALIEN_SPEED/2 seconds of wave time (see _alien_step), and may fire after
+        every other step (see _alien_fire).  If dt spans several steps, the aliens take
+        all of them, so the march keeps the same pace at any frame rate.  The timers only
+        run while the wave is updated, so they stop while the game is paused.
         Parameter dt: time in seconds since the last call to the update method
         Precondition: dt is a number"""
-        if self._time >= ALIEN_SPEED and self._direction == 'right':
-            for row in self._aliens:
-                for alien in row:
-                    if alien != None:
-                        alien.move_aliens_right()
-                        self._time = 0
-        if self._time >= ALIEN_SPEED and self._direction =='left':
-            for row in self._aliens:
-                for alien in row:
-                    if alien != None:
-                        alien.move_aliens_left(); self._time = 0
-        self._time += dt
+        self._clock.advance(dt)
+    
+    def _alien_step(self, dt):
+        """ Moves the aliens one step across the screen, and down at the edges
+        
+        The formation turns around when its leftmost or rightmost live column reaches the edge it is
+        moving towards, no matter which aliens were destroyed.  The formation keeps track of those
+        columns as aliens are destroyed, so this check takes O(1) time.
+        Parameter dt: time in seconds since the last step
+        Precondition: dt is a number"""
+        if self._direction == 'right':
+            self._formation.march(ALIEN_H_WALK)
+        elif self._direction == 'left':
+            self._formation.march(-ALIEN_H_WALK)
         min = 0.5*ALIEN_WIDTH + ALIEN_H_SEP
         max = GAME_WIDTH - 0.5*ALIEN_WIDTH - ALIEN_H_SEP
-        if self._aliens[0][-1] != None:
-            if self._aliens[0][-1].x >= max:
-                self._direction = 'down'
-                for row in self._aliens:
-                    for alien in row:
-                        if alien != None:
-                            alien.move_aliens_down(); self._direction = 'left'
-            if self._aliens[0][0] != None:
-                if self._aliens[0][0].x <= min:
-                    self._direction = 'down'
-                    for row in self._aliens:
-                        for alien in row:
-                            if alien != None:
-                                alien.move_aliens_down()
-                    self._direction = 'right'
+        right = self._formation.right_x()
+        if right is not None and self._direction == 'right' and right >= max:
+            self._direction = 'down'
+            self._formation.descend(ALIEN_V_WALK/self._formation.rows())
+            self._direction = 'left'
+        left = self._formation.left_x()
+        if left is not None and self._direction == 'left' and left <= min:
+            self._direction = 'down'
+            self._formation.descend(ALIEN_V_WALK/self._formation.rows())
+            self._direction = 'right'
                        
+    def _alien_fire(self, dt):
+        """ Fires a bolt from an alien if there are more than _alienfire live aliens
+        
+        This is the timer callback for the alien fire, which runs right after every other
+        alien step.  After a shot, _alienfire is picked again.
+        Parameter dt: time in seconds since the aliens last tried to fire
+        Precondition: dt is a number"""
+        if self._formation.count() > self._alienfire and self.alien_bolt():
+            self._alienfire = self._random.randint(1, BOLT_RATE)
+    
     def restartShip(self):
         """ Reconstructs the ship after it is destroyed
         
@@ -314,6 +441,7 @@ class Wave(object):
         if (self._lives>0):
             self._ship = Ship(x=GAME_WIDTH/2, bottom = SHIP_BOTTOM,
                               width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
+            self._collider.insert(self._ship, LAYER_SHIP)
             
             
     def checkGameOver(self):